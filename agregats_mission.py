@@ -0,0 +1,146 @@
+import os
+import json
+import time
+
+from telemetrie_colonnes import TelemetrieColonnes
+from lecteur_telemetrie import (iterer_releves, iterer_releves_apres, fin_des_releves, lire_entete,
+                                empreintes_blocs, prefixe_intact)
+from regles_alerte import obtenir_moteur, formater_alerte
+
+DOSSIER_CHECKPOINTS = 'space_data/rapports/checkpoints/'
+# Un fichier modifié depuis moins longtemps peut encore changer sans que sa date bouge
+# (résolution de mtime) : sa date n'est alors pas retenue pour éviter la vérification
+DELAI_STABILITE_NS = 2 * 10 ** 9
+
+
+def _chemin_checkpoint(mission_id):
+    return os.path.join(DOSSIER_CHECKPOINTS, f"{mission_id}.json")
+
+
+def _charger_checkpoint(mission_id):
+    try:
+        with open(_chemin_checkpoint(mission_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _sauver_checkpoint(mission_id, etat):
+    os.makedirs(DOSSIER_CHECKPOINTS, exist_ok=True)
+    chemin = _chemin_checkpoint(mission_id)
+    with open(chemin + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(etat, f, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def _checkpoint_valide(etat, chemin_telemetrie, seuils, verification_complete=False):
+    """True si les relevés déjà traités n'ont pas changé (et les seuils non plus).
+
+    Contrôle borné par défaut (lecteur_telemetrie.prefixe_intact : deux
+    blocs relus, un bloc tournant différent à chaque passage) ;
+    verification_complete=True relit tout le préfixe.
+    """
+    if not etat or etat.get('chemin') != chemin_telemetrie or etat.get('seuils') != seuils:
+        return False
+    if etat.get('offset_fin') is None:
+        return False
+    return prefixe_intact(chemin_telemetrie, etat['offset_fin'], etat.get('blocs'),
+                          etat.get('rotation', 0), verification_complete)
+
+
+def _integrer(etat, nouveaux, seuils):
+    """Ajoute des relevés aux agrégats ; coût proportionnel au nombre de nouveaux relevés."""
+    colonnes = TelemetrieColonnes()
+    deja = etat['nb_releves']
+    # Le dernier relevé déjà traité sert de point de départ au premier segment
+    if deja:
+        colonnes.ajouter(etat['dernier_releve'])
+    dernier = etat['dernier_releve']
+    for dernier in nouveaux:
+        colonnes.ajouter(dernier)
+    debut = 1 if deja else 0
+    if len(colonnes) == debut:
+        return etat
+
+    if not deja:
+        etat['epoch_debut'] = colonnes.epoch[0]
+        etat['carburant_debut'] = colonnes.carburant[0]
+    etat['distance_totale'] += colonnes.distance_totale()
+    for alerte in obtenir_moteur(seuils).evaluer(colonnes, debut=debut):
+        jour_relatif = int((colonnes.epoch[alerte.indice] - etat['epoch_debut']) // 86400) + 1
+        etat['alertes'].append(f"[J+{jour_relatif}] {formater_alerte(alerte)}")
+    etat['nb_releves'] = deja + len(colonnes) - debut
+    etat['epoch_fin'] = colonnes.epoch[-1]
+    etat['carburant_fin'] = colonnes.carburant[-1]
+    etat['dernier_releve'] = dernier
+    return etat
+
+
+def rafraichir_agregats(mission_id, chemin_telemetrie, seuils, verification_complete=False):
+    """Met à jour et retourne les agrégats persistés d'une mission.
+
+    Seuls les relevés ajoutés depuis le dernier passage sont parsés ; une
+    reconstruction complète a lieu si les seuils changent ou si des relevés
+    déjà traités ont été modifiés (voir _checkpoint_valide ;
+    verification_complete=True contrôle tout le préfixe). Un fichier
+    inchangé depuis le checkpoint (même date, même taille) n'est pas relu.
+    Retourne (etat, reconstruit).
+    """
+    etat = _charger_checkpoint(mission_id)
+    st = os.stat(chemin_telemetrie)
+    if (not verification_complete and etat and etat.get('chemin') == chemin_telemetrie and etat.get('seuils') == seuils
+            and etat.get('fichier') == [st.st_mtime_ns, st.st_size]):
+        return etat, False
+
+    reconstruit = not _checkpoint_valide(etat, chemin_telemetrie, seuils, verification_complete)
+    if reconstruit:
+        etat = {
+            "chemin": chemin_telemetrie,
+            "seuils": seuils,
+            "vaisseau": lire_entete(chemin_telemetrie).get('vaisseau', 'Inconnu'),
+            "nb_releves": 0,
+            "distance_totale": 0.0,
+            "alertes": [],
+            "dernier_releve": None,
+        }
+        nouveaux = iterer_releves(chemin_telemetrie)
+    else:
+        nouveaux = iterer_releves_apres(chemin_telemetrie, etat['offset_fin'])
+
+    avant = os.stat(chemin_telemetrie)
+    etat = _integrer(etat, nouveaux, seuils)
+    apres = os.stat(chemin_telemetrie)
+
+    # Pas de checkpoint si le fichier a bougé pendant la lecture, ou si
+    # 'releves' n'est pas en fin de fichier (reprise impossible)
+    offset = fin_des_releves(chemin_telemetrie)
+    if offset is not None and (avant.st_mtime_ns, avant.st_size) == (apres.st_mtime_ns, apres.st_size):
+        # Seuls le dernier bloc (partiel) et les octets ajoutés sont hachés
+        if reconstruit:
+            etat['blocs'] = empreintes_blocs(chemin_telemetrie, offset)
+        else:
+            etat['blocs'] = empreintes_blocs(chemin_telemetrie, offset, etat['blocs'], etat['offset_fin'])
+        etat['offset_fin'] = offset
+        etat['rotation'] = etat.get('rotation', 0) + 1
+        stable = time.time_ns() - apres.st_mtime_ns > DELAI_STABILITE_NS
+        etat['fichier'] = [apres.st_mtime_ns, apres.st_size] if stable else None
+        _sauver_checkpoint(mission_id, etat)
+    return etat, reconstruit
+
+
+def analyse_depuis_agregats(etat):
+    """Indicateurs au format de tableaudebord.analyser_mission ; None si aucun relevé."""
+    if not etat['nb_releves']:
+        return None
+    duree_sec = etat['epoch_fin'] - etat['epoch_debut']
+    duree_heures = duree_sec / 3600
+    conso_totale = etat['carburant_debut'] - etat['carburant_fin']
+    return {
+        "vaisseau": etat['vaisseau'],
+        "jours_vol": int(duree_sec // 86400) + 1,
+        "distance_totale": etat['distance_totale'],
+        "vitesse_moy": etat['distance_totale'] / duree_sec if duree_sec > 0 else 0,
+        "taux_conso_h": conso_totale / duree_heures if duree_heures > 0 else 0,
+        "alertes": list(etat['alertes']),
+        "dernier_releve": etat['dernier_releve'],
+    }
\ No newline at end of file
@@ -1,18 +1,165 @@
 import os
+import sys
 import json
-import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from sauvegarde import DepotSauvegarde, DEPOT
+from instrumentation import mesure, action, configurer, compter
 
-def scanner_et_archiver():
+RAPPORT_PATH = 'space_data/rapports/inventaire.json'
+MANIFESTE_PATH = 'space_data/rapports/manifeste_scan.json'
+
+
+def _scanner_dossier(chemin, ext_autorisees, precedent, confiance_mtime):
+    """Liste un dossier avec os.scandir (un seul stat par fichier retenu).
+
+    Un dossier illisible (droits, supprimé pendant le scan) est ignoré,
+    comme le faisait os.walk ; un fichier illisible l'est aussi.
+    """
+    try:
+        mtime_dossier = os.stat(chemin).st_mtime_ns
+        # Mode rapide : un dossier dont la date n'a pas bougé n'a ni gagné ni perdu
+        # de fichiers, on reprend son contenu du manifeste précédent
+        if confiance_mtime and precedent and precedent['mtime_ns'] == mtime_dossier:
+            return chemin, precedent
+        fichiers = {}
+        sous_dossiers = []
+        with os.scandir(chemin) as entrees:
+            for entree in entrees:
+                if entree.is_dir(follow_symlinks=False):
+                    sous_dossiers.append(entree.name)
+                elif os.path.splitext(entree.name)[1] in ext_autorisees and entree.is_file():
+                    try:
+                        st = entree.stat()
+                    except OSError:
+                        continue
+                    fichiers[entree.name] = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        return chemin, None
+    return chemin, {"mtime_ns": mtime_dossier, "fichiers": fichiers, "sous_dossiers": sous_dossiers}
+
+
+def scanner_parallele(racine, ext_autorisees, precedent=None, confiance_mtime=False, travailleurs=8):
+    """Parcourt l'arborescence en parallèle (un dossier par tâche).
+
+    Retourne le manifeste {dossier: {mtime_ns, fichiers, sous_dossiers}}.
+    """
+    racine = racine.rstrip('/')
+    precedent = precedent or {}
+    manifeste = {}
+    with ThreadPoolExecutor(max_workers=travailleurs) as pool:
+        en_cours = {pool.submit(_scanner_dossier, racine, ext_autorisees,
+                                precedent.get(racine), confiance_mtime)}
+        while en_cours:
+            terminees, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+            for tache in terminees:
+                chemin, contenu = tache.result()
+                if contenu is None:
+                    continue
+                manifeste[chemin] = contenu
+                for nom in contenu['sous_dossiers']:
+                    sous = f"{chemin}/{nom}"
+                    en_cours.add(pool.submit(_scanner_dossier, sous, ext_autorisees,
+                                             precedent.get(sous), confiance_mtime))
+    return manifeste
+
+
+def _fichiers_du_manifeste(manifeste):
+    """Aplatit le manifeste en {chemin_fichier: (taille, mtime_ns)}."""
+    fichiers = {}
+    for dossier, contenu in manifeste.items():
+        for nom, (taille, mtime_ns) in contenu['fichiers'].items():
+            chemin = f"{dossier}/{nom}"
+            # On évite de scanner nos propres rapports d'inventaire
+            if chemin not in (RAPPORT_PATH, MANIFESTE_PATH):
+                fichiers[chemin] = (taille, mtime_ns)
+    return fichiers
+
+
+def comparer_inventaires(avant, apres):
+    """Retourne (ajoutes, modifies, supprimes), triés, entre deux états aplatis."""
+    ajoutes = sorted(c for c in apres if c not in avant)
+    supprimes = sorted(c for c in avant if c not in apres)
+    modifies = sorted(c for c in apres if c in avant and avant[c] != apres[c])
+    return ajoutes, modifies, supprimes
+
+
+def _charger_manifeste():
+    try:
+        with open(MANIFESTE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _ecrire_json(chemin, donnees, indent=None):
+    # Écriture dans un fichier temporaire puis remplacement atomique
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(donnees, f, indent=indent, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+
+
+def _ecrire_inventaire(fichiers):
+    liste = []
+    taille_totale = 0
+    for chemin in sorted(fichiers):
+        taille, mtime_ns = fichiers[chemin]
+        taille_totale += taille
+        liste.append({
+            "chemin": chemin,
+            "taille_octets": taille,
+            "derniere_modification": datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+            "extension": os.path.splitext(chemin)[1]
+        })
+    inventaire = {
+        "date_scan": datetime.now().isoformat(timespec='seconds'),
+        "total_fichiers": len(liste),
+        "taille_totale_octets": taille_totale,
+        "fichiers": liste
+    }
+    _ecrire_json(RAPPORT_PATH, inventaire, indent=2)
+    return taille_totale
+
+
+def _afficher_scan(precedent, fichiers):
+    """Affiche le résultat du scan ; retourne True si l'inventaire doit être réécrit."""
+    if precedent is None:
+        # Scan complet : affichage de chaque fichier comme auparavant
+        for chemin in sorted(fichiers):
+            taille, mtime_ns = fichiers[chemin]
+            date_str = datetime.fromtimestamp(mtime_ns / 1e9).strftime('%Y-%m-%d %H:%M')
+            print(f"  📄 {chemin} ({taille / 1024:.1f} KB) — modifié le {date_str}")
+        return True
+    else:
+        ajoutes, modifies, supprimes = comparer_inventaires(_fichiers_du_manifeste(precedent), fichiers)
+        for symbole, liste in (("+", ajoutes), ("~", modifies), ("-", supprimes)):
+            for chemin in liste:
+                print(f"  [{symbole}] {chemin}")
+        print(f"\nChangements : {len(ajoutes)} ajoutés, {len(modifies)} modifiés, {len(supprimes)} supprimés")
+        return bool(ajoutes or modifies or supprimes) or not os.path.exists(RAPPORT_PATH)
+
+
+def scanner_et_archiver(incremental=False, confiance_mtime=False):
+    """Scanne space_data/ et met à jour l'inventaire.
+
+    En mode incrémental, seuls les fichiers ajoutés, modifiés ou supprimés
+    depuis le scan précédent sont affichés, et l'inventaire n'est réécrit
+    que s'il y a eu un changement. Avec confiance_mtime, les dossiers dont
+    la date n'a pas changé ne sont pas relistés (une modification sur place
+    d'un fichier existant n'est alors vue qu'au prochain scan complet).
+    Retourne un résumé (fichiers, taille, inventaire réécrit, instantané de
+    sauvegarde), ou None si la configuration est introuvable.
+    """
     dossier_cible = 'space_data/'
     config_path = 'space_data/config_systeme.json'
-    rapport_path = 'space_data/rapports/inventaire.json'
 
     try:
         # Récupération des extensions depuis la config
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
-        ext_autorisees = config.get('extensions_autorisees', [])
+        ext_autorisees = set(config.get('extensions_autorisees', []))
     except FileNotFoundError:
         print(f"Erreur : {config_path} introuvable.")
         return
@@ -20,73 +167,53 @@ def scanner_et_archiver():
     print("=== 🗂️  Scanner de fichiers — Centre de contrôle ===\n")
     print(f"Scan de {dossier_cible}...")
 
-    fichiers_trouves = []
-    taille_totale = 0
+    with mesure("chargement"):
+        precedent = _charger_manifeste() if incremental else None
+    with mesure("scan"):
+        manifeste = scanner_parallele(dossier_cible, ext_autorisees, precedent, confiance_mtime)
+        fichiers = _fichiers_du_manifeste(manifeste)
+    compter("dossiers_scannes", len(manifeste))
+    compter("fichiers_inventories", len(fichiers))
 
-    # os.walk parcourt l'arborescence récursivement
-    for racine, dossiers, fichiers in os.walk(dossier_cible):
-        for nom_fichier in fichiers:
-            # Séparation du nom et de l'extension
-            _, ext = os.path.splitext(nom_fichier)
-            
-            if ext in ext_autorisees:
-                chemin_complet = os.path.join(racine, nom_fichier)
-                # Normalisation des barres obliques pour l'affichage (Windows vs Linux)
-                chemin_propre = chemin_complet.replace('\\', '/')
-                
-                # On évite de scanner notre propre fichier d'inventaire
-                if chemin_propre == rapport_path:
-                    continue
-                    
-                taille = os.path.getsize(chemin_complet)
-                mtime = os.path.getmtime(chemin_complet)
-                date_modif = datetime.fromtimestamp(mtime)
-                
-                taille_totale += taille
-                taille_kb = taille / 1024
-                date_str = date_modif.strftime('%Y-%m-%d %H:%M')
-                
-                print(f"  📄 {chemin_propre} ({taille_kb:.1f} KB) — modifié le {date_str}")
-                
-                fichiers_trouves.append({
-                    "chemin": chemin_propre,
-                    "taille_octets": taille,
-                    "derniere_modification": date_modif.isoformat(),
-                    "extension": ext
-                })
-
-    # Préparation des données JSON
-    inventaire = {
-        "date_scan": datetime.now().isoformat(timespec='seconds'),
-        "total_fichiers": len(fichiers_trouves),
-        "taille_totale_octets": taille_totale,
-        "fichiers": fichiers_trouves
-    }
+    with mesure("rendu"):
+        changement = _afficher_scan(precedent, fichiers)
 
-    # Sauvegarde du rapport
-    os.makedirs(os.path.dirname(rapport_path), exist_ok=True)
-    with open(rapport_path, 'w', encoding='utf-8') as f:
-        json.dump(inventaire, f, indent=2, ensure_ascii=False)
+    with mesure("ecriture"):
+        _ecrire_json(MANIFESTE_PATH, manifeste)
+        taille_totale = sum(taille for taille, _ in fichiers.values())
+        if changement:
+            _ecrire_inventaire(fichiers)
+    if changement:
+        print(f"\nTotal : {len(fichiers)} fichiers, {taille_totale / 1024:.1f} KB")
+        print(f"Inventaire sauvegardé → {RAPPORT_PATH}")
+    else:
+        print(f"\nTotal : {len(fichiers)} fichiers, {taille_totale / 1024:.1f} KB — inventaire inchangé")
+    resume = {"fichiers": len(fichiers), "taille_totale_octets": taille_totale,
+              "inventaire_modifie": changement, "sauvegarde": None}
 
-    taille_totale_kb = taille_totale / 1024
-    print(f"\nTotal : {len(fichiers_trouves)} fichiers, {taille_totale_kb:.1f} KB")
-    print(f"Inventaire sauvegardé → {rapport_path}")
-
-    # Section Bonus : Archivage
+    # Section Bonus : Sauvegarde dédupliquée (remplace l'ancienne archive tar)
+    print("\n[Bonus] Sauvegarde du dossier de sauvegardes en cours...")
+    dossier_a_sauvegarder = config.get('repertoires', {}).get('sauvegardes', 'space_data/backups/')
+    if not os.path.isdir(dossier_a_sauvegarder):
+        print(f"Note : {dossier_a_sauvegarder} n'existe pas, rien à sauvegarder.")
+        return resume
     try:
-        print("\n[Bonus] Compression du dossier de sauvegardes en cours...")
-        archive_nom = "space_data/backup_archive.tar.gz"
-        dossier_a_compresser = "space_data/backups/"
-        
-        # subprocess lance la commande système silencieusement
-        subprocess.run(
-            ["tar", "-czf", archive_nom, dossier_a_compresser], 
-            check=True, 
-            stderr=subprocess.DEVNULL
-        )
-        print(f"Archive créée avec succès → {archive_nom}")
-    except Exception:
-        print("Note : L'utilitaire 'tar' n'est pas disponible sur ce système pour le bonus.")
+        with mesure("sauvegarde"):
+            instantane = DepotSauvegarde().sauvegarder(dossier_a_sauvegarder)
+    except OSError as e:
+        print(f"[ERREUR] Sauvegarde impossible : {e}")
+        return resume
+    print(f"Instantané {instantane['id']} créé → {DEPOT} "
+          f"({instantane['fichiers_relus']} fichiers relus, "
+          f"{instantane['nouveaux_blocs']} nouveaux blocs, "
+          f"{instantane['octets_ecrits'] / 1024:.1f} KB écrits)")
+    resume["sauvegarde"] = instantane['id']
+    return resume
+
 
 if __name__ == '__main__':
-    scanner_et_archiver()
\ No newline at end of file
+    # --mesures : durées par phase et compteurs ; --profil : profil cProfile dans space_data/rapports/profils/
+    configurer()
+    with action("archivage"):
+        scanner_et_archiver(incremental='--incremental' in sys.argv,
+                            confiance_mtime='--rapide' in sys.argv)
\ No newline at end of file
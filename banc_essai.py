@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from statistics import median
+
+from generateur_donnees import generer
+
+DOSSIER_RESULTATS = 'space_data/rapports/bancs/'
+# Au-delà de ce rapport de durée avec un banc précédent, le cas est signalé
+SEUIL_REGRESSION = 1.2
+REQUETES_EQUIPAGE = ["fontaine", "france", "yuki", "schäfer", "bensaid", "fontain", "lea fontaine", "pilotage eva",
+                     "inconnu"]
+
+
+# ==========================================
+# CAS MESURES (exécutés dans le dossier du jeu de données)
+# ==========================================
+def cas_analyser_telemetrie():
+    from controle_mission import analyser_telemetrie
+    analyser_telemetrie()
+
+
+def cas_tableau_de_bord_complet():
+    from tableaudebord import generer_tableau_de_bord
+    generer_tableau_de_bord(complet=True)
+
+
+def cas_tableau_de_bord_froid():
+    # Sans agrégats persistés : premier passage complet sur la télémétrie
+    shutil.rmtree('space_data/rapports/checkpoints', ignore_errors=True)
+    from tableaudebord import generer_tableau_de_bord
+    generer_tableau_de_bord()
+
+
+def cas_tableau_de_bord_chaud():
+    from tableaudebord import generer_tableau_de_bord
+    generer_tableau_de_bord()
+
+
+def cas_alerte_systeme():
+    from astro_utils import alerte_systeme
+    from lecteur_telemetrie import iterer_releves
+    from chargeur_donnees import charger_json_securise
+    seuils = (charger_json_securise('space_data/config_systeme.json') or {}).get('seuils_alerte', {})
+    for releve in iterer_releves('space_data/telemetrie.json'):
+        alerte_systeme(releve, seuils)
+
+
+def cas_scanner_et_archiver():
+    from archiveur import scanner_et_archiver
+    scanner_et_archiver()
+
+
+def cas_scanner_et_archiver_incremental():
+    from archiveur import scanner_et_archiver
+    scanner_et_archiver(incremental=True)
+
+
+def cas_recherche_equipage():
+    # Même recherche que l'option 4 du centre de contrôle, construction de l'index comprise
+    from index_donnees import obtenir_index
+    index = obtenir_index().recherche()
+    for recherche in REQUETES_EQUIPAGE:
+        index.rechercher(recherche)
+
+
+# Ordre d'exécution : les cas « chaud » et « incrémental » suivent leur version froide
+CAS = {
+    "analyser_telemetrie": cas_analyser_telemetrie,
+    "tableau_de_bord_complet": cas_tableau_de_bord_complet,
+    "tableau_de_bord_froid": cas_tableau_de_bord_froid,
+    "tableau_de_bord_chaud": cas_tableau_de_bord_chaud,
+    "alerte_systeme": cas_alerte_systeme,
+    "scanner_et_archiver": cas_scanner_et_archiver,
+    "scanner_et_archiver_incremental": cas_scanner_et_archiver_incremental,
+    "recherche_equipage": cas_recherche_equipage,
+}
+
+
+def _rss_max_kio():
+    """Pic de mémoire résidente du processus (Kio) ; None si indisponible (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic // 1024 if sys.platform == 'darwin' else pic
+
+
+def _executer_cas(nom, racine, connexion):
+    """Processus fils : un seul cas, sortie standard masquée, (durée, pic mémoire) renvoyés."""
+    os.chdir(racine)
+    base = _rss_max_kio()
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as nul, contextlib.redirect_stdout(nul):
+            debut = time.perf_counter()
+            CAS[nom]()
+            duree = time.perf_counter() - debut
+        connexion.send({"secondes": duree, "pic_rss_kio": _rss_max_kio(), "base_rss_kio": base})
+    except Exception as e:
+        connexion.send({"erreur": f"{type(e).__name__}: {e}"})
+    finally:
+        connexion.close()
+
+
+def _generer(racine, tailles, connexion):
+    try:
+        connexion.send(generer(racine, **tailles))
+    finally:
+        connexion.close()
+
+
+def _dans_un_processus(cible, *arguments):
+    """Exécute cible(*arguments, connexion) dans un processus neuf et retourne ce qu'il envoie.
+
+    Un fils hérite du pic mémoire de son parent (ru_maxrss survit à exec) :
+    le parent reste donc léger, y compris pendant la génération du jeu.
+    """
+    contexte = multiprocessing.get_context('spawn')
+    reception, emission = contexte.Pipe(duplex=False)
+    processus = contexte.Process(target=cible, args=(*arguments, emission))
+    processus.start()
+    emission.close()
+    try:
+        resultat = reception.recv()
+    except EOFError:
+        resultat = {"erreur": f"processus terminé (code {processus.exitcode})"}
+    processus.join()
+    return resultat
+
+
+def mesurer(nom, racine):
+    """Exécute un cas dans un processus neuf (pic mémoire propre au cas)."""
+    return _dans_un_processus(_executer_cas, nom, os.path.abspath(racine))
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def preparer_jeu(racine, **tailles):
+    """Génère le jeu de données, sauf s'il existe déjà avec les mêmes tailles."""
+    try:
+        with open(os.path.join(racine, 'space_data', 'generation.json'), 'r', encoding='utf-8') as f:
+            existant = json.load(f)
+        if all(existant.get(cle) == valeur for cle, valeur in tailles.items()):
+            return existant
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    shutil.rmtree(racine, ignore_errors=True)
+    jeu = _dans_un_processus(_generer, racine, tailles)
+    if "erreur" in jeu:
+        raise RuntimeError(f"génération du jeu de données impossible : {jeu['erreur']}")
+    return jeu
+
+
+def lancer_banc(racine, tailles, cas=None, repetitions=1, chemin_resultats=None):
+    """Génère (ou réutilise) le jeu, mesure chaque cas et écrit les résultats en JSON.
+
+    Retourne le document de résultats ; chemin_resultats par défaut :
+    space_data/rapports/bancs/banc_<horodatage>.json.
+    """
+    chemin_resultats = os.path.abspath(chemin_resultats or os.path.join(
+        DOSSIER_RESULTATS, f"banc_{time.strftime('%Y%m%dT%H%M%S')}.json"))
+    jeu = preparer_jeu(racine, **tailles)
+    print(f"Jeu de données : {jeu['releves']:,} relevés, {jeu['astronautes']:,} astronautes, "
+          f"{jeu['fichiers_bruts']:,} fichiers bruts ({racine})")
+
+    resultats = {}
+    for nom in cas or CAS:
+        mesures = [mesurer(nom, racine) for _ in range(repetitions)]
+        erreurs = [m["erreur"] for m in mesures if "erreur" in m]
+        if erreurs:
+            resultats[nom] = {"erreur": erreurs[0]}
+            print(f"  {nom:<34} ERREUR {erreurs[0]}")
+            continue
+        durees = [m["secondes"] for m in mesures]
+        pics = [m["pic_rss_kio"] for m in mesures if m["pic_rss_kio"] is not None]
+        resultats[nom] = {
+            "secondes": durees,
+            "secondes_min": min(durees),
+            "secondes_mediane": median(durees),
+            "pic_rss_kio": max(pics) if pics else None,
+            "base_rss_kio": mesures[0]["base_rss_kio"],
+        }
+        memoire = f"{max(pics) / 1024:8.1f} Mio" if pics else "       ?"
+        print(f"  {nom:<34} {min(durees):9.3f}s  pic {memoire}")
+
+    document = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "jeu": jeu,
+        "repetitions": repetitions,
+        "resultats": resultats,
+    }
+    os.makedirs(os.path.dirname(chemin_resultats), exist_ok=True)
+    with open(chemin_resultats, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    print(f"[OK] Résultats écrits dans {chemin_resultats}")
+    return document
+
+
+def comparer(ancien, nouveau, seuil=SEUIL_REGRESSION):
+    """Compare deux documents de résultats ; retourne les cas en régression (durée ou mémoire)."""
+    regressions = []
+    print(f"{'Cas':<34}{'Avant':>10}{'Après':>10}{'Rapport':>9}{'Mémoire':>10}")
+    for nom, apres in nouveau["resultats"].items():
+        avant = ancien["resultats"].get(nom)
+        if not avant or "erreur" in avant or "erreur" in apres:
+            continue
+        rapport = apres["secondes_min"] / max(avant["secondes_min"], 1e-9)
+        rapport_memoire = None
+        if avant.get("pic_rss_kio") and apres.get("pic_rss_kio"):
+            rapport_memoire = apres["pic_rss_kio"] / avant["pic_rss_kio"]
+        signal = ""
+        if rapport > seuil or (rapport_memoire or 0) > seuil:
+            regressions.append(nom)
+            signal = "  ⚠️ régression"
+        memoire = f"x{rapport_memoire:.2f}" if rapport_memoire else "?"
+        print(f"{nom:<34}{avant['secondes_min']:>9.3f}s{apres['secondes_min']:>9.3f}s{rapport:>8.2f}x{memoire:>10}{signal}")
+    return regressions
+
+
+def _option(nom, defaut, conversion=int):
+    if nom in sys.argv:
+        valeur = sys.argv[sys.argv.index(nom) + 1]
+        return conversion(float(valeur)) if conversion is int else conversion(valeur)
+    return defaut
+
+
+if __name__ == '__main__':
+    # Usage : python banc_essai.py [--releves 1e5] [--astronautes 1e4] [--missions n] [--bruts n]
+    #         [--journal n] [--repetitions n] [--cas a,b] [--racine dossier] [--sortie fichier.json]
+    #         [--comparer ancien.json]
+    tailles = {
+        "releves": _option('--releves', 10000),
+        "astronautes": _option('--astronautes', 1000),
+        "missions": _option('--missions', 20),
+        "fichiers_bruts": _option('--bruts', 1000),
+        "entrees_journal": _option('--journal', 1000),
+    }
+    racine = _option('--racine', os.path.join(tempfile.gettempdir(), f"banc_navigation_{tailles['releves']}"), str)
+    cas = _option('--cas', None, lambda v: v.split(','))
+    inconnus = [nom for nom in cas or () if nom not in CAS]
+    if inconnus:
+        print(f"Cas inconnus : {', '.join(inconnus)} (disponibles : {', '.join(CAS)})")
+        sys.exit(1)
+    document = lancer_banc(racine, tailles, cas, _option('--repetitions', 1), _option('--sortie', None, str))
+    reference = _option('--comparer', None, str)
+    if reference:
+        with open(reference, 'r', encoding='utf-8') as f:
+            regressions = comparer(json.load(f), document)
+        sys.exit(1 if regressions else 0)
\ No newline at end of file
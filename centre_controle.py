@@ -1,16 +1,18 @@
 import os
+import sys
 import json
 import time
-import subprocess
+import shlex
+import contextlib
 from datetime import datetime
+from chargeur_donnees import charger_json_securise
+import instrumentation
+from instrumentation import mesure, action, configurer
 
-# Import des modules que tu as créés précédemment
-try:
-    from astro_utils import alerte_systeme
-    from archiveur import scanner_et_archiver
-    from tableaudebord import generer_tableau_de_bord
-except ImportError:
-    print("⚠️  Attention : modules manquants. Vérifie tes fichiers astro_utils.py, archiveur.py et tableau_de_bord.py.")
+# Les modules de traitement (archiveur, tableaudebord, suivi_direct...) sont
+# importés dans l'option ou la commande qui s'en sert : le démarrage, et
+# chaque lancement en mode lot, ne paient que ce qui est utilisé.
+CONFIG_PATH = "space_data/config_systeme.json"
 
 # ==========================================
 # CLASSES DE SECURITE ET DE LOG
@@ -19,43 +21,12 @@ class ErreurTelemetrie(Exception): pass
 class SeuilDepasse(ErreurTelemetrie): pass
 class DonneesManquantes(ErreurTelemetrie): pass
 class HorodatageInvalide(ErreurTelemetrie): pass
+class CommandeInvalide(Exception): pass
 
-class LogMission:
-    def __init__(self, mission_id):
-        self.mission_id = mission_id
-        self.filepath = f"space_data/logs/{self.mission_id}.log"
-        self.erreurs = 0
-
-    def __enter__(self):
-        self.start_time = time.time()
-        self.fichier = open(self.filepath, 'a', encoding='utf-8')
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.fichier.write(f"=== SESSION {ts} | {self.mission_id} ===\n")
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            self.erreurs += 1
-            self.fichier.write(f"[CRITIQUE] {exc_type.__name__}: {exc_val}\n")
-        duree = time.time() - self.start_time
-        self.fichier.write(f"=== FIN DE SESSION | Durée: {duree:.3f}s | Erreurs: {self.erreurs} ===\n\n")
-        self.fichier.close()
-        return False
-
-    def ecrire(self, niveau, msg):
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.fichier.write(f"[{ts}] [{niveau}] {msg}\n")
 
 # ==========================================
 # UTILITAIRES DE BASE
 # ==========================================
-def charger_json_securise(chemin):
-    try:
-        with open(chemin, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return None
-
 def valider_releve(releve, seuils):
     if "timestamp" not in releve: 
         raise DonneesManquantes("timestamp manquant")
@@ -70,18 +41,164 @@ def valider_releve(releve, seuils):
         raise SeuilDepasse(f"Carburant à {c_actuel}%")
     return True
 
+def _preparer_dossiers():
+    """Charge la configuration et crée les dossiers qu'elle déclare."""
+    config = charger_json_securise(CONFIG_PATH) or {}
+    for rep in config.get("repertoires", {}).values():
+        os.makedirs(rep, exist_ok=True)
+    return config
+
+def _effacer_ecran():
+    # Séquence ANSI plutôt qu'un shell lancé à chaque tour de menu
+    if os.name == 'nt':
+        os.system('cls')
+    elif sys.stdout.isatty():
+        print("\033[2J\033[H", end="")
+
+# ==========================================
+# COMMANDES EN LOT (sans menu, sortie JSON)
+# ==========================================
+def commande_missions(config):
+    from stockage_donnees import ouvrir_stockage
+    with mesure("chargement"):
+        missions = ouvrir_stockage().missions()
+    return [{cle: m.get(cle) for cle in ("id", "nom", "destination", "statut")} for m in missions]
+
+def commande_mission(config, mission_id):
+    from index_donnees import obtenir_index
+    with mesure("chargement"):
+        index = obtenir_index()
+        mission = index.mission(mission_id)
+    if not mission:
+        raise CommandeInvalide(f"mission {mission_id} introuvable")
+    return dict(mission, equipage=[profil or {"nom": membre} for membre, profil in index.equipage(mission_id)])
+
+def commande_telemetrie(config, debut=None, fin=None):
+    """Derniers relevés (3), ou ceux de la fenêtre [debut, fin], avec leurs alertes."""
+    from astro_utils import alerte_systeme
+    from lecteur_telemetrie import derniers_releves, lire_entete
+    chemin = "space_data/telemetrie.json"
+    with mesure("chargement"):
+        if debut and fin:
+            from telemetrie_segments import stockage_mission
+            mission_id = lire_entete(chemin).get("mission_id", "MSN-001")
+            releves = stockage_mission(mission_id, chemin).releves_entre(debut, fin)
+        else:
+            releves = derniers_releves(chemin, 3)
+    with mesure("calcul"):
+        seuils = config.get("seuils_alerte", {})
+        return [dict(r, alertes=alerte_systeme(r, seuils)) for r in releves]
+
+def commande_equipage(config, *mots):
+    """Recherche classée dans le registre (nom, nationalité, spécialité, certifications)."""
+    from index_donnees import obtenir_index
+    with mesure("chargement"):
+        index = obtenir_index().recherche()
+    with mesure("calcul"):
+        total, resultats = index.rechercher(" ".join(mots))
+    return {"total": total, "astronautes": [dict(a, score=round(score, 3)) for score, a in resultats]}
+
+def commande_journal(config, mission_id, date_log, auteur, *message):
+    from log_mission import LogMission
+    from stockage_donnees import ouvrir_stockage
+    entree = {"date": date_log, "auteur": auteur, "message": " ".join(message), "mission": mission_id}
+    with LogMission(mission_id) as log:
+        with mesure("ecriture"):
+            ouvrir_stockage().journal().ajouter(entree)
+        log.ecrire("INFO", f"Nouvelle entrée ajoutée par {auteur}")
+    return entree
+
+def commande_diagnostic(config):
+    """Validation en lot de la télémétrie (le test réseau fictif du menu n'est pas repris)."""
+    from lecteur_telemetrie import iterer_releves
+    from validation_lot import valider_lot
+    with mesure("validation"):
+        colonnes, erreurs = valider_lot(iterer_releves("space_data/telemetrie.json"), config.get("seuils_alerte", {}))
+    return {"releves": len(colonnes), "valide": not erreurs, "erreurs": [e._asdict() for e in erreurs]}
+
+def commande_archiver(config, *options):
+    """Scan incrémental de space_data/ ; '--complet' pour un scan complet."""
+    from archiveur import scanner_et_archiver
+    resume = scanner_et_archiver(incremental='--complet' not in options)
+    if resume is None:
+        raise CommandeInvalide(f"{CONFIG_PATH} introuvable")
+    return resume
+
+def commande_tableau_de_bord(config, mission_id='MSN-001', *options):
+    from tableaudebord import generer_tableau_de_bord
+    chemin = generer_tableau_de_bord(mission_id, complet='--complet' in options)
+    if chemin is None:
+        raise CommandeInvalide(f"tableau de bord de {mission_id} non généré (mission ou télémétrie introuvable)")
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return {"chemin": chemin, "rapport": json.load(f)}
+
+def commande_configuration(config):
+    return config
+
+def commande_recherche(config, *criteres):
+    from index_journaux import rechercher_journaux
+    return rechercher_journaux(shlex.join(criteres))
+
+COMMANDES = {
+    "missions": commande_missions,
+    "mission": commande_mission,
+    "telemetrie": commande_telemetrie,
+    "equipage": commande_equipage,
+    "journal": commande_journal,
+    "diagnostic": commande_diagnostic,
+    "archiver": commande_archiver,
+    "tableau_de_bord": commande_tableau_de_bord,
+    "configuration": commande_configuration,
+    "recherche": commande_recherche,
+}
+
+def executer_lot(lignes, sortie=None):
+    """Exécute des commandes ('nom arg1 "arg 2"...') dans ce processus.
+
+    Écrit une ligne JSON par commande sur sortie (commande, ok, resultat ou
+    erreur, duree_ms, et mesures si elles sont activées). L'affichage des
+    fonctions appelées est écarté ; configuration, cache JSON et index sont
+    chargés une fois pour tout le lot. Les lignes vides ou commençant par
+    '#' sont ignorées. Retourne le nombre de commandes en échec.
+    """
+    sortie = sortie or sys.stdout
+    config = _preparer_dossiers()
+    echecs = 0
+    with open(os.devnull, 'w', encoding='utf-8') as nul:
+        for ligne in lignes:
+            ligne = ligne.strip()
+            if not ligne or ligne.startswith("#"):
+                continue
+            resultat = {"commande": ligne, "ok": False}
+            debut = time.perf_counter()
+            try:
+                nom, *arguments = shlex.split(ligne)
+                if nom not in COMMANDES:
+                    raise CommandeInvalide(f"commande inconnue : {nom} (disponibles : {', '.join(COMMANDES)})")
+                with contextlib.redirect_stdout(nul), action(nom):
+                    resultat["resultat"] = COMMANDES[nom](config, *arguments)
+                resultat["ok"] = True
+            except Exception as e:
+                # Une commande en échec n'arrête pas le lot
+                resultat["erreur"] = f"{type(e).__name__}: {e}"
+                echecs += 1
+            resultat["duree_ms"] = round((time.perf_counter() - debut) * 1000, 3)
+            if instrumentation.affichage_actif:
+                resultat["mesures"] = instrumentation.mesures.rapport()
+            sortie.write(json.dumps(resultat, ensure_ascii=False, default=str) + "\n")
+            sortie.flush()
+    return echecs
+
 # ==========================================
 # PROGRAMME PRINCIPAL
 # ==========================================
 def main():
     # Création des dossiers au démarrage
-    config = charger_json_securise("space_data/config_systeme.json") or {}
-    for rep in config.get("repertoires", {}).values():
-        os.makedirs(rep, exist_ok=True)
+    config = _preparer_dossiers()
         
     while True:
         # Nettoyage de l'écran (Bonus)
-        os.system('cls' if os.name == 'nt' else 'clear')
+        _effacer_ecran()
         
         print("╔════════════════════════════════════════════╗")
         print("║   🚀 CENTRE DE CONTRÔLE SPATIAL — v4.7.2   ║")
@@ -95,6 +212,7 @@ def main():
         print("║  7. 🗂️  Archiver les données                ║")
         print("║  8. 📊 Générer le tableau de bord          ║")
         print("║  9. ⚙️  Configuration                       ║")
+        print("║ 10. 🔎 Rechercher logs et journal          ║")
         print("║  0. 🚪 Quitter                             ║")
         print("╚════════════════════════════════════════════╝")
         
@@ -102,108 +220,150 @@ def main():
         print("-" * 46)
         
         try:
-            if choix == "1":
-                data = charger_json_securise("space_data/missions.json")
-                for m in data.get("missions", []):
-                    print(f"[{m['id']}] {m['nom']} → {m['destination']} ({m['statut']})")
+            # Durées par phase (hors saisies clavier) et compteurs de l'option choisie
+            with action(f"option_{choix}"):
+                if choix == "1":
+                    from stockage_donnees import ouvrir_stockage
+                    with mesure("chargement"):
+                        missions = ouvrir_stockage().missions()
+                    with mesure("rendu"):
+                        for m in missions:
+                            print(f"[{m['id']}] {m['nom']} → {m['destination']} ({m['statut']})")
             
-            elif choix == "2":
-                m_data = charger_json_securise("space_data/missions.json")
-                eq_data = charger_json_securise("space_data/equipages.json")
-                mid = input("ID de la mission (ex: MSN-001) : ")
-                mission = next((m for m in m_data.get("missions", []) if m["id"] == mid), None)
+                elif choix == "2":
+                    from index_donnees import obtenir_index
+                    mid = input("ID de la mission (ex: MSN-001) : ")
+                    with mesure("chargement"):
+                        index = obtenir_index()
+                        mission = index.mission(mid)
                 
-                if mission:
-                    print(f"\nNom : {mission['nom']}\nLancement : {mission['date_lancement']}")
-                    print("Équipage :")
-                    for membre in mission['equipage']:
-                        nom_propre = membre.split(". ")[-1] if ". " in membre else membre
-                        profil = next((a for a in eq_data.get("astronautes", []) if a['nom'] == nom_propre), None)
-                        if profil:
-                            print(f"  - {profil['nom']} ({profil['specialite']} | {profil['heures_vol_spatial']}h vol)")
+                    if mission:
+                        with mesure("rendu"):
+                            print(f"\nNom : {mission['nom']}\nLancement : {mission['date_lancement']}")
+                            print("Équipage :")
+                            # Jointure mission -> profils déjà calculée dans l'index
+                            for membre, profil in index.equipage(mid):
+                                if profil:
+                                    print(f"  - {profil['nom']} ({profil['specialite']} | {profil['heures_vol_spatial']}h vol)")
+                                else:
+                                    print(f"  - {membre}")
+                    else:
+                        print("Mission introuvable.")
+
+                elif choix == "3":
+                    from astro_utils import alerte_systeme
+                    from lecteur_telemetrie import derniers_releves, lire_entete
+                    from telemetrie_segments import stockage_mission
+                    seuils = config.get("seuils_alerte", {})
+                    fenetre = input("Fenêtre temporelle 'début fin' en ISO 8601 (Entrée = derniers relevés) : ").split()
+                    with mesure("chargement"):
+                        if len(fenetre) == 2:
+                            # Recherche dichotomique dans les seuls segments qui recoupent la fenêtre
+                            chemin = "space_data/telemetrie.json"
+                            mission_id = lire_entete(chemin).get("mission_id", "MSN-001")
+                            releves = stockage_mission(mission_id, chemin).releves_entre(*fenetre)
+                            titre = f"Relevés entre {fenetre[0]} et {fenetre[1]} :"
                         else:
-                            print(f"  - {membre}")
-                else:
-                    print("Mission introuvable.")
-
-            elif choix == "3":
-                tel = charger_json_securise("space_data/telemetrie.json")
-                seuils = config.get("seuils_alerte", {})
-                print("Derniers relevés télémétriques :")
-                for r in tel.get("releves", [])[-3:]:
-                    print(f"\n[{r['timestamp']}] Alt: {r['altitude_km']:,}km, Vit: {r['vitesse_km_s']}km/s")
-                    alertes = alerte_systeme(r, seuils)
-                    for a in alertes: 
-                        print(f"  ⚠️ {a}")
-
-            elif choix == "4":
-                eq = charger_json_securise("space_data/equipages.json")
-                recherche = input("Rechercher un astronaute (nom ou nationalité) : ").lower()
-                trouve = False
-                for a in eq.get("astronautes", []):
-                    if recherche in a['nom'].lower() or recherche in a['nationalite'].lower():
-                        print(f"- {a['nom']} ({a['nationalite']}) — {a['specialite']}")
-                        trouve = True
-                if not trouve: print("Aucune correspondance.")
-
-            elif choix == "5":
-                m_id = input("ID de la mission pour le log (ex: MSN-001) : ")
-                with LogMission(m_id) as log:
-                    date_log = input("Date (YYYY-MM-DD) : ")
-                    auteur = input("Auteur : ")
-                    msg = input("Message : ")
-                    
-                    chemin_j = 'space_data/logs/journal.json'
-                    journal = charger_json_securise(chemin_j) or []
-                    journal.append({"date": date_log, "auteur": auteur, "message": msg})
+                            # Lecture depuis la fin du fichier : coût indépendant de la durée de mission
+                            releves = derniers_releves("space_data/telemetrie.json", 3)
+                            titre = "Derniers relevés télémétriques :"
+                    with mesure("calcul"):
+                        alertes_releves = [alerte_systeme(r, seuils) for r in releves]
+                    with mesure("rendu"):
+                        print(titre)
+                        for r, alertes in zip(releves, alertes_releves):
+                            print(f"\n[{r['timestamp']}] Alt: {r['altitude_km']:,}km, Vit: {r['vitesse_km_s']}km/s")
+                            for a in alertes: 
+                                print(f"  ⚠️ {a}")
+
+                    # Suivi du dossier raw/ : seuls les relevés arrivés ensuite sont traités
+                    if input("\nSuivre le flux en direct ? (o/N) : ").strip().lower() == "o":
+                        from suivi_direct import lancer_suivi
+                        lancer_suivi(config)
+
+                elif choix == "4":
+                    from index_donnees import obtenir_index
+                    from index_equipage import afficher_resultats
+                    recherche = input("Rechercher un astronaute (nom, nationalité, spécialité, certification) : ")
+                    # Index replié (sans accents) : préfixes, mots contenus et fautes de frappe, classés
+                    with mesure("chargement"):
+                        index = obtenir_index().recherche()
+                    with mesure("calcul"):
+                        total, trouves = index.rechercher(recherche)
+                    with mesure("rendu"):
+                        afficher_resultats(total, trouves)
+
+                elif choix == "5":
+                    from log_mission import LogMission
+                    from stockage_donnees import ouvrir_stockage
+                    m_id = input("ID de la mission pour le log (ex: MSN-001) : ")
+                    with LogMission(m_id) as log:
+                        date_log = input("Date (YYYY-MM-DD) : ")
+                        auteur = input("Auteur : ")
+                        msg = input("Message : ")
                     
-                    with open(chemin_j, 'w', encoding='utf-8') as f:
-                        json.dump(journal, f, indent=2, ensure_ascii=False)
+                        # Ajout seul : rien n'est relu ni réécrit
+                        with mesure("ecriture"):
+                            ouvrir_stockage().journal().ajouter({"date": date_log, "auteur": auteur, "message": msg, "mission": m_id})
                         
-                    log.ecrire("INFO", f"Nouvelle entrée ajoutée par {auteur}")
-                    print("[OK] Journal mis à jour et log sauvegardé.")
+                        log.ecrire("INFO", f"Nouvelle entrée ajoutée par {auteur}")
+                        print("[OK] Journal mis à jour et log sauvegardé.")
 
-            elif choix == "6":
-                print("Lancement du diagnostic global...")
-                tel = charger_json_securise("space_data/telemetrie.json")
-                seuils = config.get("seuils_alerte", {})
-                
-                # Bonus : Ping réseau fictif
-                print("\n[Réseau] Test de communication...")
-                cmd = ["ping", "-n", "1", "127.0.0.1"] if os.name == 'nt' else ["ping", "-c", "1", "127.0.0.1"]
-                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                print("[OK] Connexion nominale.")
-
-                print("\n[Systèmes] Vérification des relevés...")
-                erreurs = 0
-                for r in tel.get("releves", []):
-                    try:
-                        valider_releve(r, seuils)
-                    except ErreurTelemetrie as e:
-                        print(f"❌ Relevé {r.get('timestamp')} : {e.__class__.__name__} - {e}")
-                        erreurs += 1
+                elif choix == "6":
+                    print("Lancement du diagnostic global...")
+                    seuils = config.get("seuils_alerte", {})
                 
-                if erreurs == 0:
-                    print("✅ Tous les relevés sont valides.")
+                    import subprocess
+                    from lecteur_telemetrie import iterer_releves
+                    from validation_lot import valider_lot, afficher_erreurs
+
+                    # Bonus : Ping réseau fictif
+                    print("\n[Réseau] Test de communication...")
+                    cmd = ["ping", "-n", "1", "127.0.0.1"] if os.name == 'nt' else ["ping", "-c", "1", "127.0.0.1"]
+                    with mesure("reseau"):
+                        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    print("[OK] Connexion nominale.")
 
-            elif choix == "7":
-                scanner_et_archiver()
+                    print("\n[Systèmes] Vérification des relevés...")
+                    # Validation en lot : un seul passage, tableau d'erreurs au lieu d'exceptions
+                    # Lecture en flux et validation entrelacées : une seule phase
+                    with mesure("validation"):
+                        colonnes, erreurs = valider_lot(iterer_releves("space_data/telemetrie.json"), seuils)
+                    with mesure("rendu"):
+                        if erreurs:
+                            afficher_erreurs(erreurs)
+                        else:
+                            print(f"✅ Tous les relevés sont valides ({len(colonnes)} relevés).")
+
+                elif choix == "7":
+                    from archiveur import scanner_et_archiver
+                    # Sans confiance_mtime : modifier un fichier sur place ne change pas la
+                    # date de son dossier, l'inventaire manquerait la modification
+                    scanner_et_archiver(incremental=True)
 
-            elif choix == "8":
-                generer_tableau_de_bord()
+                elif choix == "8":
+                    from tableaudebord import generer_tableau_de_bord
+                    generer_tableau_de_bord()
 
-            elif choix == "9":
-                print("Configuration système :")
-                print(f"Version : {config.get('version_logiciel')}")
-                print("Seuils d'alerte :")
-                for k, v in config.get("seuils_alerte", {}).items():
-                    print(f"  - {k} : {v}")
+                elif choix == "9":
+                    with mesure("rendu"):
+                        print("Configuration système :")
+                        print(f"Version : {config.get('version_logiciel')}")
+                        print("Seuils d'alerte :")
+                        for k, v in config.get("seuils_alerte", {}).items():
+                            print(f"  - {k} : {v}")
 
-            elif choix == "0":
-                print("Fermeture du simulateur. Bon vol ! 🚀")
-                break
-            else:
-                print("Option invalide.")
+                elif choix == "10":
+                    print("Critères : mission=… niveau=… auteur=… debut=YYYY-MM-DD fin=YYYY-MM-DD, puis des mots")
+                    from index_journaux import rechercher_journaux
+                    # Index inversé mis à jour par ajout : les fichiers de log ne sont pas relus
+                    rechercher_journaux(input("Recherche : "))
+
+                elif choix == "0":
+                    print("Fermeture du simulateur. Bon vol ! 🚀")
+                    break
+                else:
+                    print("Option invalide.")
 
         except Exception as e:
             # Sécurité ultime : le programme ne crashe jamais
@@ -211,5 +371,51 @@ def main():
 
         input("\nAppuyez sur Entrée pour continuer...")
 
+def _option(nom, defaut=None):
+    if nom in sys.argv:
+        return sys.argv[sys.argv.index(nom) + 1]
+    return defaut
+
+def _separer_commandes(texte):
+    """Découpe '--executer' sur les ';' hors guillemets ('recherche "a;b"; missions').
+
+    Chaque commande est réécrite avec shlex.join : executer_lot en relit
+    les mêmes arguments. Lève ValueError si un guillemet n'est pas fermé.
+    """
+    lexeur = shlex.shlex(texte, posix=True, punctuation_chars=";")
+    lexeur.whitespace_split = True
+    lexeur.commenters = ''
+    commandes, arguments = [], []
+    for morceau in lexeur:
+        if morceau.strip(";"):
+            arguments.append(morceau)
+        elif arguments:
+            commandes.append(shlex.join(arguments))
+            arguments = []
+    if arguments:
+        commandes.append(shlex.join(arguments))
+    return commandes
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # --mesures : durées par phase et compteurs après chaque option ;
+    # --profil : profil cProfile de chaque option dans space_data/rapports/profils/
+    # Mode lot, sans menu (une ligne JSON par commande, code 1 si une commande échoue) :
+    #   python centre_controle.py --executer "missions; tableau_de_bord MSN-001; diagnostic"
+    #   python centre_controle.py --lot commandes.txt   (une commande par ligne, '-' = entrée standard)
+    configurer()
+    executer = _option('--executer')
+    fichier_lot = _option('--lot')
+    if executer is not None:
+        try:
+            commandes = _separer_commandes(executer)
+        except ValueError as e:
+            print(f"[ERREUR] --executer : {e}")
+            sys.exit(1)
+        sys.exit(1 if executer_lot(commandes) else 0)
+    elif fichier_lot == '-':
+        sys.exit(1 if executer_lot(sys.stdin) else 0)
+    elif fichier_lot is not None:
+        with open(fichier_lot, 'r', encoding='utf-8') as f:
+            sys.exit(1 if executer_lot(f) else 0)
+    else:
+        main()
\ No newline at end of file
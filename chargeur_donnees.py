@@ -0,0 +1,104 @@
+import os
+import json
+from collections import OrderedDict
+from instrumentation import compter
+
+# Un document JSON chargé en mémoire pèse plusieurs fois sa taille sur disque
+FACTEUR_MEMOIRE = 8
+BUDGET_MEMOIRE = 256 * 1024 * 1024
+
+
+class CacheJson:
+    """Cache LRU de documents JSON, clé = chemin, validé par (mtime, taille).
+
+    Les documents rendus sont partagés entre appelants : ils doivent être
+    traités en lecture seule.
+    """
+
+    def __init__(self, budget_octets=BUDGET_MEMOIRE):
+        self.budget_octets = budget_octets
+        self.entrees = OrderedDict()   # chemin -> (signature, données, coût)
+        self.cout_total = 0
+        self.succes = 0
+        self.echecs = 0
+
+    def charger(self, chemin):
+        """Retourne le document parsé ; ne relit le fichier que s'il a changé.
+
+        Lève les mêmes exceptions que open/json.load.
+        """
+        cle = os.path.abspath(chemin)
+        st = os.stat(cle)
+        signature = (st.st_mtime_ns, st.st_size)
+        entree = self.entrees.get(cle)
+        if entree and entree[0] == signature:
+            self.entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+
+        self.echecs += 1
+        with open(cle, 'r', encoding='utf-8') as f:
+            donnees = json.load(f)
+        compter("octets_lus", st.st_size)
+        self._retirer(cle)
+        cout = st.st_size * FACTEUR_MEMOIRE
+        # Un document plus gros que le budget entier n'est pas gardé en cache
+        if cout <= self.budget_octets:
+            self.entrees[cle] = (signature, donnees, cout)
+            self.cout_total += cout
+            while self.cout_total > self.budget_octets:
+                self._retirer(next(iter(self.entrees)))
+        return donnees
+
+    def _retirer(self, cle):
+        entree = self.entrees.pop(cle, None)
+        if entree:
+            self.cout_total -= entree[2]
+
+    def vider(self):
+        self.entrees.clear()
+        self.cout_total = 0
+
+
+cache = CacheJson()
+
+
+def charger_json_securise(chemin, verbeux=False):
+    """Charge un JSON via le cache partagé ; retourne None en cas d'erreur.
+
+    Avec verbeux=True, chaque chargement et chaque erreur sont affichés.
+    """
+    try:
+        data = cache.charger(chemin)
+        if verbeux:
+            # Petite condition pour afficher le bon message si c'est le fichier missions
+            if isinstance(data, dict) and "missions" in data:
+                print(f"[OK] {chemin} chargé avec succès ({len(data['missions'])} missions)")
+            else:
+                print(f"[OK] {chemin} chargé avec succès")
+        return data
+    except FileNotFoundError:
+        erreur = "Fichier introuvable."
+    except json.JSONDecodeError as e:
+        erreur = f"Format JSON invalide : {e}"
+    except PermissionError:
+        erreur = "Accès refusé."
+    except Exception as e:
+        # Fallback pour toute autre erreur non prévue
+        erreur = f"Erreur inattendue : {e}"
+    if verbeux:
+        print(f"[ERREUR] {chemin} — {erreur}")
+    return None
+
+
+def charger_les_json(dossier, noms):
+    """Charge uniquement les fichiers demandés d'un dossier : {nom sans .json: données}.
+
+    Les fichiers absents ou illisibles sont ignorés.
+    """
+    donnees = {}
+    for nom in noms:
+        document = charger_json_securise(os.path.join(dossier, nom))
+        if document is not None:
+            donnees[nom.replace('.json', '')] = document
+    return donnees
\ No newline at end of file
@@ -0,0 +1,287 @@
+import os
+import sys
+import math
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import partial
+from itertools import count, repeat
+from operator import add, sub, mul, truediv, lt
+
+from telemetrie_binaire import charger_colonnes
+from telemetrie_colonnes import epoch_iso
+
+# Canaux interpolés : position puis canaux numériques des relevés
+CANAUX_INTERPOLES = ('x', 'y', 'z', 'vitesse', 'altitude', 'carburant', 'oxygene', 'temperature')
+# Un bloc d'éphémérides dense couvre ECHANTILLONS_PAR_BLOC instants consécutifs
+ECHANTILLONS_PAR_BLOC = 1024
+BUDGET_CACHE = 64 * 1024 * 1024
+
+_numeros = count(1)
+
+
+# ==========================================
+# METHODES D'INTERPOLATION
+# ==========================================
+# Une méthode reçoit les epochs des relevés (strictement croissants), les
+# colonnes de valeurs et la position des instants demandés ; elle retourne
+# une colonne interpolée par colonne de valeurs.
+
+def _positions(epochs, instants):
+    """Intervalle [k - 1, k] de chaque instant, temps écoulé depuis son début et sa durée.
+
+    Les instants hors de [premier relevé, dernier relevé] reçoivent un temps écoulé NaN.
+    """
+    n = len(epochs)
+    k = list(map(partial(bisect_right, epochs), instants))
+    hors_bornes = 0 in k or n in k
+    # Le dernier relevé lui-même tombe dans le dernier intervalle (fraction 1)
+    k = list(map(min, map(max, k, repeat(1)), repeat(n - 1)))
+    t0 = list(map(epochs.__getitem__, map((-1).__add__, k)))
+    ecoules = list(map(sub, instants, t0))
+    durees = list(map(sub, map(epochs.__getitem__, k), t0))
+    if hors_bornes:
+        ecoules = [e if 0.0 <= e <= h else math.nan for e, h in zip(ecoules, durees)]
+    return k, ecoules, durees
+
+
+def _taux(epochs, valeurs):
+    """Taux de variation sur chaque intervalle [i - 1, i] (indice 0 inutilisé)."""
+    taux = array('d', [0.0])
+    taux.extend(map(truediv, map(sub, valeurs[1:], valeurs[:-1]), map(sub, epochs[1:], epochs[:-1])))
+    return taux
+
+
+def interpolation_lineaire(epochs, colonnes, instants, contexte=None):
+    """Interpolation linéaire entre les deux relevés qui encadrent chaque instant.
+
+    'contexte' (dict) garde les taux de variation par intervalle entre deux appels.
+    """
+    k, ecoules, _ = _positions(epochs, instants)
+    km1 = list(map((-1).__add__, k))
+    contexte = {} if contexte is None else contexte
+    resultat = []
+    for valeurs in colonnes:
+        taux = contexte.get(("taux", id(valeurs)))
+        if taux is None:
+            taux = contexte[("taux", id(valeurs))] = _taux(epochs, valeurs)
+        resultat.append(array('d', map(add, map(valeurs.__getitem__, km1),
+                                       map(mul, ecoules, map(taux.__getitem__, k)))))
+    return resultat
+
+
+def _pentes(epochs, valeurs):
+    """Dérivées aux relevés par différences finies (centrées à l'intérieur)."""
+    n = len(epochs)
+    if n < 2:
+        return array('d', repeat(0.0, n))
+    pentes = array('d', repeat(0.0, n))
+    pentes[0] = (valeurs[1] - valeurs[0]) / (epochs[1] - epochs[0])
+    pentes[-1] = (valeurs[-1] - valeurs[-2]) / (epochs[-1] - epochs[-2])
+    for i in range(1, n - 1):
+        pentes[i] = (valeurs[i + 1] - valeurs[i - 1]) / (epochs[i + 1] - epochs[i - 1])
+    return pentes
+
+
+def interpolation_hermite(epochs, colonnes, instants, contexte=None):
+    """Interpolation cubique d'Hermite, pentes estimées par différences finies.
+
+    Passe par les relevés comme l'interpolation linéaire, mais avec une
+    dérivée continue : les trajectoires courbes entre deux relevés espacés
+    sont mieux suivies. 'contexte' (dict) garde les pentes entre deux appels.
+    """
+    k, ecoules, durees = _positions(epochs, instants)
+    fractions = list(map(truediv, ecoules, durees))
+    contexte = {} if contexte is None else contexte
+    resultat = []
+    for valeurs in colonnes:
+        pentes = contexte.get(("pentes", id(valeurs)))
+        if pentes is None:
+            pentes = contexte[("pentes", id(valeurs))] = _pentes(epochs, valeurs)
+        colonne = array('d')
+        for i, s, h in zip(k, fractions, durees):
+            s2 = s * s
+            s3 = s2 * s
+            colonne.append((2 * s3 - 3 * s2 + 1) * valeurs[i - 1] + (s3 - 2 * s2 + s) * h * pentes[i - 1]
+                           + (3 * s2 - 2 * s3) * valeurs[i] + (s3 - s2) * h * pentes[i])
+        resultat.append(colonne)
+    return resultat
+
+
+METHODES = {
+    "lineaire": interpolation_lineaire,
+    "hermite": interpolation_hermite,
+}
+
+
+# ==========================================
+# CACHE D'EPHEMERIDES DENSES
+# ==========================================
+class CacheEphemerides:
+    """Cache LRU de blocs d'éphémérides denses, borné en octets.
+
+    Clé = (source, méthode, pas, numéro de bloc) ; un bloc est un dict de
+    colonnes array('d') de ECHANTILLONS_PAR_BLOC instants.
+    """
+
+    def __init__(self, budget_octets=BUDGET_CACHE):
+        self.budget_octets = budget_octets
+        self.entrees = OrderedDict()   # clé -> (bloc, coût)
+        self.cout_total = 0
+        self.succes = 0
+        self.echecs = 0
+
+    def obtenir(self, cle, calculer):
+        """Bloc associé à la clé ; calculer() n'est appelé qu'en cas d'absence."""
+        entree = self.entrees.get(cle)
+        if entree:
+            self.entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[0]
+
+        self.echecs += 1
+        bloc = calculer()
+        cout = sum(colonne.itemsize * len(colonne) for colonne in bloc.values())
+        if cout <= self.budget_octets:
+            self.entrees[cle] = (bloc, cout)
+            self.cout_total += cout
+            while self.cout_total > self.budget_octets:
+                _, (_, cout_retire) = self.entrees.popitem(last=False)
+                self.cout_total -= cout_retire
+        return bloc
+
+    def vider(self):
+        self.entrees.clear()
+        self.cout_total = 0
+
+
+cache = CacheEphemerides()
+
+
+class Ephemerides:
+    """Interpolation d'une trajectoire à des instants arbitraires.
+
+    colonnes : TelemetrieColonnes (ou TelemetrieBinaire). Les relevés sont
+    triés par epoch si besoin ; pour un même epoch, le dernier relevé est
+    gardé. 'cle' identifie la source dans le cache partagé : deux objets
+    de même clé partagent leurs blocs (None = clé propre à l'objet).
+    """
+
+    def __init__(self, colonnes, methode="lineaire", cle=None, cache_blocs=None):
+        if methode not in METHODES:
+            raise ValueError(f"méthode d'interpolation inconnue : {methode} (choix : {', '.join(METHODES)})")
+        self.methode = methode
+        self.cle = cle if cle is not None else ("objet", next(_numeros))
+        self.cache = cache if cache_blocs is None else cache_blocs
+        self._contexte = {}
+        epochs = colonnes.epoch
+        if len(epochs) > 1 and all(map(lt, epochs[:-1], epochs[1:])):
+            self.epochs = epochs
+            self.colonnes = {nom: getattr(colonnes, nom) for nom in CANAUX_INTERPOLES}
+        else:
+            ordre = {}
+            for i, epoch in enumerate(epochs):
+                if epoch == epoch:
+                    ordre[epoch] = i
+            indices = [ordre[epoch] for epoch in sorted(ordre)]
+            self.epochs = array('d', map(epochs.__getitem__, indices))
+            self.colonnes = {nom: array('d', map(getattr(colonnes, nom).__getitem__, indices))
+                             for nom in CANAUX_INTERPOLES}
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def bornes(self):
+        """(premier epoch, dernier epoch) couverts par les relevés."""
+        return self.epochs[0], self.epochs[-1]
+
+    def evaluer(self, instants, canaux=CANAUX_INTERPOLES):
+        """Valeurs interpolées aux instants (epochs ou ISO 8601), en un seul appel.
+
+        Retourne {canal: array('d')} dans l'ordre des instants ; NaN hors de
+        la période couverte ou si le canal manque à un relevé encadrant.
+        """
+        if not isinstance(instants, array):
+            instants = [epoch_iso(t) if isinstance(t, str) else float(t) for t in instants]
+        if len(self) < 2:
+            return {nom: array('d', repeat(math.nan, len(instants))) for nom in canaux}
+        valeurs = METHODES[self.methode](self.epochs, [self.colonnes[nom] for nom in canaux],
+                                         instants, self._contexte)
+        return dict(zip(canaux, valeurs))
+
+    def _bloc(self, numero, pas):
+        def calculer():
+            premier = numero * ECHANTILLONS_PAR_BLOC
+            instants = array('d', (pas * i for i in range(premier, premier + ECHANTILLONS_PAR_BLOC)))
+            bloc = self.evaluer(instants)
+            bloc["epoch"] = instants
+            return bloc
+        return self.cache.obtenir((self.cle, self.methode, pas, numero), calculer)
+
+    def grille(self, debut=None, fin=None, pas=30.0):
+        """Éphémérides denses : un instant tous les 'pas' s (multiples de pas) dans [debut, fin].
+
+        La fenêtre est ramenée à la période couverte par les relevés. Les
+        blocs calculés restent en cache : une fenêtre déjà demandée (ou qui
+        en recoupe une) est servie sans recalcul.
+        Retourne {"epoch": array('d'), canal: array('d'), ...}.
+        """
+        resultat = {nom: array('d') for nom in ("epoch",) + CANAUX_INTERPOLES}
+        if len(self) < 2:
+            return resultat
+        pas = float(pas)
+        t0, t1 = self.bornes()
+        debut = t0 if debut is None else max(t0, epoch_iso(debut) if isinstance(debut, str) else debut)
+        fin = t1 if fin is None else min(t1, epoch_iso(fin) if isinstance(fin, str) else fin)
+        premier = math.ceil(debut / pas)
+        dernier = math.floor(fin / pas)
+        for numero in range(premier // ECHANTILLONS_PAR_BLOC, dernier // ECHANTILLONS_PAR_BLOC + 1):
+            bloc = self._bloc(numero, pas)
+            base = numero * ECHANTILLONS_PAR_BLOC
+            i0 = max(premier - base, 0)
+            i1 = min(dernier - base + 1, ECHANTILLONS_PAR_BLOC)
+            for nom, colonne in resultat.items():
+                colonne.extend(bloc[nom][i0:i1])
+        return resultat
+
+
+def ephemerides_mission(chemin_json, methode="lineaire"):
+    """Ephemerides d'un fichier de télémétrie, identifiées dans le cache par (chemin, mtime, taille)."""
+    st = os.stat(chemin_json)
+    colonnes, _ = charger_colonnes(chemin_json)
+    return Ephemerides(colonnes, methode, cle=(os.path.abspath(chemin_json), st.st_mtime_ns, st.st_size))
+
+
+def _option(nom, defaut, conversion=str):
+    if nom in sys.argv:
+        return conversion(sys.argv[sys.argv.index(nom) + 1])
+    return defaut
+
+
+if __name__ == '__main__':
+    # Usage : python ephemerides.py [json] [debut fin] [--pas s] [--methode lineaire|hermite] [--lignes n]
+    from chargeur_donnees import charger_json_securise
+
+    positionnels = [a for i, a in enumerate(sys.argv[1:], 1)
+                    if not a.startswith('--') and not sys.argv[i - 1].startswith('--')]
+    chemin = positionnels[0] if positionnels else 'space_data/telemetrie.json'
+    debut = positionnels[1] if len(positionnels) > 2 else None
+    fin = positionnels[2] if len(positionnels) > 2 else None
+    config = charger_json_securise('space_data/config_systeme.json') or {}
+    pas = _option('--pas', config.get('frequence_telemetrie_sec', 30), float)
+    lignes = _option('--lignes', 20, int)
+
+    ephemerides = ephemerides_mission(chemin, _option('--methode', 'lineaire'))
+    for passage in ("calcul", "cache"):
+        chrono = time.perf_counter()
+        table = ephemerides.grille(debut, fin, pas)
+        print(f"[{passage}] {len(table['epoch'])} instants tous les {pas:g}s en {time.perf_counter() - chrono:.3f}s")
+
+    print(f"{'Instant':<22}{'x':>12}{'y':>12}{'z':>12}{'Vit.':>8}{'Carb.':>8}")
+    etape = max(1, len(table['epoch']) // lignes) if lignes else 1
+    for i in range(0, len(table['epoch']), etape):
+        instant = datetime.fromtimestamp(table['epoch'][i], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        print(f"{instant:<22}{table['x'][i]:>12.1f}{table['y'][i]:>12.1f}"
+              f"{table['z'][i]:>12.1f}{table['vitesse'][i]:>8.2f}{table['carburant'][i]:>8.2f}")
\ No newline at end of file
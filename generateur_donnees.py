@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import math
+import random
+import time
+import calendar
+
+from journal_mission import JournalMission
+
+# Configuration écrite dans les jeux générés (identique à celle du dépôt)
+CONFIG_SYSTEME = {
+    "centre_controle": "Houston-II",
+    "version_logiciel": "NavSys 4.7.2",
+    "frequence_telemetrie_sec": 30,
+    "seuils_alerte": {
+        "carburant_min_pourcent": 20.0,
+        "oxygene_min_pourcent": 85.0,
+        "temperature_cabine_min_c": 16.0,
+        "temperature_cabine_max_c": 28.0,
+        "vitesse_max_km_s": 15.0
+    },
+    "repertoires": {
+        "logs": "space_data/logs/",
+        "rapports": "space_data/rapports/",
+        "sauvegardes": "space_data/backups/",
+        "telemetrie_brute": "space_data/raw/"
+    },
+    "extensions_autorisees": [".json", ".csv", ".log", ".txt"]
+}
+
+PRENOMS = ["Léa", "Karim", "Yuki", "Elena", "Amir", "Sofia", "Tomás", "Ingrid", "Olusegun", "Chloé",
+           "Dmitri", "Aïcha", "Mateo", "Hannah", "Rajesh", "Zoé", "Björn", "Mei", "Jérôme", "Nadia"]
+NOMS = ["Fontaine", "Bensaïd", "Tanaka", "Voss", "Patel", "Reyes", "Guérin", "Larsen", "Adeyemi", "Moreau",
+        "Volkov", "Diallo", "Hernández", "Schäfer", "Iyer", "Lefèvre", "Nyström", "Chen", "Dubois", "Haddad"]
+NATIONALITES = ["France", "Algérie", "Japon", "Allemagne", "Inde", "Mexique", "Russie", "Nigeria",
+                "Suède", "Chine", "Canada", "Brésil"]
+GRADES = {"Commandant": "Cmdr.", "Spécialiste de mission": "Dr.", "Ingénieur de bord": "Ing.",
+          "Médecin de bord": "Dr.", "Biologiste": "Bio."}
+SPECIALITES = ["Pilotage & navigation", "Géologie planétaire", "Systèmes de propulsion", "Médecine spatiale",
+               "Robotique", "Astrobiologie", "Communications", "Support vie"]
+CERTIFICATIONS = ["EVA", "pilotage_manuel", "amarrage", "analyse_terrain", "chirurgie_urgence",
+                  "bras_robotique", "maintenance_propulsion"]
+DESTINATIONS = ["Lune", "Mars", "Jupiter (survol)", "Station orbitale", "Vénus (survol)", "Cérès"]
+STATUTS = ["en_cours", "planifiee", "terminee", "annulee"]
+NIVEAUX = ["INFO"] * 8 + ["WARNING", "CRITICAL"]
+MESSAGES = ["Correction de trajectoire appliquée", "Vérification des systèmes de bord",
+            "Légère déviation de trajectoire détectée", "Communication rétablie avec la Terre",
+            "Activation des rétrofusées", "Recalibrage de la navigation", "Relevé scientifique archivé"]
+
+
+def _ecrire_json(chemin, donnees):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(donnees, f, indent=2, ensure_ascii=False)
+
+
+def generer_astronautes(nombre, aleatoire):
+    """Registre d'astronautes aux noms uniques (suffixe numéroté au-delà des combinaisons de base)."""
+    astronautes = []
+    grades = list(GRADES)
+    for i in range(nombre):
+        nom = f"{PRENOMS[i % len(PRENOMS)]} {NOMS[(i // len(PRENOMS)) % len(NOMS)]}"
+        if i >= len(PRENOMS) * len(NOMS):
+            nom += f" {i // (len(PRENOMS) * len(NOMS)) + 1}"
+        missions = aleatoire.randint(0, 6)
+        astronautes.append({
+            "nom": nom,
+            "grade": aleatoire.choice(grades),
+            "nationalite": aleatoire.choice(NATIONALITES),
+            "missions_effectuees": missions,
+            "specialite": aleatoire.choice(SPECIALITES),
+            "heures_vol_spatial": missions * aleatoire.randint(200, 1500),
+            "certifications": aleatoire.sample(CERTIFICATIONS, aleatoire.randint(1, 4)),
+        })
+    return astronautes
+
+
+def generer_missions(nombre, astronautes, aleatoire):
+    """Missions MSN-001..., équipages tirés dans le registre (grade abrégé devant le nom)."""
+    missions = []
+    for i in range(nombre):
+        equipage = aleatoire.sample(astronautes, min(len(astronautes), aleatoire.randint(0, 5)))
+        lancement = time.gmtime(calendar.timegm((2024, 1, 1, 0, 0, 0)) + aleatoire.randint(0, 4 * 365) * 86400)
+        missions.append({
+            "id": f"MSN-{i + 1:03d}",
+            "nom": f"Expédition {i + 1}",
+            "destination": aleatoire.choice(DESTINATIONS),
+            "statut": "en_cours" if i == 0 else aleatoire.choice(STATUTS),
+            "equipage": [f"{GRADES[a['grade']]} {a['nom']}" for a in equipage],
+            "date_lancement": time.strftime("%Y-%m-%d", lancement),
+            "duree_prevue_jours": aleatoire.randint(7, 900),
+            "vaisseau": f"Vaisseau-{i + 1}",
+        })
+    return missions
+
+
+def iterer_releves_synthetiques(nombre, aleatoire, debut="2026-03-15T08:00:00Z", pas=30):
+    """Relevés réalistes au schéma de telemetrie.json, produits un par un.
+
+    Trajectoire spirale qui s'éloigne, vitesse et carburant décroissants ;
+    quelques relevés hors seuils et systèmes dégradés déclenchent des alertes.
+    """
+    t0 = calendar.timegm(time.strptime(debut, "%Y-%m-%dT%H:%M:%SZ"))
+    for i in range(nombre):
+        avancement = i / max(nombre - 1, 1)
+        angle = 6 * math.pi * avancement
+        rayon = 6771 + 378000 * avancement
+        etats = {"propulsion": "nominal", "communication": "nominal", "navigation": "nominal"}
+        if aleatoire.random() < 0.01:
+            etats[aleatoire.choice(list(etats))] = aleatoire.choice(["degradee", "recalibrage", "alerte_mineure"])
+        oxygene = 100 - 8 * avancement + aleatoire.gauss(0, 1)
+        if aleatoire.random() < 0.002:
+            oxygene = aleatoire.uniform(80, 85)
+        yield {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t0 + i * pas)),
+            "position_km": {"x": round(rayon * math.cos(angle), 1), "y": round(rayon * math.sin(angle), 1),
+                            "z": round(0.3 * rayon * avancement, 1)},
+            "vitesse_km_s": round(11.2 - 10 * avancement + aleatoire.gauss(0, 0.05) + (4.5 if aleatoire.random() < 0.001 else 0), 2),
+            "altitude_km": int(rayon - 6371),
+            "carburant_pourcent": round(max(0.0, 100 - 85 * avancement + aleatoire.gauss(0, 0.1)), 1),
+            "temperature_cabine_c": round(22 + aleatoire.gauss(0, 1.5) + (8 if aleatoire.random() < 0.001 else 0), 1),
+            "oxygene_pourcent": round(min(100.0, oxygene), 1),
+            "systemes": etats,
+        }
+
+
+def ecrire_telemetrie(chemin, releves, entete):
+    """Écrit un fichier de télémétrie JSON en flux (un relevé par ligne) ; retourne le nombre de relevés."""
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    nombre = 0
+    with open(chemin + ".tmp", 'w', encoding='utf-8') as f:
+        f.write("{\n")
+        for cle, valeur in entete.items():
+            f.write(f"  {json.dumps(cle)}: {json.dumps(valeur, ensure_ascii=False)},\n")
+        f.write('  "releves": [')
+        for releve in releves:
+            f.write(",\n    " if nombre else "\n    ")
+            f.write(json.dumps(releve, ensure_ascii=False))
+            nombre += 1
+        f.write("\n  ]\n}\n")
+    os.replace(chemin + ".tmp", chemin)
+    return nombre
+
+
+def generer_arborescence_brute(dossier, nb_fichiers, aleatoire, lignes_par_fichier=20):
+    """Fichiers bruts répartis en sous-dossiers (.ndjson, .csv, .log, .txt et extensions non autorisées)."""
+    extensions = [".ndjson", ".csv", ".log", ".txt", ".bin"]
+    for i in range(nb_fichiers):
+        sous_dossier = os.path.join(dossier, f"lot_{i // 1000:04d}", f"sous_{(i // 100) % 10}")
+        os.makedirs(sous_dossier, exist_ok=True)
+        extension = extensions[i % len(extensions)]
+        with open(os.path.join(sous_dossier, f"fichier_{i:07d}{extension}"), 'w', encoding='utf-8') as f:
+            if extension == ".ndjson":
+                # Même format que les dépôts du serveur d'ingestion
+                for releve in iterer_releves_synthetiques(lignes_par_fichier, aleatoire):
+                    f.write(json.dumps(dict(releve, mission_id=f"MSN-{i % 999 + 1:03d}"), ensure_ascii=False) + "\n")
+            else:
+                for k in range(lignes_par_fichier):
+                    f.write(f"{i},{k},{aleatoire.random():.6f}\n")
+
+
+def generer(racine, releves=1000, missions=3, astronautes=8, entrees_journal=100, fichiers_bruts=100,
+            lignes_log=1000, graine=42):
+    """Crée un jeu de données complet sous racine/space_data/ ; retourne sa description.
+
+    Les tailles sont libres (10³ à 10⁷ relevés, 10⁵ astronautes) : la
+    télémétrie est écrite en flux, sans tenir les relevés en mémoire.
+    """
+    aleatoire = random.Random(graine)
+    data = os.path.join(racine, 'space_data')
+    debut = time.perf_counter()
+
+    _ecrire_json(os.path.join(data, 'config_systeme.json'), CONFIG_SYSTEME)
+    registre = generer_astronautes(astronautes, aleatoire)
+    _ecrire_json(os.path.join(data, 'equipages.json'), {"astronautes": registre})
+    liste_missions = generer_missions(missions, registre, aleatoire)
+    _ecrire_json(os.path.join(data, 'missions.json'), {"missions": liste_missions})
+
+    premiere = liste_missions[0]
+    nb_releves = ecrire_telemetrie(os.path.join(data, 'telemetrie.json'),
+                                   iterer_releves_synthetiques(releves, aleatoire),
+                                   {"vaisseau": premiere["vaisseau"], "mission_id": premiere["id"]})
+
+    journal = JournalMission(os.path.join(data, 'logs', 'journal'))
+    journal.vider()
+    noms = [a["nom"] for a in registre] or ["Centre de contrôle"]
+    journal.ajouter_lot({
+        "date": time.strftime("%Y-%m-%d", time.gmtime(1767225600 + k * 3600)),
+        "auteur": aleatoire.choice(noms),
+        "message": aleatoire.choice(MESSAGES),
+        "mission": aleatoire.choice(liste_missions)["id"],
+    } for k in range(entrees_journal))
+
+    # Logs à l'ancien format texte : LogMission les archive à la première ouverture
+    with open(os.path.join(data, 'logs', f"{premiere['id']}.log"), 'w', encoding='utf-8') as f:
+        for k in range(lignes_log):
+            horodatage = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1767225600 + k * 60))
+            f.write(f"[{horodatage}] [{aleatoire.choice(NIVEAUX)}] {aleatoire.choice(MESSAGES)}\n")
+
+    generer_arborescence_brute(os.path.join(data, 'raw'), fichiers_bruts, aleatoire)
+    for nom in ('rapports', 'backups'):
+        os.makedirs(os.path.join(data, nom), exist_ok=True)
+
+    description = {
+        "racine": racine,
+        "releves": nb_releves,
+        "missions": missions,
+        "astronautes": astronautes,
+        "entrees_journal": entrees_journal,
+        "fichiers_bruts": fichiers_bruts,
+        "lignes_log": lignes_log,
+        "graine": graine,
+        "duree_generation_s": round(time.perf_counter() - debut, 3),
+    }
+    _ecrire_json(os.path.join(data, 'generation.json'), description)
+    return description
+
+
+def _taille(nom, defaut):
+    """Lit une option numérique ; accepte 1e6 ou 1000000."""
+    if nom in sys.argv:
+        return int(float(sys.argv[sys.argv.index(nom) + 1]))
+    return defaut
+
+
+if __name__ == '__main__':
+    # Usage : python generateur_donnees.py <racine> [--releves 1e6] [--missions n] [--astronautes 1e5]
+    #         [--journal n] [--bruts n] [--logs n] [--graine n]
+    racine = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith('--') else 'jeu_synthetique'
+    description = generer(racine, releves=_taille('--releves', 1000), missions=_taille('--missions', 3),
+                          astronautes=_taille('--astronautes', 8), entrees_journal=_taille('--journal', 100),
+                          fichiers_bruts=_taille('--bruts', 100), lignes_log=_taille('--logs', 1000),
+                          graine=_taille('--graine', 42))
+    print(f"[OK] Jeu de données généré en {description['duree_generation_s']}s dans {racine}/space_data/")
+    for cle in ("releves", "missions", "astronautes", "entrees_journal", "fichiers_bruts", "lignes_log"):
+        print(f"  - {cle} : {description[cle]:,}")
\ No newline at end of file
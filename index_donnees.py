@@ -0,0 +1,103 @@
+import os
+import unicodedata
+
+
+def nom_sans_grade(membre):
+    """Retire le grade d'un membre d'équipage ("Cmdr. Léa Fontaine" -> "Léa Fontaine")."""
+    return membre.split(". ")[-1] if ". " in membre else membre
+
+
+def normaliser_nom(nom):
+    """Clé de jointure : sans grade, insensible à la casse et aux espaces multiples."""
+    return " ".join(nom_sans_grade(nom).split()).casefold()
+
+
+def replier(texte):
+    """Minuscules sans accents : "Rétrofusées" -> "retrofusees"."""
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+def signature_fichiers(chemins):
+    """(mtime, taille) de chaque fichier, pour savoir s'il faut reconstruire l'index."""
+    signature = []
+    for chemin in chemins:
+        try:
+            st = os.stat(chemin)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class IndexMissions:
+    """Index en mémoire : missions par id, astronautes par nom, équipage de chaque mission.
+
+    Deux astronautes peuvent porter le même nom : le registre complet est
+    gardé dans liste_astronautes (recherche) et astronautes associe à
+    chaque nom normalisé la liste de ses profils, dans l'ordre du registre.
+    """
+
+    def __init__(self, missions, astronautes):
+        self.missions = {m['id']: m for m in missions}
+        self.liste_astronautes = list(astronautes)
+        self.astronautes = {}
+        for a in self.liste_astronautes:
+            self.astronautes.setdefault(normaliser_nom(a['nom']), []).append(a)
+        # Jointure mission -> profils précalculée une fois pour toutes
+        self.equipages = {
+            m['id']: [(membre, self.astronaute(membre)) for membre in m.get('equipage', [])]
+            for m in missions
+        }
+        self._recherche = None
+
+    def mission(self, mission_id):
+        return self.missions.get(mission_id)
+
+    def astronaute(self, nom):
+        """Premier profil du registre portant ce nom, ou None."""
+        homonymes = self.astronautes.get(normaliser_nom(nom))
+        return homonymes[0] if homonymes else None
+
+    def homonymes(self, nom):
+        """Tous les profils du registre portant ce nom."""
+        return list(self.astronautes.get(normaliser_nom(nom), []))
+
+    def equipage(self, mission_id):
+        """Liste de (membre tel qu'écrit dans la mission, profil ou None)."""
+        return self.equipages.get(mission_id, [])
+
+    def profils_equipage(self, mission_id):
+        """Profils connus de l'équipage (les membres absents du registre sont omis)."""
+        return [profil for _, profil in self.equipage(mission_id) if profil]
+
+    def recherche(self):
+        """Index de recherche (IndexEquipage) sur le registre, construit au premier appel."""
+        if self._recherche is None:
+            from index_equipage import IndexEquipage
+            self._recherche = IndexEquipage(self.liste_astronautes)
+        return self._recherche
+
+
+_cache = {}
+
+
+def obtenir_index(chemin_missions=None, chemin_equipages=None):
+    """Retourne l'index partagé, reconstruit seulement si sa source a changé.
+
+    Sans argument, la source est le stockage configuré (stockage_donnees) ;
+    des chemins explicites désignent des fichiers JSON.
+    """
+    from stockage_donnees import ouvrir_stockage, StockageJson
+    if chemin_missions or chemin_equipages:
+        source = StockageJson(chemin_missions=chemin_missions, chemin_equipages=chemin_equipages)
+    else:
+        source = ouvrir_stockage()
+    cle = source.cle()
+    signature = source.signature()
+    en_cache = _cache.get(cle)
+    if en_cache and en_cache[0] == signature:
+        return en_cache[1]
+    index = IndexMissions(source.missions(), source.astronautes())
+    _cache[cle] = (signature, index)
+    return index
\ No newline at end of file
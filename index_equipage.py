@@ -0,0 +1,255 @@
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import product
+
+from index_donnees import replier, obtenir_index
+
+# Champs indexés et leur poids dans le score d'un astronaute
+CHAMPS = (("nom", 3.0), ("nationalite", 2.0), ("specialite", 1.0), ("certifications", 1.0))
+# Qualité d'une correspondance entre un mot de la requête et un mot indexé
+EXACT = 1.0
+PREFIXE = 0.8
+INTERNE = 0.5       # mot de la requête contenu dans le mot indexé
+APPROCHE = 0.4      # faute de frappe (une erreur) ; -0.1 par erreur supplémentaire
+# Préfixe très répandu (« a ») : seuls les premiers mots, par ordre alphabétique, sont retenus
+MOTS_PAR_PREFIXE = 256
+LIMITE = 20
+# Mots alphanumériques : "pilotage_manuel" donne "pilotage" et "manuel"
+_MOT = re.compile(r"[^\W_]+")
+
+
+def _trigrammes(mot):
+    """Trigrammes du mot encadré par ^ et $ ("eva" -> ^ev, eva, va$)."""
+    borne = f"^{mot}$"
+    return {borne[i:i + 3] for i in range(len(borne) - 2)}
+
+
+def _en_bits(indices, octets):
+    """Indices -> entier dont le bit i vaut 1 pour chaque indice i."""
+    tampon = bytearray(octets)
+    for i in indices:
+        tampon[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(tampon, 'little')
+
+
+def _premiers_indices(bits, nombre):
+    """Les 'nombre' plus petits indices à 1 dans bits, par ordre croissant."""
+    indices = []
+    while bits and len(indices) < nombre:
+        bas = bits & -bits
+        indices.append(bas.bit_length() - 1)
+        bits ^= bas
+    return indices
+
+
+def _tolerance(mot):
+    """Nombre d'erreurs de frappe admises pour un mot de la requête."""
+    return 0 if len(mot) < 4 else 1 if len(mot) < 8 else 2
+
+
+def _distance(a, b, maximum):
+    """Distance d'édition (avec transpositions) ; maximum + 1 dès qu'elle est dépassée."""
+    if abs(len(a) - len(b)) > maximum:
+        return maximum + 1
+    avant, ligne = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        suivante = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cout = ca != cb
+            suivante[j] = min(ligne[j] + 1, suivante[j - 1] + 1, ligne[j - 1] + cout)
+            if avant and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                suivante[j] = min(suivante[j], avant[j - 2] + 1)
+        if min(suivante) > maximum:
+            return maximum + 1
+        avant, ligne = ligne, suivante
+    return ligne[-1]
+
+
+class IndexEquipage:
+    """Index de recherche sur les astronautes, insensible à la casse et aux accents.
+
+    Les mots repliés des CHAMPS forment un vocabulaire trié (préfixes par
+    dichotomie) ; les trigrammes de ce vocabulaire retrouvent les mots
+    contenant la requête et ceux à une ou deux fautes près. Pour chaque
+    (mot, champ), les astronautes concernés sont un array d'indices, ou un
+    entier utilisé comme ensemble de bits quand la liste est assez dense
+    pour que ce soit plus compact : unions et intersections se font alors
+    en une opération, quelle que soit la taille du registre.
+    """
+
+    def __init__(self, astronautes):
+        self.astronautes = list(astronautes)
+        self._octets = (len(self.astronautes) + 7) // 8
+        listes = {champ: {} for champ, _ in CHAMPS}   # champ -> mot -> array d'indices
+        replis = {}      # mot tel qu'écrit -> mot replié (prénoms, pays... se répètent)
+        for i, a in enumerate(self.astronautes):
+            for champ, listes_champ in listes.items():
+                valeur = a.get(champ)
+                if not valeur:
+                    continue
+                if isinstance(valeur, list):
+                    valeur = " ".join(map(str, valeur))
+                mots = set()
+                for brut in _MOT.findall(str(valeur)):
+                    mot = replis.get(brut)
+                    if mot is None:
+                        mot = replis[brut] = replier(brut)
+                    mots.add(mot)
+                for mot in mots:
+                    liste = listes_champ.get(mot)
+                    if liste is None:
+                        liste = listes_champ[mot] = array('I')
+                    liste.append(i)
+
+        self.listes = {}     # mot -> [(poids du champ, array ou bits)]
+        for champ, poids in CHAMPS:
+            for mot, liste in listes[champ].items():
+                # Bits plus compacts que l'array (4 octets par indice) au-delà d'un indice sur 32
+                if len(liste) * 32 >= len(self.astronautes):
+                    liste = _en_bits(liste, self._octets)
+                self.listes.setdefault(mot, []).append((poids, liste))
+        self.mots = sorted(self.listes)
+        self.trigrammes = {}  # trigramme -> numéros de mots du vocabulaire
+        for numero, mot in enumerate(self.mots):
+            for trigramme in _trigrammes(mot):
+                self.trigrammes.setdefault(trigramme, []).append(numero)
+
+    def __len__(self):
+        return len(self.astronautes)
+
+    def mots_proches(self, q):
+        """{mot indexé: qualité} pour un mot replié de la requête."""
+        trouves = {}
+        # Préfixes (dont le mot exact) : plage contiguë du vocabulaire trié
+        k = bisect_left(self.mots, q)
+        for mot in self.mots[k:k + MOTS_PAR_PREFIXE]:
+            if not mot.startswith(q):
+                break
+            trouves[mot] = EXACT if mot == q else PREFIXE
+        if len(q) < 3:
+            return trouves
+
+        # Mots contenant q ou à quelques fautes près : candidats partageant assez de trigrammes
+        tolerance = _tolerance(q)
+        trigrammes_q = _trigrammes(q)
+        communs = Counter()
+        for trigramme in trigrammes_q:
+            communs.update(self.trigrammes.get(trigramme, ()))
+        seuil = max(1, min(len(q) - 2, len(trigrammes_q) - 3 * tolerance))
+        for numero, nombre in communs.items():
+            if nombre < seuil:
+                continue
+            mot = self.mots[numero]
+            if mot in trouves:
+                continue
+            if q in mot:
+                trouves[mot] = INTERNE
+            elif tolerance:
+                erreurs = _distance(q, mot, tolerance)
+                if erreurs <= tolerance:
+                    trouves[mot] = APPROCHE - 0.1 * (erreurs - 1)
+        return trouves
+
+    def _classes(self, q):
+        """Partition (bits de tous les astronautes trouvés, [(score, bits)] par score décroissant).
+
+        Chaque astronaute n'apparaît que dans la classe de sa meilleure
+        correspondance avec le mot q.
+        """
+        par_score = {}
+        for mot, qualite in self.mots_proches(q).items():
+            for poids, liste in self.listes[mot]:
+                score = round(qualite * poids, 6)
+                bits = liste if isinstance(liste, int) else _en_bits(liste, self._octets)
+                par_score[score] = par_score.get(score, 0) | bits
+        classes, couverts = [], 0
+        for score in sorted(par_score, reverse=True):
+            bits = par_score[score] & ~couverts
+            if bits:
+                classes.append((score, bits))
+                couverts |= bits
+        return couverts, classes
+
+    def rechercher(self, requete, limite=LIMITE):
+        """(nombre de correspondances, [(score, astronaute)] les mieux classés).
+
+        Chaque mot de la requête doit correspondre (exact, préfixe, contenu
+        ou approché) à un mot d'un champ de l'astronaute ; le score additionne,
+        pour chaque mot, la meilleure qualité pondérée par le champ. À score
+        égal, l'ordre du registre est conservé. Une requête vide rend tout le
+        registre.
+        """
+        mots_requete = list(dict.fromkeys(_MOT.findall(replier(requete))))
+        if not mots_requete:
+            return len(self.astronautes), [(0.0, a) for a in self.astronautes[:limite]]
+
+        trouves = -1
+        classes_par_mot = []
+        for q in mots_requete:
+            couverts, classes = self._classes(q)
+            trouves &= couverts
+            if not trouves:
+                return 0, []
+            classes_par_mot.append(classes)
+
+        # Score total par combinaison de classes (quelques-unes par mot) : aucun calcul par astronaute
+        par_score = {}
+        for combinaison in product(*classes_par_mot):
+            bits = trouves
+            for _, classe in combinaison:
+                bits &= classe
+                if not bits:
+                    break
+            else:
+                score = round(sum(s for s, _ in combinaison), 6)
+                par_score[score] = par_score.get(score, 0) | bits
+
+        resultats = []
+        for score in sorted(par_score, reverse=True):
+            for i in _premiers_indices(par_score[score], limite - len(resultats)):
+                resultats.append((score, self.astronautes[i]))
+            if len(resultats) >= limite:
+                break
+        return trouves.bit_count(), resultats
+
+
+def afficher_resultats(total, resultats):
+    if not resultats:
+        print("Aucune correspondance.")
+    for _, a in resultats:
+        print(f"- {a['nom']} ({a['nationalite']}) — {a['specialite']}")
+    if total > len(resultats):
+        print(f"... et {total - len(resultats)} autres (précisez la recherche)")
+
+
+def rechercher_equipage(requete, limite=LIMITE):
+    """Point d'entrée du menu : index du registre courant (reconstruit s'il a changé), puis requête."""
+    total, resultats = obtenir_index().recherche().rechercher(requete, limite)
+    afficher_resultats(total, resultats)
+    return total, resultats
+
+
+def _option(nom, defaut, conversion=int):
+    if nom in sys.argv:
+        return conversion(sys.argv[sys.argv.index(nom) + 1])
+    return defaut
+
+
+if __name__ == '__main__':
+    # Usage : python index_equipage.py mots de la requête [--limite 20]
+    limite = _option('--limite', LIMITE)
+    arguments = sys.argv[1:]
+    if '--limite' in arguments:
+        del arguments[arguments.index('--limite'):arguments.index('--limite') + 2]
+    debut = time.perf_counter()
+    index = obtenir_index().recherche()
+    construction = time.perf_counter() - debut
+    debut = time.perf_counter()
+    total, resultats = index.rechercher(" ".join(arguments), limite)
+    requete = time.perf_counter() - debut
+    afficher_resultats(total, resultats)
+    print(f"\n{len(index):,} astronautes indexés en {construction * 1000:.1f} ms ; requête : {requete * 1000:.3f} ms")
\ No newline at end of file
@@ -0,0 +1,407 @@
+import os
+import re
+import sys
+import shlex
+import gzip
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+from log_mission import DOSSIER_LOGS, lire_ligne
+from stockage_donnees import ouvrir_stockage, verrou_fichier
+from index_donnees import replier
+from instrumentation import mesure, action, configurer
+
+DOSSIER_INDEX = 'space_data/logs/index/'
+# Le dictionnaire des postings est réécrit quand autant de documents l'ont suivi
+SEUIL_INSTANTANE = 2000
+TAILLE_OFFSET = array('Q').itemsize
+# Version des clés d'index : un instantané de postings d'une autre version est reconstruit
+FORMAT_POSTINGS = 2
+
+# Anciens formats de log : "[2026-02-19 07:31:13] [INFO] message" et "[CRITIQUE] Type: message"
+_LIGNE_ANCIENNE = re.compile(r"\[(\d{4}-\d\d-\d\d)[ T](\d\d:\d\d:\d\d)\] \[(\w+)\] (.*)")
+_CRITIQUE_ANCIEN = re.compile(r"\[(CRITIQUE|CRITICAL)\] (.*)")
+_JOUR = re.compile(r"\d{4}-\d\d-\d\d")
+_MOT = re.compile(r"\w{2,}")
+
+
+def termes(texte):
+    """Termes indexés d'un texte (mots d'au moins deux caractères, repliés)."""
+    return set(_MOT.findall(replier(texte)))
+
+
+def _cles(document):
+    """Clés d'index d'un document : 'champ:valeur'."""
+    cles = {f"source:{document['source']}"}
+    if document.get("mission"):
+        cles.add(f"mission:{document['mission']}")
+    if document.get("niveau"):
+        cles.add(f"niveau:{document['niveau'].upper()}")
+    # Un mot du nom suffit : 'auteur=fontaine' retrouve « Léa Fontaine »
+    cles.update(f"auteur:{t}" for t in termes(document.get("auteur", "")))
+    jour = str(document.get("date", ""))[:10]
+    if _JOUR.fullmatch(jour):
+        cles.add(f"jour:{jour}")
+    cles.update(f"terme:{t}" for t in termes(f"{document.get('message', '')} {document.get('auteur', '')}"))
+    return cles
+
+
+def _documents_log(contenu, mission_id, origine):
+    """Documents tirés de lignes de log (format actuel ou ancien)."""
+    for ligne in contenu.decode("utf-8", errors="replace").splitlines():
+        enregistrement = lire_ligne(ligne)
+        if enregistrement is not None:
+            yield {"source": "log", "date": enregistrement["horodatage"], "mission": enregistrement["mission"],
+                   "niveau": enregistrement["niveau"], "message": enregistrement["message"], "origine": origine}
+            continue
+        ancienne = _LIGNE_ANCIENNE.match(ligne)
+        if ancienne:
+            jour, heure, niveau, message = ancienne.groups()
+            yield {"source": "log", "date": f"{jour}T{heure}", "mission": mission_id,
+                   "niveau": niveau, "message": message, "origine": origine}
+            continue
+        critique = _CRITIQUE_ANCIEN.match(ligne)
+        if critique:
+            yield {"source": "log", "date": "", "mission": mission_id,
+                   "niveau": "CRITICAL", "message": critique.group(2), "origine": origine}
+
+
+def _premiere_ligne(contenu):
+    return contenu[:contenu.find(b"\n") + 1].decode("utf-8", errors="replace")
+
+
+class IndexJournaux:
+    """Index inversé des logs de mission et du journal de bord.
+
+    Les documents indexés (une ligne de log ou une entrée du journal) sont
+    copiés dans documents.ndjson avec un index d'offsets : une requête lit
+    les postings puis les seuls documents retenus, jamais les fichiers
+    sources. La mise à jour ne lit que ce qui a été ajouté depuis la
+    précédente (octets de log au-delà de l'offset indexé, entrées du
+    journal au-delà de la position indexée), rotations de logs comprises.
+
+    Ouverture et mise à jour prennent le verrou du dossier d'index entre
+    processus ; la mise à jour reprend d'abord les documents ajoutés par
+    un autre processus depuis l'ouverture.
+    """
+
+    def __init__(self, dossier=DOSSIER_INDEX, dossier_logs=DOSSIER_LOGS):
+        self.dossier = dossier
+        self.dossier_logs = dossier_logs
+        os.makedirs(dossier, exist_ok=True)
+        self.chemin_documents = os.path.join(dossier, 'documents.ndjson')
+        self.chemin_offsets = os.path.join(dossier, 'documents.idx')
+        self.chemin_etat = os.path.join(dossier, 'etat.json')
+        self.chemin_postings = os.path.join(dossier, 'postings.json')
+        self.verrou = os.path.join(dossier, 'index')
+
+        with verrou_fichier(self.verrou):
+            self._charger()
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+    def _lire_etat(self):
+        try:
+            with open(self.chemin_etat, 'r', encoding='utf-8') as f:
+                self.etat = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.etat = {"documents": 0, "logs": {}, "archives": [], "journal": 0}
+
+    def _charger(self):
+        self._lire_etat()
+        self._reparer()
+        self.offsets = array('Q')
+        if os.path.exists(self.chemin_offsets):
+            with open(self.chemin_offsets, 'rb') as f:
+                self.offsets.frombytes(f.read())
+        self._charger_postings()
+
+    def _rattraper(self):
+        """Reprend les documents indexés par un autre processus depuis l'ouverture (verrou pris)."""
+        connus = len(self.offsets)
+        self._lire_etat()
+        self._reparer()
+        if self.etat["documents"] < connus:
+            # Index reconstruit entre-temps
+            self._charger()
+        elif self.etat["documents"] > connus:
+            with open(self.chemin_offsets, 'rb') as f:
+                f.seek(connus * TAILLE_OFFSET)
+                self.offsets.frombytes(f.read((self.etat["documents"] - connus) * TAILLE_OFFSET))
+            for identifiant, document in self._lire_documents(range(connus, len(self.offsets))):
+                self._indexer(identifiant, document)
+
+    def _reparer(self):
+        """Coupe les documents écrits après le dernier état enregistré (arrêt brutal)."""
+        if not os.path.exists(self.chemin_offsets):
+            # Sans index d'offsets, rien n'est récupérable : tout est réindexé
+            self.etat = {"documents": 0, "logs": {}, "archives": [], "journal": 0}
+            if os.path.exists(self.chemin_documents):
+                os.remove(self.chemin_documents)
+            return
+        nombre = self.etat["documents"]
+        if os.path.getsize(self.chemin_offsets) > nombre * TAILLE_OFFSET:
+            with open(self.chemin_offsets, 'rb+') as f:
+                if nombre:
+                    f.seek((nombre - 1) * TAILLE_OFFSET)
+                    dernier = array('Q', f.read(TAILLE_OFFSET))[0]
+                f.truncate(nombre * TAILLE_OFFSET)
+            with open(self.chemin_documents, 'rb+') as f:
+                if nombre:
+                    f.seek(dernier)
+                    f.readline()
+                    f.truncate(f.tell())
+                else:
+                    f.truncate(0)
+
+    def _charger_postings(self):
+        self.postings = {}
+        instantane = 0
+        try:
+            with open(self.chemin_postings, 'r', encoding='utf-8') as f:
+                contenu = json.load(f)
+            if contenu.get("format") == FORMAT_POSTINGS and contenu["documents"] <= len(self.offsets):
+                instantane = contenu["documents"]
+                self.postings = {cle: array('I', ids) for cle, ids in contenu["postings"].items()}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        self.instantane = instantane
+        # Documents postérieurs à l'instantané : rejoués depuis le magasin de documents
+        for identifiant, document in self._lire_documents(range(instantane, len(self.offsets))):
+            self._indexer(identifiant, document)
+        if instantane == 0 and len(self.offsets):
+            # Instantané absent ou d'un ancien format : la reconstruction est conservée
+            self._sauver_postings()
+
+    def _sauver_postings(self):
+        with open(self.chemin_postings + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"format": FORMAT_POSTINGS, "documents": len(self.offsets),
+                       "postings": {cle: ids.tolist() for cle, ids in self.postings.items()}}, f)
+        os.replace(self.chemin_postings + ".tmp", self.chemin_postings)
+        self.instantane = len(self.offsets)
+
+    def _sauver_etat(self):
+        self.etat["documents"] = len(self.offsets)
+        with open(self.chemin_etat + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.etat, f, ensure_ascii=False)
+        os.replace(self.chemin_etat + ".tmp", self.chemin_etat)
+
+    def _indexer(self, identifiant, document):
+        for cle in _cles(document):
+            ids = self.postings.get(cle)
+            if ids is None:
+                ids = self.postings[cle] = array('I')
+            ids.append(identifiant)
+
+    def _ajouter(self, documents):
+        """Copie les documents dans le magasin et les indexe ; retourne leur nombre."""
+        nombre = 0
+        with open(self.chemin_documents, 'ab') as f, open(self.chemin_offsets, 'ab') as f_idx:
+            offset = f.tell()
+            nouveaux = array('Q')
+            for document in documents:
+                ligne = json.dumps(document, ensure_ascii=False).encode('utf-8') + b"\n"
+                f.write(ligne)
+                nouveaux.append(offset)
+                offset += len(ligne)
+                self._indexer(len(self.offsets) + len(nouveaux) - 1, document)
+                nombre += 1
+            f.flush()
+            # Les offsets ne sont écrits qu'une fois les documents sur disque
+            f_idx.write(nouveaux.tobytes())
+        self.offsets.extend(nouveaux)
+        return nombre
+
+    def _lire_documents(self, identifiants):
+        if not len(identifiants):
+            return
+        with open(self.chemin_documents, 'rb') as f:
+            for identifiant in identifiants:
+                f.seek(self.offsets[identifiant])
+                yield identifiant, json.loads(f.readline())
+
+    # ------------------------------------------------------------------
+    # Mise à jour incrémentale
+    # ------------------------------------------------------------------
+    def mettre_a_jour(self):
+        """Indexe ce qui a été écrit depuis la dernière mise à jour ; retourne le nombre de documents ajoutés."""
+        with verrou_fichier(self.verrou):
+            self._rattraper()
+            return self._mettre_a_jour()
+
+    def _mettre_a_jour(self):
+        ajoutes = 0
+        noms = sorted(os.listdir(self.dossier_logs)) if os.path.isdir(self.dossier_logs) else []
+        # Archives supprimées depuis : oubliées (leurs documents restent indexés)
+        presentes = set(noms)
+        indexees = [nom for nom in self.etat["archives"] if nom in presentes]
+        elaguees = len(indexees) != len(self.etat["archives"])
+        self.etat["archives"] = indexees
+        indexees = set(indexees)
+        # Archives d'abord : une rotation a pu emporter la fin du log courant déjà indexé en partie
+        archives = [nom for nom in noms if nom.endswith(".log.gz") and nom not in indexees]
+        archives.sort(key=lambda nom: os.path.getmtime(os.path.join(self.dossier_logs, nom)))
+        for nom in archives:
+            mission_id = nom.split(".")[0]
+            with gzip.open(os.path.join(self.dossier_logs, nom), 'rb') as f:
+                contenu = f.read()
+            suivi = self.etat["logs"].get(f"{mission_id}.log")
+            debut = 0
+            if suivi and suivi["premiere_ligne"] == _premiere_ligne(contenu):
+                debut = suivi["offset"]
+                del self.etat["logs"][f"{mission_id}.log"]
+            ajoutes += self._ajouter(_documents_log(contenu[debut:], mission_id, nom))
+            self.etat["archives"].append(nom)
+
+        for nom in noms:
+            if not nom.endswith(".log"):
+                continue
+            with open(os.path.join(self.dossier_logs, nom), 'rb') as f:
+                premiere = f.readline().decode("utf-8", errors="replace")
+                suivi = self.etat["logs"].get(nom)
+                if not suivi or suivi["premiere_ligne"] != premiere:
+                    suivi = self.etat["logs"][nom] = {"premiere_ligne": premiere, "offset": 0}
+                f.seek(suivi["offset"])
+                contenu = f.read()
+            # Une ligne en cours d'écriture sera lue à la prochaine mise à jour
+            contenu = contenu[:contenu.rfind(b"\n") + 1]
+            ajoutes += self._ajouter(_documents_log(contenu, nom[:-4], nom))
+            suivi["offset"] += len(contenu)
+
+        journal = ouvrir_stockage().journal()
+        documents = []
+        for position, entree in journal.entrees_depuis(self.etat["journal"]):
+            documents.append({"source": "journal", "date": str(entree.get("date", "")),
+                              "mission": entree.get("mission"), "auteur": str(entree.get("auteur", "")),
+                              "message": str(entree.get("message", "")), "position": position})
+            self.etat["journal"] = position + 1
+        ajoutes += self._ajouter(documents)
+
+        if ajoutes or elaguees or not os.path.exists(self.chemin_etat):
+            self._sauver_etat()
+            if len(self.offsets) - self.instantane >= SEUIL_INSTANTANE:
+                self._sauver_postings()
+        return ajoutes
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    def _jours(self, debut, fin):
+        """Documents datés entre debut et fin (YYYY-MM-DD inclus)."""
+        jours = sorted(cle for cle in self.postings if cle.startswith("jour:"))
+        k0 = bisect_left(jours, f"jour:{debut[:10]}") if debut else 0
+        k1 = bisect_right(jours, f"jour:{fin[:10]}") if fin else len(jours)
+        ids = set()
+        for cle in jours[k0:k1]:
+            ids.update(self.postings[cle])
+        return ids
+
+    def rechercher(self, mission=None, niveau=None, auteur=None, debut=None, fin=None, texte=None,
+                   source=None, limite=50):
+        """Documents correspondant à tous les critères donnés, du plus ancien au plus récent.
+
+        debut et fin sont des dates 'YYYY-MM-DD' (incluses) ; texte et auteur
+        sont des suites de mots qui doivent tous apparaître (casse et accents
+        ignorés).
+        Seuls les 'limite' documents les plus récents sont lus et rendus.
+        """
+        cles = []
+        if mission:
+            cles.append(f"mission:{mission}")
+        if niveau:
+            cles.append(f"niveau:{niveau.upper()}")
+        if auteur:
+            cles += [f"auteur:{t}" for t in termes(auteur)]
+        if source:
+            cles.append(f"source:{source}")
+        if texte:
+            cles += [f"terme:{t}" for t in termes(texte)]
+        listes = [self.postings.get(cle, ()) for cle in cles]
+        listes.sort(key=len)
+        if debut or fin:
+            listes.insert(0, self._jours(debut, fin))
+        if listes:
+            ids = set(listes[0])
+            for liste in listes[1:]:
+                if not ids:
+                    break
+                ids.intersection_update(liste)
+        else:
+            ids = range(len(self.offsets))
+        retenus = sorted(ids)[-limite:] if limite else sorted(ids)
+        return [document for _, document in self._lire_documents(retenus)]
+
+
+def analyser_criteres(texte):
+    """'mission=MSN-001 auteur="Léa Fontaine" rétrofusées' -> arguments de rechercher().
+
+    Les guillemets regroupent une valeur de plusieurs mots. Si une apostrophe
+    (« l'orbite ») rend le texte inanalysable, seuls les guillemets doubles
+    comptent, puis, à défaut, on découpe simplement sur les espaces.
+    Lève ValueError si 'limite' n'est pas un entier positif ou nul.
+    """
+    try:
+        morceaux = shlex.split(texte)
+    except ValueError:
+        lexeur = shlex.shlex(texte, posix=True)
+        lexeur.whitespace_split = True
+        lexeur.quotes = '"'
+        try:
+            morceaux = list(lexeur)
+        except ValueError:
+            morceaux = texte.split()
+    criteres = {}
+    mots = []
+    for morceau in morceaux:
+        cle, egal, valeur = morceau.partition("=")
+        if egal and cle == "limite":
+            try:
+                limite = int(valeur)
+            except ValueError:
+                limite = None
+            if limite is None or limite < 0:
+                raise ValueError(f"critère invalide : limite={valeur} (entier positif ou nul attendu)")
+            criteres[cle] = limite
+        elif egal and cle in ("mission", "niveau", "auteur", "debut", "fin", "source"):
+            criteres[cle] = valeur
+        else:
+            mots.append(morceau)
+    if mots:
+        criteres["texte"] = " ".join(mots)
+    return criteres
+
+
+def afficher_resultats(documents):
+    if not documents:
+        print("Aucun résultat.")
+    for d in documents:
+        if d["source"] == "journal":
+            print(f"[{d['date']}] journal — {d['auteur']} : {d['message']}")
+        else:
+            print(f"[{d['date']}] {d.get('mission') or '?'} {d['niveau']} : {d['message']}")
+
+
+def rechercher_journaux(texte_criteres):
+    """Point d'entrée du menu : met l'index à jour puis exécute la requête."""
+    try:
+        criteres = analyser_criteres(texte_criteres)
+    except ValueError as e:
+        print(f"[ERREUR] {e}")
+        return []
+    index = IndexJournaux()
+    with mesure("indexation"):
+        index.mettre_a_jour()
+    with mesure("recherche"):
+        documents = index.rechercher(**criteres)
+    with mesure("rendu"):
+        afficher_resultats(documents)
+    return documents
+
+
+if __name__ == '__main__':
+    # Usage : python index_journaux.py [mission=..] [niveau=..] [auteur=..] [debut=YYYY-MM-DD] [fin=..] [mots...] [--mesures] [--profil]
+    configurer()
+    with action("recherche_journaux"):
+        rechercher_journaux(shlex.join(a for a in sys.argv[1:] if a not in ("--mesures", "--profil")))
\ No newline at end of file
@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import math
+import time
+import heapq
+import operator
+from array import array
+from collections import defaultdict
+from itertools import product, compress, repeat, count
+
+# Taille d'une cellule de la grille (km) et d'une tranche de temps (s) par défaut
+TAILLE_CELLULE = 5000.0
+PAS_TEMPS = 3600.0
+RAPPORT_CONJONCTIONS = 'space_data/rapports/conjonctions.json'
+# Cases du dépistage : FACTEUR_CASES fois le rayon et l'écart de temps
+FACTEUR_CASES = 8
+
+# Les 81 décalages (temps, x, y, z) d'une case vers ses voisines, elle comprise
+_VOISINAGE = list(product((-1, 0, 1), repeat=4))
+
+
+def _fini(e, x, y, z):
+    return e == e and x == x and y == y and z == z
+
+
+def _indices_cellules(valeurs, pas):
+    """floor(v / pas) pour toute une colonne (boucle en C via map)."""
+    return list(map(math.floor, map(operator.truediv, valeurs, repeat(pas))))
+
+
+def _colonnes_valides(epochs, xs, ys, zs):
+    """Les quatre colonnes privées des points contenant un NaN."""
+    # Une somme non NaN garantit l'absence de NaN sans boucle Python
+    if not any(math.isnan(sum(col)) for col in (epochs, xs, ys, zs)):
+        return epochs, xs, ys, zs
+    masque = list(map(_fini, epochs, xs, ys, zs))
+    return tuple(array('d', compress(col, masque)) for col in (epochs, xs, ys, zs))
+
+
+class IndexSpatial:
+    """Grille espace-temps sur les points de trajectoire de plusieurs missions.
+
+    Un point est rangé dans la case (tranche de temps, ix, iy, iz) ; chaque
+    cellule spatiale connaît ses tranches de temps occupées. Une requête ne
+    visite que les cellules qui recoupent sa boule, et dans chacune les
+    seules tranches de sa fenêtre de temps. Les points sont stockés en
+    colonnes (array) et les cases ne gardent que des indices.
+    """
+
+    def __init__(self, taille_cellule=TAILLE_CELLULE, pas_temps=PAS_TEMPS):
+        self.taille_cellule = float(taille_cellule)
+        self.pas_temps = float(pas_temps)
+        self.missions = []            # indice -> mission_id
+        self.mission = array('H')     # indice de mission de chaque point
+        self.epoch = array('d')
+        self.x = array('d')
+        self.y = array('d')
+        self.z = array('d')
+        self.cases = defaultdict(list)
+        self.tranches = defaultdict(set)   # (ix, iy, iz) -> tranches de temps occupées
+        self._etendue = None               # (min, max) des indices de cellule par axe
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def ajouter(self, mission_id, epochs, xs, ys, zs):
+        """Ajoute une trajectoire (colonnes epoch, x, y, z) ; les points NaN sont ignorés."""
+        if mission_id not in self.missions:
+            self.missions.append(mission_id)
+        epochs, xs, ys, zs = _colonnes_valides(epochs, xs, ys, zs)
+        c = self.taille_cellule
+        cles = list(zip(_indices_cellules(epochs, self.pas_temps), _indices_cellules(xs, c),
+                        _indices_cellules(ys, c), _indices_cellules(zs, c)))
+        cases = self.cases
+        for cle, i in zip(cles, count(len(self.epoch))):
+            cases[cle].append(i)
+        for cle in set(cles):
+            self.tranches[cle[1:]].add(cle[0])
+        self.mission.extend(repeat(self.missions.index(mission_id), len(epochs)))
+        self.epoch.extend(epochs)
+        self.x.extend(xs)
+        self.y.extend(ys)
+        self.z.extend(zs)
+        self._etendue = None
+
+    def ajouter_colonnes(self, mission_id, colonnes):
+        """Ajoute les positions de TelemetrieColonnes (ou TelemetrieBinaire)."""
+        self.ajouter(mission_id, colonnes.epoch, colonnes.x, colonnes.y, colonnes.z)
+
+    def _points_cellule(self, cellule, debut, fin):
+        """Indices des points d'une cellule spatiale dont l'epoch est dans [debut, fin]."""
+        tranches = self.tranches.get(cellule)
+        if not tranches:
+            return
+        t0 = math.floor(debut / self.pas_temps) if debut > -math.inf else -math.inf
+        t1 = math.floor(fin / self.pas_temps) if fin < math.inf else math.inf
+        for tranche in tranches:
+            if t0 <= tranche <= t1:
+                for i in self.cases[(tranche,) + cellule]:
+                    if debut <= self.epoch[i] <= fin:
+                        yield i
+
+    def _resultat(self, i, distance):
+        return (distance, self.missions[self.mission[i]], self.epoch[i], self.x[i], self.y[i], self.z[i])
+
+    def dans_rayon(self, point, rayon, debut=None, fin=None):
+        """Points à moins de 'rayon' km de point=(x, y, z), entre debut et fin (epoch).
+
+        Retourne une liste de (distance, mission_id, epoch, x, y, z) triée par distance.
+        """
+        px, py, pz = point
+        c = self.taille_cellule
+        bornes = [range(math.floor((v - rayon) / c), math.floor((v + rayon) / c) + 1) for v in point]
+        debut = -math.inf if debut is None else debut
+        fin = math.inf if fin is None else fin
+        rayon2 = rayon * rayon
+        resultat = []
+        for cellule in product(*bornes):
+            for i in self._points_cellule(cellule, debut, fin):
+                dx, dy, dz = self.x[i] - px, self.y[i] - py, self.z[i] - pz
+                d2 = dx * dx + dy * dy + dz * dz
+                if d2 <= rayon2:
+                    resultat.append(self._resultat(i, math.sqrt(d2)))
+        resultat.sort()
+        return resultat
+
+    def plus_proches(self, point, k=1, debut=None, fin=None, exclure=None):
+        """Les k points les plus proches de point=(x, y, z) dans la fenêtre de temps.
+
+        La recherche s'étend anneau par anneau de cellules et s'arrête dès
+        que l'anneau suivant ne peut plus contenir de point plus proche.
+        'exclure' écarte une mission (ex. le vaisseau qui fait la requête).
+        """
+        if not len(self):
+            return []
+        c = self.taille_cellule
+        centre = [math.floor(v / c) for v in point]
+        if self._etendue is None:
+            self._etendue = [(min(cel[a] for cel in self.tranches), max(cel[a] for cel in self.tranches))
+                             for a in range(3)]
+        # Anneau au-delà duquel plus aucune cellule occupée n'existe
+        anneau_max = max(0, max(max(centre[a] - bas, haut - centre[a]) for a, (bas, haut) in enumerate(self._etendue)))
+        debut = -math.inf if debut is None else debut
+        fin = math.inf if fin is None else fin
+        m_exclue = self.missions.index(exclure) if exclure in self.missions else -1
+        px, py, pz = point
+        meilleurs = []   # tas max (distance négative) des k meilleurs
+        for anneau in range(anneau_max + 1):
+            for dx, dy, dz in product(range(-anneau, anneau + 1), repeat=3):
+                if max(abs(dx), abs(dy), abs(dz)) != anneau:
+                    continue
+                for i in self._points_cellule((centre[0] + dx, centre[1] + dy, centre[2] + dz), debut, fin):
+                    if self.mission[i] == m_exclue:
+                        continue
+                    d = math.sqrt((self.x[i] - px) ** 2 + (self.y[i] - py) ** 2 + (self.z[i] - pz) ** 2)
+                    if len(meilleurs) < k:
+                        heapq.heappush(meilleurs, (-d, i))
+                    elif d < -meilleurs[0][0]:
+                        heapq.heapreplace(meilleurs, (-d, i))
+            # Tout point d'un anneau plus lointain est à plus de anneau * c
+            if len(meilleurs) == k and -meilleurs[0][0] <= anneau * c:
+                break
+        return sorted(self._resultat(i, -d) for d, i in meilleurs)
+
+
+def depister_conjonctions(trajectoires, rayon, ecart_temps, facteur=FACTEUR_CASES):
+    """Paires de points de missions différentes à moins de 'rayon' km et 'ecart_temps' s.
+
+    trajectoires : {mission_id: colonnes (epoch, x, y, z)}. Les cases font
+    'facteur' fois 'rayon' km et 'ecart_temps' s, si bien que toute paire
+    candidate se trouve dans deux cases voisines (de grandes cases limitent
+    le nombre de voisinages à parcourir). Les cases sont codées par un entier :
+    pour chaque mission, l'intersection (en C) de ses cases décalées avec
+    les cases des missions suivantes ne garde que les voisinages où une
+    conjonction est possible. Le coût suit le nombre de cases, pas n².
+    Retourne {(mission_a, mission_b): rapprochement} trié par distance minimale.
+    """
+    missions = sorted(trajectoires)
+    mission, epoch, x, y, z = array('H'), array('d'), array('d'), array('d'), array('d')
+    limites = [0]   # points de la mission m : [limites[m], limites[m + 1])
+    for m, mission_id in enumerate(missions):
+        colonnes = trajectoires[mission_id]
+        e, cx, cy, cz = _colonnes_valides(colonnes.epoch, colonnes.x, colonnes.y, colonnes.z)
+        mission.extend(repeat(m, len(e)))
+        limites.append(limites[-1] + len(e))
+        for total, partie in ((epoch, e), (x, cx), (y, cy), (z, cz)):
+            total.extend(partie)
+    if not len(epoch):
+        return {}
+
+    # Indices de case décalés pour être >= 1, avec une marge d'une case de chaque côté :
+    # le voisin d'une case valide ne peut pas « déborder » sur une autre ligne
+    axes = [_indices_cellules(epoch, ecart_temps * facteur)] + [_indices_cellules(col, rayon * facteur) for col in (x, y, z)]
+    tailles = []
+    for axe in axes:
+        minimum = min(axe)
+        axe[:] = map(operator.sub, axe, repeat(minimum - 1))
+        tailles.append(max(axe) + 2)
+    poids = [tailles[1] * tailles[2] * tailles[3], tailles[2] * tailles[3], tailles[3], 1]
+    cles = list(map(operator.add,
+                    map(operator.add, map(operator.mul, axes[0], repeat(poids[0])),
+                        map(operator.mul, axes[1], repeat(poids[1]))),
+                    map(operator.add, map(operator.mul, axes[2], repeat(poids[2])), axes[3])))
+    decalages = [sum(d * p for d, p in zip(decalage, poids)) for decalage in _VOISINAGE]
+
+    # Points de chaque case par mission, et plus grande mission présente par case
+    cases = defaultdict(list)
+    for cle, i in zip(cles, count()):
+        cases[cle].append(i)
+    cles_par_mission = [set(cles[limites[m]:limites[m + 1]]) for m in range(len(missions))]
+    # Points rangés par mission croissante : la dernière valeur écrite est la plus grande
+    mission_max = dict(zip(cles, mission))
+    par_mission_max = [set() for _ in missions]
+    for cle, m in mission_max.items():
+        par_mission_max[m].add(cle)
+
+    rayon2 = rayon * rayon
+    paires = {}
+    suivantes = set()   # cases contenant au moins une mission d'indice > m
+    for m in range(len(missions) - 2, -1, -1):
+        suivantes |= par_mission_max[m + 1]
+        propres = cles_par_mission[m]
+        for decalage in decalages:
+            for cle_b in suivantes.intersection(map(decalage.__add__, propres)):
+                points_b = [j for j in cases[cle_b] if mission[j] > m]
+                for i in cases[cle_b - decalage]:
+                    if mission[i] != m:
+                        continue
+                    ei, xi, yi, zi = epoch[i], x[i], y[i], z[i]
+                    for j in points_b:
+                        if abs(epoch[j] - ei) > ecart_temps:
+                            continue
+                        dx, dy, dz = x[j] - xi, y[j] - yi, z[j] - zi
+                        d2 = dx * dx + dy * dy + dz * dz
+                        if d2 > rayon2:
+                            continue
+                        d = math.sqrt(d2)
+                        cle = (missions[m], missions[mission[j]])
+                        rapprochement = paires.get(cle)
+                        if rapprochement is None:
+                            paires[cle] = {"distance_min_km": d, "epoch_a": ei, "epoch_b": epoch[j], "nb_points": 1}
+                        else:
+                            rapprochement["nb_points"] += 1
+                            if d < rapprochement["distance_min_km"]:
+                                rapprochement.update(distance_min_km=d, epoch_a=ei, epoch_b=epoch[j])
+    return dict(sorted(paires.items(), key=lambda e: e[1]["distance_min_km"]))
+
+
+def trajectoires_flotte():
+    """Colonnes de télémétrie de chaque mission de missions.json qui en possède."""
+    from index_donnees import obtenir_index
+    from tableaudebord import chemin_telemetrie_mission
+    from telemetrie_binaire import charger_colonnes
+
+    trajectoires = {}
+    for mission_id in obtenir_index().missions:
+        chemin = chemin_telemetrie_mission(mission_id)
+        if chemin:
+            trajectoires[mission_id], _ = charger_colonnes(chemin)
+    return trajectoires
+
+
+def rapport_conjonctions(trajectoires, rayon=1000.0, ecart_temps=600.0, chemin=RAPPORT_CONJONCTIONS):
+    """Dépistage flotte entière : affiche le résumé et écrit le rapport JSON."""
+    debut = time.perf_counter()
+    nb_points = sum(len(c) for c in trajectoires.values())
+    paires = depister_conjonctions(trajectoires, rayon, ecart_temps)
+    duree = time.perf_counter() - debut
+    print(f"=== 🛰️  Dépistage de conjonctions : {len(trajectoires)} missions, {nb_points:,} points ===")
+    print(f"Critère : < {rayon:,.0f} km et < {ecart_temps:,.0f} s d'écart ({duree:.2f}s)")
+    if not paires:
+        print("Aucun rapprochement détecté.")
+    for (a, b), r in paires.items():
+        print(f"  ⚠️ {a} / {b} : {r['distance_min_km']:,.1f} km ({r['nb_points']} paires de points)")
+
+    rapport = {
+        "rayon_km": rayon,
+        "ecart_temps_s": ecart_temps,
+        "nb_points": nb_points,
+        "conjonctions": [dict(r, mission_a=a, mission_b=b) for (a, b), r in paires.items()],
+    }
+    with open(chemin + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+    return paires
+
+
+if __name__ == '__main__':
+    # Usage : python index_spatial.py [rayon_km] [ecart_s]
+    rayon = float(sys.argv[1]) if len(sys.argv) > 1 else 1000.0
+    ecart = float(sys.argv[2]) if len(sys.argv) > 2 else 600.0
+    rapport_conjonctions(trajectoires_flotte(), rayon, ecart)
\ No newline at end of file
@@ -0,0 +1,163 @@
+import os
+import io
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+DOSSIER_PROFILS = 'space_data/rapports/profils/'
+# Activation sans toucher au code : NAVSYS_MESURES=1 (résumé affiché), NAVSYS_PROFIL=1 (cProfile)
+VARIABLE_MESURES = 'NAVSYS_MESURES'
+VARIABLE_PROFIL = 'NAVSYS_PROFIL'
+LIGNES_PROFIL = 40
+
+
+class Mesures:
+    """Durées de phases nommées et compteurs d'une action.
+
+    Les phases s'imbriquent : une phase 'lecture' ouverte dans 'calcul'
+    est enregistrée sous 'calcul/lecture'. Le coût d'une phase (deux
+    appels à perf_counter) est négligeable : les mesures sont toujours
+    prises, seul leur affichage est optionnel. Prévu pour le fil
+    principal ; les phases ne se mesurent pas dans des threads de travail.
+    """
+
+    def __init__(self):
+        self.phases = {}      # chemin -> [nombre, total_s, max_s]
+        self.compteurs = {}
+        self._pile = []
+
+    def reinitialiser(self):
+        self.phases.clear()
+        self.compteurs.clear()
+        self._pile.clear()
+
+    @contextmanager
+    def mesure(self, nom):
+        self._pile.append(nom)
+        chemin = "/".join(self._pile)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            self._pile.pop()
+            stats = self.phases.get(chemin)
+            if stats is None:
+                self.phases[chemin] = [1, duree, duree]
+            else:
+                stats[0] += 1
+                stats[1] += duree
+                stats[2] = max(stats[2], duree)
+
+    def compter(self, nom, n=1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + n
+
+    def total(self):
+        """Somme des phases de premier niveau (les saisies clavier n'y figurent pas)."""
+        return sum(stats[1] for chemin, stats in self.phases.items() if "/" not in chemin)
+
+    def rapport(self):
+        return {
+            "total_s": round(self.total(), 6),
+            "phases": {chemin: {"appels": n, "total_s": round(total, 6), "max_s": round(maxi, 6)}
+                       for chemin, (n, total, maxi) in self.phases.items()},
+            "compteurs": dict(self.compteurs),
+        }
+
+    def resume(self, nom):
+        """Texte du résumé : une ligne par phase, indentée selon l'imbrication."""
+        lignes = [f"⏱️  {nom} : {self.total() * 1000:.1f} ms"]
+        for chemin, (n, total, _) in self.phases.items():
+            profondeur = chemin.count("/")
+            libelle = "  " * profondeur + chemin.rsplit("/", 1)[-1]
+            appels = f" ({n} appels)" if n > 1 else ""
+            lignes.append(f"   {libelle:<28}{total * 1000:>10.1f} ms{appels}")
+        if self.compteurs:
+            lignes.append("   " + " | ".join(f"{cle} : {_formater_compteur(cle, valeur)}"
+                                              for cle, valeur in self.compteurs.items()))
+        return "\n".join(lignes)
+
+
+def _formater_compteur(cle, valeur):
+    if cle.startswith("octets") and valeur >= 1024:
+        return f"{valeur / 1024 / 1024:,.1f} Mio" if valeur >= 1024 * 1024 else f"{valeur / 1024:,.1f} Kio"
+    return f"{valeur:,}".replace(",", " ")
+
+
+mesures = Mesures()
+mesure = mesures.mesure
+compter = mesures.compter
+
+affichage_actif = os.environ.get(VARIABLE_MESURES, '') not in ('', '0')
+profilage_actif = os.environ.get(VARIABLE_PROFIL, '') not in ('', '0')
+_action_en_cours = None
+
+
+def configurer(arguments=None):
+    """Active les options d'après la ligne de commande (--mesures, --profil)."""
+    global affichage_actif, profilage_actif
+    arguments = sys.argv if arguments is None else arguments
+    affichage_actif = affichage_actif or '--mesures' in arguments
+    profilage_actif = profilage_actif or '--profil' in arguments
+
+
+def ecrire_profil(nom, profileur, rapport, dossier=DOSSIER_PROFILS):
+    """Écrit <nom>_<horodatage>.prof (pstats), .txt (lisible) et .json (phases, compteurs).
+
+    Retourne le chemin commun sans extension.
+    """
+    import pstats
+    os.makedirs(dossier, exist_ok=True)
+    base = os.path.join(dossier, f"{nom}_{time.strftime('%Y%m%dT%H%M%S')}")
+    profileur.dump_stats(base + ".prof")
+
+    texte = io.StringIO()
+    texte.write(mesures.resume(nom) + "\n\n")
+    pstats.Stats(profileur, stream=texte).sort_stats("cumulative").print_stats(LIGNES_PROFIL)
+    with open(base + ".txt", 'w', encoding='utf-8') as f:
+        f.write(texte.getvalue())
+
+    document = dict(rapport, action=nom, date=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    with open(base + ".json", 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return base
+
+
+@contextmanager
+def action(nom):
+    """Délimite une action (option du menu, script) : phases et compteurs remis à zéro.
+
+    En sortie, le résumé est affiché si les mesures sont activées, et le
+    profil cProfile de l'action est écrit dans DOSSIER_PROFILS si le
+    profilage l'est. Une action ouverte dans une autre n'est qu'une phase.
+    """
+    global _action_en_cours
+    if _action_en_cours is not None:
+        with mesure(nom):
+            yield mesures
+        return
+
+    _action_en_cours = nom
+    mesures.reinitialiser()
+    profileur = None
+    if profilage_actif:
+        # Importé seulement si le profilage est demandé (coût au démarrage)
+        import cProfile
+        profileur = cProfile.Profile()
+        profileur.enable()
+    try:
+        yield mesures
+    finally:
+        if profileur:
+            profileur.disable()
+        _action_en_cours = None
+        if affichage_actif and (mesures.phases or mesures.compteurs):
+            print("\n" + mesures.resume(nom))
+        # Une action sans phase (option invalide, sortie du menu) ne laisse pas de profil
+        if profileur and mesures.phases:
+            try:
+                base = ecrire_profil(nom, profileur, mesures.rapport())
+                print(f"[OK] Profil écrit dans {base}.prof (.txt, .json)")
+            except OSError as e:
+                print(f"[ERREUR] Profil non écrit : {e}")
\ No newline at end of file
@@ -0,0 +1,253 @@
+import os
+import json
+from array import array
+
+DOSSIER_JOURNAL = 'space_data/logs/journal/'
+ANCIEN_JOURNAL = 'space_data/logs/journal.json'
+# Présent dans le dossier du journal pendant une migration de l'ancien format
+MARQUEUR_MIGRATION = 'migration.json'
+ENTREES_PAR_SEGMENT = 10000
+TAILLE_OFFSET = array('Q').itemsize
+
+
+class JournalMission:
+    """Journal de bord en ajout seul : segments NDJSON + index d'offsets.
+
+    Chaque segment 'segment_000001.ndjson' contient une entrée JSON par
+    ligne ; le fichier '.idx' voisin stocke l'offset (uint64) de chaque
+    ligne. Un ajout écrit une ligne et un offset, sans relire le journal.
+    """
+
+    def __init__(self, dossier=DOSSIER_JOURNAL, entrees_par_segment=ENTREES_PAR_SEGMENT):
+        self.dossier = dossier
+        self.entrees_par_segment = entrees_par_segment
+        os.makedirs(self.dossier, exist_ok=True)
+        self.segments = self._lister_segments()
+        if self.segments:
+            self._reparer(self.segments[-1])
+
+    # ------------------------------------------------------------------
+    # Chemins et index
+    # ------------------------------------------------------------------
+    def _lister_segments(self):
+        return sorted(
+            int(nom[8:14]) for nom in os.listdir(self.dossier)
+            if nom.startswith("segment_") and nom.endswith(".ndjson")
+        )
+
+    def _chemin(self, numero, ext="ndjson"):
+        return os.path.join(self.dossier, f"segment_{numero:06d}.{ext}")
+
+    def _offsets(self, numero):
+        offsets = array('Q')
+        chemin_idx = self._chemin(numero, "idx")
+        if os.path.exists(chemin_idx):
+            with open(chemin_idx, 'rb') as f:
+                offsets.frombytes(f.read())
+        return offsets
+
+    def _nb_entrees(self, numero):
+        chemin_idx = self._chemin(numero, "idx")
+        if not os.path.exists(chemin_idx):
+            return 0
+        return os.path.getsize(chemin_idx) // TAILLE_OFFSET
+
+    def _reparer(self, numero):
+        """Remet le dernier segment dans un état cohérent après un arrêt brutal."""
+        chemin = self._chemin(numero)
+        chemin_idx = self._chemin(numero, "idx")
+        with open(chemin, 'rb+') as f:
+            donnees = f.read()
+            # Ligne à moitié écrite : on la coupe
+            fin_valide = donnees.rfind(b"\n") + 1
+            if fin_valide != len(donnees):
+                f.truncate(fin_valide)
+                donnees = donnees[:fin_valide]
+
+        # Fichier d'index tronqué au milieu d'un offset
+        if os.path.exists(chemin_idx):
+            taille_idx = os.path.getsize(chemin_idx)
+            if taille_idx % TAILLE_OFFSET:
+                with open(chemin_idx, 'rb+') as f:
+                    f.truncate(taille_idx - taille_idx % TAILLE_OFFSET)
+
+        # L'index peut avoir une ou plusieurs lignes de retard sur le segment
+        offsets = self._offsets(numero)
+        if offsets and offsets[-1] >= len(donnees):
+            offsets = array('Q', (o for o in offsets if o < len(donnees)))
+            with open(chemin_idx, 'wb') as f:
+                f.write(offsets.tobytes())
+        debut = 0
+        if offsets:
+            debut = donnees.index(b"\n", offsets[-1]) + 1
+        manquants = array('Q')
+        while debut < len(donnees):
+            manquants.append(debut)
+            debut = donnees.index(b"\n", debut) + 1
+        if manquants:
+            with open(chemin_idx, 'ab') as f:
+                f.write(manquants.tobytes())
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def ajouter(self, entree):
+        """Ajoute une entrée en fin de journal (O(1), synchronisé sur disque)."""
+        self.ajouter_lot([entree])
+
+    def ajouter_lot(self, entrees):
+        """Ajoute plusieurs entrées avec une seule synchronisation par segment."""
+        entrees = list(entrees)
+        while entrees:
+            if not self.segments or self._nb_entrees(self.segments[-1]) >= self.entrees_par_segment:
+                self.segments.append(self.segments[-1] + 1 if self.segments else 1)
+            numero = self.segments[-1]
+            place = self.entrees_par_segment - self._nb_entrees(numero)
+            lot, entrees = entrees[:place], entrees[place:]
+
+            offsets = array('Q')
+            with open(self._chemin(numero), 'ab') as f:
+                offset = f.tell()
+                for entree in lot:
+                    ligne = json.dumps(entree, ensure_ascii=False).encode('utf-8') + b"\n"
+                    offsets.append(offset)
+                    offset += len(ligne)
+                    f.write(ligne)
+                f.flush()
+                os.fsync(f.fileno())
+            # Les offsets ne sont écrits qu'une fois les lignes sur disque
+            with open(self._chemin(numero, "idx"), 'ab') as f:
+                f.write(offsets.tobytes())
+
+    def vider(self):
+        """Supprime tous les segments du journal."""
+        for numero in self.segments:
+            for ext in ("ndjson", "idx"):
+                chemin = self._chemin(numero, ext)
+                if os.path.exists(chemin):
+                    os.remove(chemin)
+        self.segments = []
+
+    def tronquer(self, position):
+        """Supprime les entrées à partir de la position globale donnée (0 = tout le journal)."""
+        base = 0
+        for numero in list(self.segments):
+            nb = self._nb_entrees(numero)
+            garder = max(position - base, 0)
+            base += nb
+            if garder >= nb:
+                continue
+            if garder == 0:
+                for ext in ("ndjson", "idx"):
+                    chemin = self._chemin(numero, ext)
+                    if os.path.exists(chemin):
+                        os.remove(chemin)
+                self.segments.remove(numero)
+            else:
+                offsets = self._offsets(numero)
+                with open(self._chemin(numero), 'rb+') as f:
+                    f.truncate(offsets[garder])
+                with open(self._chemin(numero, "idx"), 'rb+') as f:
+                    f.truncate(garder * TAILLE_OFFSET)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return sum(self._nb_entrees(numero) for numero in self.segments)
+
+    def __iter__(self):
+        for numero in self.segments:
+            with open(self._chemin(numero), 'r', encoding='utf-8') as f:
+                for ligne in f:
+                    yield json.loads(ligne)
+
+    def entrees_depuis(self, position):
+        """Itère sur (position, entrée) à partir de la position globale donnée (0 = première entrée).
+
+        Les segments entièrement antérieurs ne sont pas ouverts : seul
+        l'index d'offsets situe la première entrée à lire.
+        """
+        base = 0
+        for numero in self.segments:
+            nb = self._nb_entrees(numero)
+            if position < base + nb:
+                with open(self._chemin(numero), 'rb') as f:
+                    f.seek(self._offsets(numero)[max(position - base, 0)])
+                    for k in range(max(position - base, 0), nb):
+                        yield base + k, json.loads(f.readline())
+            base += nb
+
+    def dernieres_entrees(self, n=20, page=0):
+        """Retourne une page de n entrées, la page 0 étant la plus récente.
+
+        Les entrées sont rendues dans l'ordre chronologique ; seuls les
+        segments concernés par la page sont ouverts.
+        """
+        a_sauter = n * page
+        resultat = []
+        for numero in reversed(self.segments):
+            if len(resultat) >= n:
+                break
+            nb = self._nb_entrees(numero)
+            if a_sauter >= nb:
+                a_sauter -= nb
+                continue
+            offsets = self._offsets(numero)
+            fin = nb - a_sauter
+            debut = max(0, fin - (n - len(resultat)))
+            a_sauter = 0
+            with open(self._chemin(numero), 'rb') as f:
+                f.seek(offsets[debut])
+                lignes = [f.readline() for _ in range(fin - debut)]
+            resultat[:0] = [json.loads(ligne) for ligne in lignes]
+        return resultat
+
+
+def migrer_journal_json(journal, ancien=ANCIEN_JOURNAL):
+    """Importe une seule fois l'ancien journal.json (liste JSON) dans le journal segmenté.
+
+    Les entrées sont ajoutées après celles du journal. Le marqueur
+    MARQUEUR_MIGRATION retient la taille du journal avant la migration :
+    si elle est interrompue, seules les entrées qu'elle avait écrites sont
+    retirées à la reprise. Le fichier d'origine est renommé en '.migre'
+    pour ne pas être réimporté. Retourne le nombre d'entrées importées.
+    """
+    marqueur = os.path.join(journal.dossier, MARQUEUR_MIGRATION)
+    if not os.path.exists(ancien):
+        # Migration terminée juste avant la suppression du marqueur
+        if os.path.exists(marqueur):
+            os.remove(marqueur)
+        return 0
+    if os.path.exists(marqueur):
+        with open(marqueur, 'r', encoding='utf-8') as f:
+            depart = json.load(f)["depart"]
+        journal.tronquer(depart)
+    else:
+        with open(marqueur + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"depart": len(journal)}, f)
+        os.replace(marqueur + ".tmp", marqueur)
+    try:
+        with open(ancien, 'r', encoding='utf-8') as f:
+            entrees = json.load(f)
+    except json.JSONDecodeError:
+        # Fichier vide ou mal formaté : rien à reprendre
+        entrees = []
+    journal.ajouter_lot(entrees)
+    os.replace(ancien, ancien + ".migre")
+    os.remove(marqueur)
+    return len(entrees)
+
+
+def ouvrir_journal(dossier=DOSSIER_JOURNAL, ancien=ANCIEN_JOURNAL):
+    """Ouvre le journal de bord, en migrant l'ancien format si nécessaire."""
+    journal = JournalMission(dossier)
+    migrer_journal_json(journal, ancien)
+    return journal
+
+
+if __name__ == '__main__':
+    journal = ouvrir_journal()
+    print(f"Journal : {len(journal)} entrées")
+    for e in journal.dernieres_entrees(10):
+        print(f"[{e.get('date')}] {e.get('auteur')} : {e.get('message')}")
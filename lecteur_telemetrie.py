@@ -0,0 +1,274 @@
+import io
+import os
+import re
+import json
+import hashlib
+from collections import deque
+from instrumentation import compter
+
+TAILLE_BLOC = 64 * 1024
+# Les octets déjà traités d'un fichier sont hachés par blocs de cette taille (une empreinte par bloc)
+TAILLE_BLOC_EMPREINTE = 1024 * 1024
+_decodeur = json.JSONDecoder()
+_BLANCS = re.compile(r"[ \t\r\n]*")
+
+
+class _Flux:
+    """Tampon de lecture par blocs sur un fichier texte JSON."""
+
+    def __init__(self, fichier, taille_bloc):
+        self.fichier = fichier
+        self.taille_bloc = taille_bloc
+        self.tampon = ""
+        self.pos = 0
+        self.fin = False
+
+    def remplir(self):
+        """Lit un bloc de plus ; retourne False en fin de fichier."""
+        bloc = self.fichier.read(self.taille_bloc)
+        if not bloc:
+            self.fin = True
+            return False
+        # On jette la partie déjà consommée pour garder la mémoire constante
+        self.tampon = self.tampon[self.pos:] + bloc
+        self.pos = 0
+        return True
+
+    def caractere(self):
+        """Retourne le prochain caractère non blanc (sans le consommer)."""
+        while True:
+            self.pos = _BLANCS.match(self.tampon, self.pos).end()
+            if self.pos < len(self.tampon):
+                return self.tampon[self.pos]
+            if not self.remplir():
+                return ""
+
+    def attendre(self, attendu):
+        if self.caractere() != attendu:
+            raise ValueError(f"'{attendu}' attendu à la position {self.pos}")
+        self.pos += 1
+
+    def valeur(self):
+        """Décode la prochaine valeur JSON complète du flux."""
+        self.caractere()
+        while True:
+            try:
+                valeur, fin = _decodeur.raw_decode(self.tampon, self.pos)
+            except json.JSONDecodeError:
+                if not self.remplir():
+                    raise
+                continue
+            # Un nombre peut être coupé en fin de bloc : on s'assure d'avoir la suite
+            if fin == len(self.tampon) and not self.fin and self.remplir():
+                continue
+            self.pos = fin
+            return valeur
+
+
+def _parcourir(chemin, taille_bloc):
+    """Parcourt l'objet racine : produit ('cle', valeur) puis ('releve', r)."""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        flux = _Flux(f, taille_bloc)
+        nombre = 0
+        try:
+            flux.attendre("{")
+            while flux.caractere() not in ("}", ""):
+                cle = flux.valeur()
+                flux.attendre(":")
+                if cle == "releves":
+                    flux.attendre("[")
+                    while flux.caractere() != "]":
+                        yield "releve", flux.valeur()
+                        nombre += 1
+                        if flux.caractere() == ",":
+                            flux.pos += 1
+                    flux.pos += 1
+                else:
+                    yield "cle", (cle, flux.valeur())
+                if flux.caractere() == ",":
+                    flux.pos += 1
+        finally:
+            # Compteurs mis à jour une fois par parcours, pas à chaque relevé
+            compter("releves_lus", nombre)
+            compter("octets_lus", f.buffer.tell())
+
+
+def iterer_releves(chemin='space_data/telemetrie.json', taille_bloc=TAILLE_BLOC):
+    """Produit les relevés de 'releves' un par un, sans charger tout le fichier."""
+    for genre, valeur in _parcourir(chemin, taille_bloc):
+        if genre == "releve":
+            yield valeur
+
+
+def iterer_releves_apres(chemin, offset, taille_bloc=TAILLE_BLOC):
+    """Produit les relevés situés après l'octet 'offset' (fin d'un relevé déjà lu).
+
+    Sert à la lecture incrémentale : seuls les relevés ajoutés depuis
+    'offset' sont décodés.
+    """
+    with open(chemin, 'rb') as brut:
+        brut.seek(offset)
+        f = io.TextIOWrapper(brut, encoding='utf-8')
+        flux = _Flux(f, taille_bloc)
+        nombre = 0
+        try:
+            while True:
+                c = flux.caractere()
+                if c == ",":
+                    flux.pos += 1
+                elif c in ("]", ""):
+                    return
+                else:
+                    yield flux.valeur()
+                    nombre += 1
+        finally:
+            compter("releves_lus", nombre)
+            compter("octets_lus", brut.tell() - offset)
+
+
+def fin_des_releves(chemin):
+    """Offset (en octets) juste après le dernier relevé, ou None si la forme est inattendue.
+
+    Valable quand 'releves' est le dernier champ de l'objet racine.
+    """
+    taille_fichier = os.path.getsize(chemin)
+    with open(chemin, 'rb') as f:
+        f.seek(max(0, taille_fichier - 4096))
+        donnees = f.read()
+    i = len(donnees) - 1
+    for attendu in b"}]":
+        while i >= 0 and donnees[i] in b" \t\r\n":
+            i -= 1
+        if i < 0 or donnees[i] != attendu:
+            return None
+        i -= 1
+    while i >= 0 and donnees[i] in b" \t\r\n":
+        i -= 1
+    if i < 0:
+        return None
+    return taille_fichier - len(donnees) + i + 1
+
+
+def hacher_octets(h, chemin, debut, fin):
+    """Ajoute à h (hashlib) les octets [debut, fin) du fichier ; retourne h."""
+    with open(chemin, 'rb') as f:
+        f.seek(debut)
+        reste = fin - debut
+        while reste > 0:
+            bloc = f.read(min(reste, 1024 * 1024))
+            if not bloc:
+                break
+            h.update(bloc)
+            reste -= len(bloc)
+    return h
+
+
+def empreintes_blocs(chemin, fin, blocs=(), debut=0):
+    """Empreintes sha1 des blocs de TAILLE_BLOC_EMPREINTE octets de [0, fin) ; le dernier peut être partiel.
+
+    blocs (empreintes de [0, debut)) est prolongé : seuls le dernier bloc
+    partiel et les octets au-delà de debut sont relus.
+    """
+    garde = debut // TAILLE_BLOC_EMPREINTE
+    empreintes = list(blocs[:garde])
+    for position in range(garde * TAILLE_BLOC_EMPREINTE, fin, TAILLE_BLOC_EMPREINTE):
+        h = hacher_octets(hashlib.sha1(), chemin, position, min(position + TAILLE_BLOC_EMPREINTE, fin))
+        empreintes.append(h.hexdigest())
+    return empreintes
+
+
+def prefixe_intact(chemin, fin, blocs, rotation=0, complet=False):
+    """True si les octets [0, fin) ont toujours les empreintes 'blocs' (voir empreintes_blocs).
+
+    Par défaut seuls deux blocs sont relus : le dernier (celui que les
+    ajouts réécrivent) et le bloc n° rotation (modulo), que l'appelant fait
+    tourner d'un passage à l'autre. Le coût ne dépend pas de la taille du
+    fichier, et une modification à longueur constante d'octets anciens est
+    détectée au plus tard après un tour complet. complet=True relit tout.
+    """
+    if not blocs or os.path.getsize(chemin) < fin:
+        return False
+    numeros = range(len(blocs)) if complet else sorted({rotation % len(blocs), len(blocs) - 1})
+    for k in numeros:
+        debut = k * TAILLE_BLOC_EMPREINTE
+        h = hacher_octets(hashlib.sha1(), chemin, debut, min(debut + TAILLE_BLOC_EMPREINTE, fin))
+        if h.hexdigest() != blocs[k]:
+            return False
+    return True
+
+
+def lire_entete(chemin='space_data/telemetrie.json', taille_bloc=TAILLE_BLOC):
+    """Retourne les champs racine situés avant 'releves' (vaisseau, mission_id...)."""
+    entete = {}
+    for genre, valeur in _parcourir(chemin, taille_bloc):
+        if genre == "releve":
+            break
+        entete[valeur[0]] = valeur[1]
+    return entete
+
+
+def _objets_en_fin(donnees, n):
+    """Découpe, en partant de la fin, les n derniers objets du tableau final.
+
+    Retourne (objets, complet) ; complet vaut True si le début du tableau
+    a été atteint dans les données fournies.
+    """
+    i = len(donnees) - 1
+    # On saute l'accolade racine puis on doit tomber sur la fin du tableau
+    for attendu in b"}]":
+        while i >= 0 and donnees[i] in b" \t\r\n":
+            i -= 1
+        if i < 0 or donnees[i] != attendu:
+            return None, False
+        i -= 1
+
+    objets = []
+    profondeur = 0
+    dans_chaine = False
+    fin_objet = None
+    while i >= 0 and len(objets) < n:
+        c = donnees[i]
+        if dans_chaine:
+            if c == 0x22:  # '"'
+                # Guillemet échappé si précédé d'un nombre impair de '\'
+                j = i - 1
+                while j >= 0 and donnees[j] == 0x5C:
+                    j -= 1
+                if (i - j) % 2 == 1:
+                    dans_chaine = False
+        elif c == 0x22:
+            dans_chaine = True
+        elif c in b"}]":
+            if profondeur == 0:
+                fin_objet = i + 1
+            profondeur += 1
+        elif c in b"{[":
+            if profondeur == 0:
+                # Début du tableau 'releves' atteint
+                return objets, True
+            profondeur -= 1
+            if profondeur == 0:
+                objets.append(json.loads(donnees[i:fin_objet].decode('utf-8')))
+        i -= 1
+    return objets, len(objets) >= n
+
+
+def derniers_releves(chemin='space_data/telemetrie.json', n=3, taille_bloc=TAILLE_BLOC):
+    """Retourne les n derniers relevés en lisant le fichier depuis la fin."""
+    taille_fichier = os.path.getsize(chemin)
+    taille = min(taille_bloc, taille_fichier)
+    with open(chemin, 'rb') as f:
+        while True:
+            f.seek(taille_fichier - taille)
+            objets, complet = _objets_en_fin(f.read(taille), n)
+            compter("octets_lus", taille)
+            if objets is None:
+                break
+            if complet or taille == taille_fichier:
+                objets.reverse()
+                return objets
+            # Pas assez de relevés dans la fenêtre : on l'élargit
+            taille = min(taille * 4, taille_fichier)
+
+    # 'releves' n'est pas le dernier champ : lecture séquentielle bornée
+    return list(deque(iterer_releves(chemin, taille_bloc), maxlen=n))
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import re
+import time
+import calendar
+import gzip
+import shutil
+import threading
+import uuid
+
+DOSSIER_LOGS = "space_data/logs/"
+# Rotation du log courant : au-delà de TAILLE_MAX octets ou AGE_MAX secondes
+TAILLE_MAX = 5 * 1024 * 1024
+AGE_MAX = 7 * 24 * 3600
+ARCHIVES_MAX = 20
+# Vidage du tampon par le thread d'écriture : toutes les DELAI_VIDAGE s ou dès TAILLE_LOT lignes
+DELAI_VIDAGE = 0.5
+TAILLE_LOT = 500
+
+# Format d'une ligne (champs séparés par des tabulations) :
+#   horodatage UTC ISO 8601 (ms) | niveau | mission | session | message
+# Le message est échappé (\\, \t, \n) : une ligne = un enregistrement.
+# L'ouverture et la fermeture de session sont des enregistrements de niveau SESSION.
+CHAMPS_LIGNE = ("horodatage", "niveau", "mission", "session", "message")
+_ECHAPPEMENTS = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_RESTITUTIONS = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+_SEQUENCE = re.compile(r"\\(.)")
+
+
+def lire_ligne(ligne):
+    """Décode une ligne de log en dict (clés CHAMPS_LIGNE) ; None si elle n'est pas au format."""
+    champs = ligne.rstrip("\r\n").split("\t")
+    if len(champs) != len(CHAMPS_LIGNE) or not champs[0].endswith("Z"):
+        return None
+    enregistrement = dict(zip(CHAMPS_LIGNE, champs))
+    if "\\" in enregistrement["message"]:
+        enregistrement["message"] = _SEQUENCE.sub(
+            lambda m: _RESTITUTIONS.get(m.group(1), m.group(0)), enregistrement["message"])
+    return enregistrement
+
+
+def epoch_ligne(enregistrement):
+    """Epoch UTC (à la seconde) d'un enregistrement rendu par lire_ligne."""
+    return calendar.timegm(time.strptime(enregistrement["horodatage"][:19], "%Y-%m-%dT%H:%M:%S"))
+
+
+class LogMission:
+    """Gestionnaire de contexte pour écrire des logs de mission horodatés.
+
+    ecrire() ne fait qu'ajouter l'enregistrement à un tampon ; un thread
+    d'écriture le formate et l'écrit par lots. Le log courant est archivé
+    et compressé (.log.gz) quand il dépasse TAILLE_MAX ou AGE_MAX. En
+    sortie de bloc, l'exception éventuelle est consignée, le tampon est
+    entièrement écrit, puis l'exception est propagée.
+    """
+
+    def __init__(self, mission_id, dossier_logs=DOSSIER_LOGS, taille_max=TAILLE_MAX, age_max=AGE_MAX,
+                 delai_vidage=DELAI_VIDAGE, taille_lot=TAILLE_LOT):
+        self.mission_id = mission_id
+        self.dossier_logs = dossier_logs
+        self.filepath = os.path.join(self.dossier_logs, f"{self.mission_id}.log")
+        self.taille_max = taille_max
+        self.age_max = age_max
+        self.delai_vidage = delai_vidage
+        self.taille_lot = taille_lot
+        self.erreurs = 0
+        self.start_time = 0
+        self.session = None
+        self.fichier = None
+        self._tampon = []
+        self._condition = threading.Condition()
+        self._arret = False
+        self._thread = None
+        self._erreur_ecriture = None
+        self._seconde = None
+        self._prefixe = ""
+        self._debut_fichier = None
+
+        # S'assure que le dossier existe
+        os.makedirs(self.dossier_logs, exist_ok=True)
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self.session = uuid.uuid4().hex[:8]
+        self._ouvrir()
+        self._arret = False
+        self._thread = threading.Thread(target=self._vider_en_continu, name=f"log-{self.mission_id}", daemon=True)
+        self._thread.start()
+
+        # En-tête de session
+        self.ecrire("SESSION", "OUVERTE")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Gestion des exceptions s'il y a eu un crash dans le bloc 'with'
+        if exc_type is not None:
+            self.erreurs += 1
+            self.ecrire("CRITICAL", f"Exception capturée : {exc_type.__name__} — {exc_val}")
+
+        duree = time.time() - self.start_time
+        # Pied de session
+        self.ecrire("SESSION", f"FERMÉE duree={duree:.3f}s erreurs={self.erreurs}")
+
+        # Le thread écrit tout le tampon avant de s'arrêter
+        with self._condition:
+            self._arret = True
+            self._condition.notify()
+        self._thread.join()
+        self.fichier.close()
+        if self._erreur_ecriture is not None and exc_type is None:
+            raise self._erreur_ecriture
+
+        # On retourne False pour propager l'erreur (le script plantera mais le log sera sauvegardé)
+        return False
+
+    def ecrire(self, niveau, message):
+        with self._condition:
+            self._tampon.append((time.time(), niveau, message))
+            if len(self._tampon) >= self.taille_lot:
+                self._condition.notify()
+
+    # ------------------------------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------------------------------
+    def _vider_en_continu(self):
+        while True:
+            with self._condition:
+                if not self._arret and len(self._tampon) < self.taille_lot:
+                    self._condition.wait(self.delai_vidage)
+                lot, self._tampon = self._tampon, []
+                arret = self._arret
+            if lot and self._erreur_ecriture is None:
+                try:
+                    # Par tranches de taille_lot : la rotation reste proche de taille_max
+                    for debut in range(0, len(lot), self.taille_lot):
+                        self._ecrire_lot(lot[debut:debut + self.taille_lot])
+                except OSError as e:
+                    # Remontée à la fermeture de session
+                    self._erreur_ecriture = e
+            if arret:
+                with self._condition:
+                    if not self._tampon:
+                        return
+
+    def _horodater(self, instant):
+        # Le préfixe à la seconde n'est reformaté qu'une fois par seconde
+        seconde = int(instant)
+        if seconde != self._seconde:
+            self._seconde = seconde
+            self._prefixe = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconde))
+        return f"{self._prefixe}.{int((instant - seconde) * 1000):03d}Z"
+
+    def _ecrire_lot(self, lot):
+        entete = f"\t{self.mission_id}\t{self.session}\t"
+        donnees = "".join(
+            f"{self._horodater(instant)}\t{niveau}{entete}{str(message).translate(_ECHAPPEMENTS)}\n"
+            for instant, niveau, message in lot
+        ).encode("utf-8")
+        if self._debut_fichier is None:
+            self._debut_fichier = lot[0][0]
+        elif (self.fichier.tell() + len(donnees) > self.taille_max
+              or lot[-1][0] - self._debut_fichier > self.age_max):
+            self._tourner()
+            self._debut_fichier = lot[0][0]
+        self.fichier.write(donnees)
+        self.fichier.flush()
+
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
+    def _ouvrir(self):
+        """Ouvre le log courant ; un log à l'ancien format est archivé d'abord."""
+        if os.path.exists(self.filepath + ".rotation"):
+            # Rotation interrompue : la compression est reprise
+            self._compresser(self.filepath + ".rotation")
+        if os.path.exists(self.filepath) and os.path.getsize(self.filepath):
+            with open(self.filepath, "r", encoding="utf-8", errors="replace") as f:
+                premier = lire_ligne(f.readline())
+            try:
+                self._debut_fichier = epoch_ligne(premier) if premier else None
+            except ValueError:
+                self._debut_fichier = None
+            if self._debut_fichier is None:
+                self._archiver()
+        self.fichier = open(self.filepath, "ab")
+
+    def _tourner(self):
+        self.fichier.close()
+        try:
+            self._archiver()
+        finally:
+            self.fichier = open(self.filepath, "ab")
+
+    def _archiver(self):
+        """Archive le log courant : renommé en <mission>.log.rotation, compressé, puis supprimé.
+
+        Le renommage (atomique) vient d'abord : aucune ligne n'est écrite dans
+        le fichier pendant sa compression, et une rotation interrompue est
+        reprise à l'ouverture suivante.
+        """
+        rotation = self.filepath + ".rotation"
+        os.replace(self.filepath, rotation)
+        self._debut_fichier = None
+        self._compresser(rotation)
+
+    def _compresser(self, rotation):
+        """Compresse rotation en <mission>.<horodatage>.log.gz, le supprime et garde ARCHIVES_MAX archives."""
+        horodatage = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        base = os.path.join(self.dossier_logs, f"{self.mission_id}.{horodatage}")
+        archive = base + ".log.gz"
+        numero = 1
+        while os.path.exists(archive):
+            numero += 1
+            archive = f"{base}-{numero}.log.gz"
+        with open(rotation, "rb") as source, gzip.open(archive + ".tmp", "wb") as cible:
+            shutil.copyfileobj(source, cible)
+        os.replace(archive + ".tmp", archive)
+        os.remove(rotation)
+
+        archives = sorted((os.path.join(self.dossier_logs, nom) for nom in os.listdir(self.dossier_logs)
+                           if nom.startswith(f"{self.mission_id}.") and nom.endswith(".log.gz")),
+                          key=os.path.getmtime)
+        for chemin in archives[:-ARCHIVES_MAX]:
+            os.remove(chemin)
\ No newline at end of file
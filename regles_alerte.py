@@ -0,0 +1,135 @@
+import sys
+import operator
+from collections import namedtuple, Counter
+from itertools import compress
+
+from telemetrie_colonnes import CANAUX, TelemetrieColonnes
+
+# Alerte structurée : 'valeur' et 'seuil' sont des nombres pour les seuils,
+# des états texte pour les systèmes embarqués
+Alerte = namedtuple("Alerte", "regle indice valeur seuil")
+Regle = namedtuple("Regle", "nom colonne operateur seuil")
+
+ETATS_NOMINAUX = ("nominal", "nominale")
+
+# Colonne de TelemetrieColonnes pour chaque clé de relevé
+_COLONNE_DE_CLE = {cle: colonne for colonne, cle in CANAUX.items()}
+
+_LIBELLES = {
+    "carburant_min_pourcent": "Carburant critique",
+    "oxygene_min_pourcent": "Oxygène sous le seuil critique",
+    "temperature_cabine_min_c": "Température cabine trop basse",
+    "temperature_cabine_max_c": "Température cabine trop élevée",
+    "vitesse_max_km_s": "Vitesse excessive",
+}
+
+
+def compiler_regles(seuils):
+    """Transforme seuils_alerte en règles 'colonne < seuil' / 'colonne > seuil'.
+
+    Les clés suivent le motif '<canal>_min_<unité>' ou '<canal>_max_<unité>'
+    (ex. 'temperature_cabine_max_c' -> colonne de 'temperature_cabine_c').
+    """
+    regles = []
+    for nom, seuil in seuils.items():
+        for marqueur, operateur in (("_min_", operator.lt), ("_max_", operator.gt)):
+            if marqueur in nom:
+                canal, unite = nom.split(marqueur, 1)
+                colonne = _COLONNE_DE_CLE.get(f"{canal}_{unite}")
+                if colonne:
+                    regles.append(Regle(nom, colonne, operateur, float(seuil)))
+                break
+    return regles
+
+
+class MoteurRegles:
+    """Règles de seuil compilées une fois, évaluées sur des lots de relevés."""
+
+    def __init__(self, seuils):
+        self.seuils = dict(seuils)
+        self.regles = compiler_regles(seuils)
+
+    def evaluer(self, colonnes, debut=0):
+        """Évalue toutes les règles sur des TelemetrieColonnes.
+
+        Retourne la liste des Alerte triée par indice de relevé (les seuils
+        avant les systèmes pour un même relevé). 'debut' permet de n'évaluer
+        que les relevés à partir de cet indice.
+        """
+        alertes = []
+        for regle in self.regles:
+            valeurs = getattr(colonnes, regle.colonne)[debut:]
+            # Le seuil devient le premier opérande : v < s  <=>  s > v
+            if regle.operateur is operator.lt:
+                predicat = regle.seuil.__gt__
+            else:
+                predicat = regle.seuil.__lt__
+            # map + compress : la boucle de comparaison reste en C
+            for indice in compress(range(debut, debut + len(valeurs)), map(predicat, valeurs)):
+                alertes.append(Alerte(regle.nom, indice, valeurs[indice - debut], regle.seuil))
+
+        for indice in range(debut, len(colonnes)):
+            for systeme, etat in colonnes.systemes[indice].items():
+                if etat not in ETATS_NOMINAUX:
+                    alertes.append(Alerte(f"systeme:{systeme}", indice, etat, "nominal"))
+
+        # Tri stable : l'ordre des règles est conservé pour un même relevé
+        alertes.sort(key=operator.attrgetter("indice"))
+        return alertes
+
+    def evaluer_releve(self, releve):
+        """Évalue un seul relevé (dict) ; l'indice des alertes vaut 0.
+
+        Comme en lot (NaN dans les colonnes), un canal absent ou non
+        numérique ne déclenche pas d'alerte.
+        """
+        alertes = []
+        for regle in self.regles:
+            try:
+                valeur = float(releve.get(CANAUX[regle.colonne]))
+            except (TypeError, ValueError):
+                continue
+            if regle.operateur(valeur, regle.seuil):
+                alertes.append(Alerte(regle.nom, 0, valeur, regle.seuil))
+        for systeme, etat in releve.get('systemes', {}).items():
+            if etat not in ETATS_NOMINAUX:
+                alertes.append(Alerte(f"systeme:{systeme}", 0, etat, "nominal"))
+        return alertes
+
+
+def formater_alerte(alerte):
+    """Texte lisible d'une alerte (formulations historiques d'alerte_systeme)."""
+    if alerte.regle.startswith("systeme:"):
+        nom_sys = alerte.regle.split(":", 1)[1].capitalize()
+        if nom_sys == "Communication" and alerte.valeur == "degradee":
+            return "Communication dégradée"
+        return f"{nom_sys} — {alerte.valeur.replace('_', ' ')}"
+    return _LIBELLES.get(alerte.regle, f"{alerte.regle} ({alerte.valeur} / {alerte.seuil})")
+
+
+_moteurs = {}
+
+
+def obtenir_moteur(seuils):
+    """Moteur compilé pour ces seuils (réutilisé tant que les seuils ne changent pas)."""
+    cle = tuple(sorted(seuils.items()))
+    moteur = _moteurs.get(cle)
+    if moteur is None:
+        moteur = _moteurs[cle] = MoteurRegles(seuils)
+    return moteur
+
+
+if __name__ == '__main__':
+    # Ré-évaluation d'un historique complet avec les seuils actuels
+    from chargeur_donnees import charger_json_securise
+    from lecteur_telemetrie import iterer_releves
+
+    chemin = sys.argv[1] if len(sys.argv) > 1 else 'space_data/telemetrie.json'
+    config = charger_json_securise('space_data/config_systeme.json') or {}
+    moteur = obtenir_moteur(config.get('seuils_alerte', {}))
+    colonnes = TelemetrieColonnes.depuis_releves(iterer_releves(chemin))
+    alertes = moteur.evaluer(colonnes)
+    print(f"=== Ré-alerte de {len(colonnes)} relevés ({chemin}) ===")
+    for regle, nombre in Counter(a.regle for a in alertes).most_common():
+        print(f"  {regle} : {nombre}")
+    print(f"Total : {len(alertes)} alertes")
\ No newline at end of file
@@ -0,0 +1,357 @@
+import os
+import sys
+import json
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+from telemetrie_colonnes import TelemetrieColonnes, CANAUX, epoch_iso
+from lecteur_telemetrie import iterer_releves, iterer_releves_apres, fin_des_releves, empreintes_blocs, prefixe_intact
+
+DOSSIER_RESUMES = 'space_data/rapports/resumes/'
+# Résolutions tenues à jour (nom -> durée d'une case en secondes)
+RESOLUTIONS = {"minute": 60, "heure": 3600, "jour": 86400}
+STATISTIQUES = ("min", "max", "somme", "nombre", "dernier")
+
+# Une case : début, fin (epoch du dernier relevé), nombre de relevés, puis
+# min/max/somme/nombre/dernier pour chaque canal numérique
+CASE = struct.Struct('<' + 'd' * (3 + len(STATISTIQUES) * len(CANAUX)))
+
+
+def _case_vide(debut):
+    valeurs = [debut, -math.inf, 0.0]
+    for _ in CANAUX:
+        valeurs += [math.inf, -math.inf, 0.0, 0.0, math.nan]
+    return valeurs
+
+
+def _accumuler(case, epoch, releve_canaux):
+    """Ajoute un relevé (epoch, valeurs par canal) à une case (liste de doubles)."""
+    recent = epoch >= case[1]
+    if recent:
+        case[1] = epoch
+    case[2] += 1
+    k = 3
+    for valeur in releve_canaux:
+        if valeur == valeur:   # NaN = canal absent
+            if valeur < case[k]:
+                case[k] = valeur
+            if valeur > case[k + 1]:
+                case[k + 1] = valeur
+            case[k + 2] += valeur
+            case[k + 3] += 1
+            if recent or case[k + 4] != case[k + 4]:
+                case[k + 4] = valeur
+        k += len(STATISTIQUES)
+
+
+def _fusionner(case, autre):
+    """Fusionne deux cases de même début (autre est postérieure ou concurrente)."""
+    recent = autre[1] >= case[1]
+    case[1] = max(case[1], autre[1])
+    case[2] += autre[2]
+    for k in range(3, len(case), len(STATISTIQUES)):
+        if not autre[k + 3]:
+            continue
+        case[k] = min(case[k], autre[k])
+        case[k + 1] = max(case[k + 1], autre[k + 1])
+        case[k + 2] += autre[k + 2]
+        case[k + 3] += autre[k + 3]
+        if recent or case[k + 4] != case[k + 4]:
+            case[k + 4] = autre[k + 4]
+
+
+class SerieResumee:
+    """Cases de largeur fixe d'une résolution, triées par début, dans un fichier binaire.
+
+    Les relevés arrivant dans l'ordre, une mise à jour ne réécrit que la
+    dernière case et ajoute les suivantes ; la liste des débuts de case
+    (8 octets par case) est gardée en mémoire pour les recherches.
+    """
+
+    def __init__(self, chemin, pas):
+        self.chemin = chemin
+        self.pas = pas
+        self.debuts = array('d')
+        nombre = os.path.getsize(chemin) // CASE.size if os.path.exists(chemin) else 0
+        if nombre:
+            # Seul le premier double de chaque case est copié (vue projetée, pas de read() du fichier)
+            with open(chemin, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+                vue = memoryview(projection)
+                try:
+                    self.debuts = array('d', vue[:nombre * CASE.size].cast('d')[::CASE.size // 8])
+                finally:
+                    vue.release()
+
+    def __len__(self):
+        return len(self.debuts)
+
+    def integrer(self, epochs, canaux):
+        """Ajoute des relevés : epochs (séquence) et une séquence de valeurs par canal."""
+        cases = {}
+        for i, epoch in enumerate(epochs):
+            if epoch != epoch:
+                continue
+            debut = epoch - epoch % self.pas
+            case = cases.get(debut)
+            if case is None:
+                case = cases[debut] = _case_vide(debut)
+            _accumuler(case, epoch, [colonne[i] for colonne in canaux])
+        if not cases:
+            return
+        mode = 'r+b' if os.path.exists(self.chemin) else 'w+b'
+        with open(self.chemin, mode) as f:
+            for debut in sorted(cases):
+                k = bisect_left(self.debuts, debut)
+                if k < len(self.debuts) and self.debuts[k] == debut:
+                    f.seek(k * CASE.size)
+                    existante = list(CASE.unpack(f.read(CASE.size)))
+                    _fusionner(existante, cases[debut])
+                    f.seek(k * CASE.size)
+                    f.write(CASE.pack(*existante))
+                elif k == len(self.debuts):
+                    f.seek(k * CASE.size)
+                    f.write(CASE.pack(*cases[debut]))
+                    self.debuts.append(debut)
+                else:
+                    # Relevé en retard tombant dans une case absente : insertion
+                    f.seek(k * CASE.size)
+                    suite = f.read()
+                    f.seek(k * CASE.size)
+                    f.write(CASE.pack(*cases[debut]) + suite)
+                    self.debuts.insert(k, debut)
+
+    def lire(self, debut=None, fin=None):
+        """Cases dont le début est dans [debut, fin], sous forme de dicts.
+
+        Seules les cases demandées sont lues sur disque.
+        """
+        k0 = 0 if debut is None else bisect_left(self.debuts, debut - debut % self.pas)
+        k1 = len(self.debuts) if fin is None else bisect_right(self.debuts, fin)
+        if k1 <= k0:
+            return []
+        with open(self.chemin, 'rb') as f:
+            f.seek(k0 * CASE.size)
+            contenu = f.read((k1 - k0) * CASE.size)
+        resultat = []
+        for valeurs in CASE.iter_unpack(contenu):
+            case = {
+                "debut": datetime.fromtimestamp(valeurs[0], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "nb_releves": int(valeurs[2]),
+            }
+            k = 3
+            for nom in CANAUX:
+                mini, maxi, somme, nombre, dernier = valeurs[k:k + len(STATISTIQUES)]
+                if nombre:
+                    case[nom] = {"min": mini, "max": maxi, "moyenne": somme / nombre, "dernier": dernier}
+                k += len(STATISTIQUES)
+            resultat.append(case)
+        return resultat
+
+
+class ResumesMission:
+    """Résumés min/max/moyenne/dernier d'une mission à toutes les RESOLUTIONS.
+
+    Le dossier d'une mission n'a qu'une source, décrite par source.json :
+    un fichier JSON de télémétrie ({"chemin", "signature"}, voir
+    synchroniser) ou le flux NDJSON du serveur d'ingestion ({"flux",
+    "offset"}, voir suivre_flux). Un flux d'ingestion fait foi : le tableau
+    de bord sert alors ses résumés sans les recalculer.
+    """
+
+    def __init__(self, mission_id, dossier=DOSSIER_RESUMES):
+        self.mission_id = mission_id
+        self.dossier = os.path.join(dossier, mission_id)
+        os.makedirs(self.dossier, exist_ok=True)
+        self.chemin_source = os.path.join(self.dossier, 'source.json')
+        self._series = {}
+
+    def serie(self, resolution):
+        """SerieResumee d'une résolution, ouverte à la demande (seule son index est chargé)."""
+        serie = self._series.get(resolution)
+        if serie is None:
+            serie = self._series[resolution] = SerieResumee(
+                os.path.join(self.dossier, f"{resolution}.bin"), RESOLUTIONS[resolution])
+        return serie
+
+    def integrer_colonnes(self, colonnes):
+        """Met à jour toutes les résolutions avec des colonnes de relevés."""
+        canaux = [getattr(colonnes, nom) for nom in CANAUX]
+        for resolution in RESOLUTIONS:
+            self.serie(resolution).integrer(colonnes.epoch, canaux)
+
+    def integrer(self, releves):
+        """Met à jour toutes les résolutions avec des relevés (dicts)."""
+        colonnes = TelemetrieColonnes()
+        for r in releves:
+            try:
+                epoch = epoch_iso(r['timestamp'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            colonnes.ajouter(r, epoch=epoch)
+        self.integrer_colonnes(colonnes)
+
+    def lire(self, resolution, debut=None, fin=None):
+        """Cases d'une résolution ('minute', 'heure', 'jour') ; debut/fin en ISO 8601 ou epoch."""
+        debut = epoch_iso(debut) if isinstance(debut, str) else debut
+        fin = epoch_iso(fin) if isinstance(fin, str) else fin
+        return self.serie(resolution).lire(debut, fin)
+
+    def source(self):
+        """Contenu de source.json, ou None."""
+        try:
+            with open(self.chemin_source, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _ecrire_source(self, source):
+        with open(self.chemin_source + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(source, f)
+        os.replace(self.chemin_source + ".tmp", self.chemin_source)
+
+    def _vider(self):
+        for resolution in RESOLUTIONS:
+            serie = self.serie(resolution)
+            if os.path.exists(serie.chemin):
+                os.remove(serie.chemin)
+            serie.debuts = array('d')
+
+    def _integrer_par_lots(self, releves, taille_lot):
+        lot = []
+        for releve in releves:
+            lot.append(releve)
+            if len(lot) == taille_lot:
+                self.integrer(lot)
+                lot = []
+        self.integrer(lot)
+
+    def _decrire_source(self, chemin_json, avant, precedente=None):
+        """source.json d'un fichier JSON intégré jusqu'à la fin de ses relevés.
+
+        Sans signature (reconstruction au prochain passage) si le fichier a
+        changé depuis os.stat 'avant'. offset_fin et les empreintes par bloc
+        permettent ensuite de reconnaître un simple ajout de relevés.
+        """
+        apres = os.stat(chemin_json)
+        if (avant.st_mtime_ns, avant.st_size) != (apres.st_mtime_ns, apres.st_size):
+            return {"chemin": chemin_json}
+        source = {"chemin": chemin_json, "signature": [apres.st_mtime_ns, apres.st_size]}
+        offset = fin_des_releves(chemin_json)
+        if offset is not None:
+            if precedente:
+                blocs = empreintes_blocs(chemin_json, offset, precedente['blocs'], precedente['offset_fin'])
+            else:
+                blocs = empreintes_blocs(chemin_json, offset)
+            source.update(offset_fin=offset, blocs=blocs,
+                          rotation=(precedente or {}).get('rotation', 0) + 1)
+        return source
+
+    def reconstruire(self, chemin_json, taille_lot=50000):
+        """Recalcule les résumés depuis un fichier de télémétrie JSON, par lots."""
+        # Source sans signature pendant le calcul : un arrêt brutal mène à une nouvelle reconstruction
+        self._ecrire_source({"chemin": chemin_json})
+        self._vider()
+        avant = os.stat(chemin_json)
+        self._integrer_par_lots(iterer_releves(chemin_json), taille_lot)
+        self._ecrire_source(self._decrire_source(chemin_json, avant))
+
+    def _prolonger(self, chemin_json, source, taille_lot=50000):
+        """Intègre les seuls relevés ajoutés après offset_fin ; False si les octets déjà intégrés ont changé."""
+        if not source or source.get("chemin") != chemin_json or source.get("offset_fin") is None:
+            return False
+        avant = os.stat(chemin_json)
+        if not prefixe_intact(chemin_json, source["offset_fin"], source.get("blocs"), source.get("rotation", 0)):
+            return False
+        self._ecrire_source({"chemin": chemin_json})
+        self._integrer_par_lots(iterer_releves_apres(chemin_json, source["offset_fin"]), taille_lot)
+        self._ecrire_source(self._decrire_source(chemin_json, avant, source))
+        return True
+
+    def synchroniser(self, chemin_json):
+        """Met les résumés à jour si chemin_json a changé ; retourne True s'il a changé.
+
+        Un simple ajout de relevés en fin de fichier n'intègre que les
+        nouveaux relevés ; toute autre modification des relevés déjà
+        intégrés provoque une reconstruction. Des résumés tenus par le
+        serveur d'ingestion ne sont jamais recalculés ici.
+        """
+        source = self.source()
+        if source and "flux" in source:
+            return False
+        st = os.stat(chemin_json)
+        if source and source.get("chemin") == chemin_json and source.get("signature") == [st.st_mtime_ns, st.st_size]:
+            return False
+        if not self._prolonger(chemin_json, source):
+            self.reconstruire(chemin_json)
+        return True
+
+    def suivre_flux(self, chemin_ndjson, taille_lot=50000):
+        """Prend les résumés en charge pour un flux NDJSON alimenté par ajouts ; retourne l'offset intégré.
+
+        Si le dossier suivait déjà ce flux, seules les lignes au-delà de
+        l'offset enregistré sont lues (arrêt entre l'écriture d'un lot et
+        la mise à jour des résumés) ; sinon les résumés sont recalculés
+        depuis tout le flux. Les lots suivants passent par integrer puis
+        marquer_flux.
+        """
+        source = self.source() or {}
+        taille = os.path.getsize(chemin_ndjson) if os.path.exists(chemin_ndjson) else 0
+        depart = source.get("offset", 0) if source.get("flux") == chemin_ndjson else None
+        if depart is None or depart > taille:
+            self._vider()
+            depart = 0
+        releves = []
+        offset = depart
+        if taille > depart:
+            with open(chemin_ndjson, 'rb') as f:
+                f.seek(depart)
+                for ligne in f:
+                    if not ligne.endswith(b"\n"):
+                        break   # ligne en cours d'écriture
+                    offset += len(ligne)
+                    try:
+                        releve = json.loads(ligne)
+                    except ValueError:
+                        continue
+                    if isinstance(releve, dict):
+                        releves.append(releve)
+        self._integrer_par_lots(releves, taille_lot)
+        self.marquer_flux(chemin_ndjson, offset)
+        return offset
+
+    def marquer_flux(self, chemin_ndjson, offset):
+        """Enregistre que le flux est intégré jusqu'à offset (octets)."""
+        self._ecrire_source({"flux": chemin_ndjson, "offset": offset})
+
+
+def resumes_mission(mission_id, chemin_json=None):
+    """Résumés d'une mission ; resynchronisés avec chemin_json s'il est donné."""
+    resumes = ResumesMission(mission_id)
+    if chemin_json:
+        resumes.synchroniser(chemin_json)
+    return resumes
+
+
+def afficher_tendances(cases, canal="carburant", limite=24):
+    """Tableau texte des dernières cases d'un canal."""
+    print(f"{'Début':<22}{'Relevés':>8}{'Min':>10}{'Moy.':>10}{'Max':>10}{'Dernier':>10}")
+    for case in cases[-limite:]:
+        stats = case.get(canal)
+        if stats:
+            print(f"{case['debut']:<22}{case['nb_releves']:>8}{stats['min']:>10.2f}{stats['moyenne']:>10.2f}"
+                  f"{stats['max']:>10.2f}{stats['dernier']:>10.2f}")
+
+
+if __name__ == '__main__':
+    # Usage : python resumes_temporels.py <mission_id> <json> [minute|heure|jour] [canal]
+    mission_id = sys.argv[1] if len(sys.argv) > 1 else 'MSN-001'
+    chemin = sys.argv[2] if len(sys.argv) > 2 else 'space_data/telemetrie.json'
+    resolution = sys.argv[3] if len(sys.argv) > 3 else 'jour'
+    canal = sys.argv[4] if len(sys.argv) > 4 else 'carburant'
+    resumes = resumes_mission(mission_id, chemin)
+    print(f"=== {mission_id} : {canal} par {resolution} ===")
+    afficher_tendances(resumes.lire(resolution), canal)
\ No newline at end of file
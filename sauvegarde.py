@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import zlib
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+DEPOT = 'space_data/depot_sauvegardes/'
+TAILLE_BLOC = 1024 * 1024
+NIVEAU_COMPRESSION = 6
+
+
+class DepotSauvegarde:
+    """Dépôt de sauvegardes dédupliqué par blocs adressés par leur contenu.
+
+    Chaque fichier est découpé en blocs de taille fixe ; un bloc est stocké
+    une seule fois sous 'blocs/<2 premiers car.>/<sha256>' (compressé zlib).
+    Un instantané est un manifeste JSON listant les blocs de chaque fichier.
+    """
+
+    def __init__(self, dossier=DEPOT, taille_bloc=TAILLE_BLOC, travailleurs=None):
+        self.dossier = dossier
+        self.taille_bloc = taille_bloc
+        self.travailleurs = travailleurs or os.cpu_count() or 2
+        self.dossier_blocs = os.path.join(dossier, "blocs")
+        self.dossier_instantanes = os.path.join(dossier, "instantanes")
+        os.makedirs(self.dossier_blocs, exist_ok=True)
+        os.makedirs(self.dossier_instantanes, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Blocs
+    # ------------------------------------------------------------------
+    def _chemin_bloc(self, empreinte):
+        return os.path.join(self.dossier_blocs, empreinte[:2], empreinte)
+
+    def _stocker_bloc(self, donnees):
+        """Hache, compresse et écrit un bloc s'il est nouveau. Retourne (empreinte, octets écrits)."""
+        # hashlib et zlib relâchent le GIL : les threads occupent plusieurs cœurs
+        empreinte = hashlib.sha256(donnees).hexdigest()
+        chemin = self._chemin_bloc(empreinte)
+        if os.path.exists(chemin):
+            return empreinte, 0
+        compresse = zlib.compress(donnees, NIVEAU_COMPRESSION)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        temporaire = f"{chemin}.{os.getpid()}.{id(donnees)}.tmp"
+        with open(temporaire, 'wb') as f:
+            f.write(compresse)
+        os.replace(temporaire, chemin)
+        return empreinte, len(compresse)
+
+    def _lire_bloc(self, empreinte):
+        with open(self._chemin_bloc(empreinte), 'rb') as f:
+            donnees = zlib.decompress(f.read())
+        if hashlib.sha256(donnees).hexdigest() != empreinte:
+            raise ValueError(f"Bloc corrompu : {empreinte}")
+        return donnees
+
+    # ------------------------------------------------------------------
+    # Instantanés
+    # ------------------------------------------------------------------
+    def _chemin_instantane(self, identifiant):
+        return os.path.join(self.dossier_instantanes, f"{identifiant}.json")
+
+    def _charger_instantane(self, identifiant):
+        with open(self._chemin_instantane(identifiant), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _identifiants(self):
+        return sorted(nom[:-5] for nom in os.listdir(self.dossier_instantanes) if nom.endswith(".json"))
+
+    def lister(self):
+        """Retourne le résumé des instantanés, du plus ancien au plus récent."""
+        resumes = []
+        for identifiant in self._identifiants():
+            instantane = self._charger_instantane(identifiant)
+            resume = {k: v for k, v in instantane.items() if k != "fichiers"}
+            resume["total_fichiers"] = len(instantane["fichiers"])
+            resumes.append(resume)
+        return resumes
+
+    def sauvegarder(self, source):
+        """Crée un instantané de 'source'. Seuls les fichiers changés sont relus."""
+        identifiants = self._identifiants()
+        anciens_fichiers = self._charger_instantane(identifiants[-1])["fichiers"] if identifiants else {}
+
+        fichiers = {}
+        a_lire = []
+        for racine, _, noms in os.walk(source):
+            for nom in noms:
+                chemin = os.path.join(racine, nom)
+                relatif = os.path.relpath(chemin, source).replace('\\', '/')
+                st = os.stat(chemin)
+                ancien = anciens_fichiers.get(relatif)
+                # Taille et date identiques : on reprend la liste de blocs précédente
+                if ancien and ancien["taille"] == st.st_size and ancien["mtime_ns"] == st.st_mtime_ns:
+                    fichiers[relatif] = ancien
+                else:
+                    fichiers[relatif] = {"taille": st.st_size, "mtime_ns": st.st_mtime_ns, "blocs": []}
+                    a_lire.append((relatif, chemin))
+
+        octets_lus = 0
+        octets_ecrits = 0
+        nouveaux_blocs = 0
+        with ThreadPoolExecutor(max_workers=self.travailleurs) as pool:
+            # Fenêtre de tâches bornée pour garder la mémoire sous contrôle
+            en_vol = deque()
+
+            def recolter():
+                nonlocal octets_ecrits, nouveaux_blocs
+                relatif, tache = en_vol.popleft()
+                empreinte, ecrits = tache.result()
+                fichiers[relatif]["blocs"].append(empreinte)
+                octets_ecrits += ecrits
+                nouveaux_blocs += ecrits > 0
+
+            for relatif, chemin in a_lire:
+                with open(chemin, 'rb') as f:
+                    while True:
+                        donnees = f.read(self.taille_bloc)
+                        if not donnees:
+                            break
+                        octets_lus += len(donnees)
+                        en_vol.append((relatif, pool.submit(self._stocker_bloc, donnees)))
+                        if len(en_vol) >= self.travailleurs * 4:
+                            recolter()
+            while en_vol:
+                recolter()
+
+        identifiant = datetime.now().strftime("%Y%m%dT%H%M%S")
+        suffixe = 1
+        base = identifiant
+        while os.path.exists(self._chemin_instantane(identifiant)):
+            suffixe += 1
+            identifiant = f"{base}-{suffixe}"
+
+        instantane = {
+            "id": identifiant,
+            "date": datetime.now().isoformat(timespec='seconds'),
+            "source": source,
+            "taille_totale_octets": sum(f["taille"] for f in fichiers.values()),
+            "fichiers_relus": len(a_lire),
+            "octets_lus": octets_lus,
+            "nouveaux_blocs": nouveaux_blocs,
+            "octets_ecrits": octets_ecrits,
+            "fichiers": fichiers,
+        }
+        # Le manifeste est écrit en dernier : un instantané visible est complet
+        temporaire = self._chemin_instantane(identifiant) + ".tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(instantane, f, ensure_ascii=False)
+        os.replace(temporaire, self._chemin_instantane(identifiant))
+        return instantane
+
+    def restaurer(self, identifiant, destination):
+        """Reconstruit les fichiers d'un instantané dans 'destination'."""
+        instantane = self._charger_instantane(identifiant)
+        for relatif, info in instantane["fichiers"].items():
+            chemin = os.path.join(destination, relatif)
+            os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+            with open(chemin, 'wb') as f:
+                for empreinte in info["blocs"]:
+                    f.write(self._lire_bloc(empreinte))
+            os.utime(chemin, ns=(info["mtime_ns"], info["mtime_ns"]))
+        return len(instantane["fichiers"])
+
+
+if __name__ == '__main__':
+    depot = DepotSauvegarde()
+    if len(sys.argv) >= 3 and sys.argv[1] == "restaurer":
+        destination = sys.argv[3] if len(sys.argv) > 3 else "space_data/restauration/"
+        n = depot.restaurer(sys.argv[2], destination)
+        print(f"[OK] {n} fichiers restaurés dans {destination}")
+    else:
+        print("=== Instantanés de sauvegarde ===")
+        for s in depot.lister():
+            print(f"[{s['id']}] {s['total_fichiers']} fichiers, "
+                  f"{s['taille_totale_octets'] / 1024:.1f} KB "
+                  f"(+{s['octets_ecrits'] / 1024:.1f} KB écrits)")
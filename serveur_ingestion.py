@@ -0,0 +1,377 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+from collections import defaultdict
+
+from telemetrie_colonnes import CANAUX, epoch_iso
+from validation_lot import CHAMPS_OBLIGATOIRES
+from resumes_temporels import ResumesMission
+
+HOTE = '127.0.0.1'
+PORT = 8765
+DOSSIER_BRUT = 'space_data/raw/'
+# Taille maximale d'un lot avant écriture, et délai maximal d'attente d'un lot (s)
+TAILLE_LOT = 2000
+DELAI_LOT = 0.05
+# Relevés en attente d'écriture au-delà desquels les connexions cessent d'être lues
+CAPACITE_FILE = 20000
+LONGUEUR_LIGNE_MAX = 64 * 1024
+
+_ID_MISSION = re.compile(r'[A-Za-z0-9_-]{1,64}\Z')
+
+# Protocole (TCP, une ligne par message) :
+#   {"mission_id": "MSN-001", "timestamp": ..., ...}  relevé au schéma 'releves'
+#   SYNC   -> "OK <acceptés> <rejetés>" une fois les relevés précédents écrits sur disque,
+#             ou "ECHEC <raison>" si l'écriture d'un relevé de cette connexion a échoué
+#             (seul le fichier de sa mission compte : un échec des résumés n'en est pas un)
+# Un relevé refusé renvoie "ERR <n° de ligne> <raison>".
+
+
+def valider_ligne(ligne):
+    """Validation rapide d'une ligne reçue ; retourne (relevé, None) ou (None, raison)."""
+    try:
+        releve = json.loads(ligne)
+    except ValueError:
+        return None, "JSON invalide"
+    if not isinstance(releve, dict):
+        return None, "objet JSON attendu"
+    mission_id = releve.get('mission_id')
+    if not isinstance(mission_id, str) or not _ID_MISSION.match(mission_id):
+        return None, "mission_id absent ou invalide"
+    for champ in CHAMPS_OBLIGATOIRES:
+        if champ not in releve:
+            return None, f"champ manquant : {champ}"
+    try:
+        epoch_iso(releve['timestamp'])
+    except (TypeError, AttributeError, ValueError):
+        return None, "timestamp invalide"
+    for cle in CANAUX.values():
+        valeur = releve.get(cle, 0.0)
+        if not isinstance(valeur, (int, float)) or isinstance(valeur, bool):
+            return None, f"valeur non numérique : {cle}"
+    position = releve.get('position_km', {})
+    if not isinstance(position, dict) or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in position.values()):
+        return None, "position_km invalide"
+    return releve, None
+
+
+class Compteurs:
+    """Compteurs de débit du serveur."""
+
+    def __init__(self):
+        self.debut = time.monotonic()
+        self.connexions = 0
+        self.recus = 0
+        self.acceptes = 0
+        self.rejetes = 0
+        self.octets = 0
+        self.lots = 0
+        self.ecritures = 0
+        self.echecs = 0         # relevés acceptés dont l'écriture a échoué
+        self.echecs_resumes = 0 # lots écrits dont les résumés n'ont pas pu être mis à jour
+        self.attente_file = 0   # nombre de fois où une connexion a été freinée
+
+    def resume(self):
+        duree = max(time.monotonic() - self.debut, 1e-9)
+        return (f"connexions {self.connexions} | reçus {self.recus} | acceptés {self.acceptes} "
+                f"| rejetés {self.rejetes} | {self.acceptes / duree:,.0f} relevés/s "
+                f"| {self.octets / duree / 1024:,.0f} Kio/s | lots {self.lots} "
+                f"| écritures {self.ecritures} | échecs {self.echecs} | échecs résumés {self.echecs_resumes} "
+                f"| freinages {self.attente_file}")
+
+
+class ServeurIngestion:
+    """Reçoit des relevés sur TCP local et les écrit par lots dans raw/<mission_id>.ndjson.
+
+    Les connexions déposent les lignes valides dans une file bornée ; une
+    seule tâche d'écriture vide la file par lots (regroupés par mission) et
+    les écrit hors de la boucle d'événements. Quand le disque ne suit pas,
+    la file se remplit et les connexions arrêtent de lire leur socket : la
+    pression remonte jusqu'aux émetteurs par TCP.
+    """
+
+    def __init__(self, dossier=DOSSIER_BRUT, fsync=True, taille_lot=TAILLE_LOT, delai_lot=DELAI_LOT,
+                 capacite=CAPACITE_FILE, resumes=True):
+        self.dossier = dossier
+        self.fsync = fsync
+        # Résumés multi-résolution tenus à jour à chaque lot écrit (None = désactivés)
+        self.resumes = {} if resumes else None
+        self.taille_lot = taille_lot
+        self.delai_lot = delai_lot
+        self.file = asyncio.Queue(maxsize=capacite)
+        self.compteurs = Compteurs()
+        os.makedirs(dossier, exist_ok=True)
+
+    async def _servir_client(self, lecteur, redacteur):
+        self.compteurs.connexions += 1
+        acceptes = rejetes = numero = 0
+        # Erreur d'écriture d'un relevé de cette connexion, signalée au prochain SYNC
+        connexion = {"erreur": None}
+        try:
+            while True:
+                try:
+                    ligne = await lecteur.readline()
+                except ValueError:
+                    # Ligne plus longue que la limite du flux : connexion fermée
+                    redacteur.write(b"ERR 0 ligne trop longue\n")
+                    await redacteur.drain()
+                    break
+                if not ligne:
+                    break
+                numero += 1
+                self.compteurs.octets += len(ligne)
+                contenu = ligne.strip()
+                if not contenu:
+                    continue
+                if contenu == b"SYNC":
+                    fait = asyncio.get_running_loop().create_future()
+                    await self.file.put(fait)
+                    try:
+                        await fait
+                    except Exception as e:
+                        connexion["erreur"] = e
+                    erreur, connexion["erreur"] = connexion["erreur"], None
+                    if erreur:
+                        redacteur.write(f"ECHEC {type(erreur).__name__}: {erreur}\n".encode())
+                    else:
+                        redacteur.write(f"OK {acceptes} {rejetes}\n".encode())
+                    await redacteur.drain()
+                    continue
+                self.compteurs.recus += 1
+                releve, raison = valider_ligne(contenu)
+                if raison:
+                    rejetes += 1
+                    self.compteurs.rejetes += 1
+                    redacteur.write(f"ERR {numero} {raison}\n".encode())
+                    await redacteur.drain()
+                    continue
+                acceptes += 1
+                if self.file.full():
+                    self.compteurs.attente_file += 1
+                await self.file.put((releve['mission_id'], contenu + b"\n", releve, connexion))
+        except ConnectionError:
+            pass
+        finally:
+            redacteur.close()
+
+    def _ecrire(self, lots, releves):
+        """Écriture (thread) : un append par mission, un fsync par fichier, puis les résumés.
+
+        Chaque mission est écrite indépendamment : un échec n'empêche pas
+        les suivantes. Retourne {mission_id: exception} des appends échoués.
+        """
+        echecs = {}
+        for mission_id, lignes in lots.items():
+            chemin = os.path.join(self.dossier, f"{mission_id}.ndjson")
+            try:
+                fin = self._ajouter_lignes(chemin, lignes)
+            except Exception as e:
+                print(f"[ERREUR] {len(lignes)} relevés de {mission_id} non écrits : {type(e).__name__}: {e}")
+                echecs[mission_id] = e
+                continue
+            self.compteurs.ecritures += 1
+            if self.resumes is not None:
+                self._mettre_a_jour_resumes(mission_id, chemin, releves[mission_id], fin)
+        return echecs
+
+    def _ajouter_lignes(self, chemin, lignes):
+        """Append durable ; en cas d'échec le fichier est ramené à sa taille initiale. Retourne la fin."""
+        with open(chemin, 'ab') as f:
+            debut = f.tell()
+            try:
+                f.write(b"".join(lignes))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            except Exception:
+                # Pas de ligne partielle : le client renverra tout le lot
+                try:
+                    f.truncate(debut)
+                except OSError:
+                    pass
+                raise
+            return f.tell()
+
+    def _mettre_a_jour_resumes(self, mission_id, chemin, releves, fin):
+        """Résumés après un append réussi ; une erreur est journalisée sans toucher à l'acquittement."""
+        try:
+            resumes = self.resumes.get(mission_id)
+            if resumes is None:
+                # Premier lot de la session : les résumés rattrapent le flux, ce lot compris
+                resumes = self.resumes[mission_id] = ResumesMission(mission_id)
+                resumes.suivre_flux(chemin)
+            else:
+                resumes.integrer(releves)
+                resumes.marquer_flux(chemin, fin)
+        except Exception as e:
+            # Au prochain lot, suivre_flux reprendra depuis le dernier offset marqué
+            self.resumes.pop(mission_id, None)
+            self.compteurs.echecs_resumes += 1
+            print(f"[ERREUR] Résumés de {mission_id} non mis à jour : {type(e).__name__}: {e}")
+
+    async def _ecrivain(self):
+        """Vide la file par lots : écrit dès que TAILLE_LOT relevés ou DELAI_LOT secondes."""
+        boucle = asyncio.get_running_loop()
+        while True:
+            element = await self.file.get()
+            lots = defaultdict(list)
+            releves = defaultdict(list)
+            syncs = []
+            connexions = defaultdict(dict)   # mission -> connexions ayant envoyé un relevé du lot
+            nombre = 0
+            limite = boucle.time() + self.delai_lot
+            while True:
+                if isinstance(element, asyncio.Future):
+                    # Un SYNC termine le lot : il est acquitté après l'écriture
+                    syncs.append(element)
+                    break
+                mission_id, ligne, releve, connexion = element
+                connexions[mission_id][id(connexion)] = connexion
+                lots[mission_id].append(ligne)
+                releves[mission_id].append(releve)
+                nombre += 1
+                if nombre >= self.taille_lot:
+                    break
+                element = None
+                while element is None:
+                    try:
+                        element = self.file.get_nowait()
+                    except asyncio.QueueEmpty:
+                        reste = limite - boucle.time()
+                        if reste <= 0:
+                            break
+                        # Pas de wait_for sur get() : une annulation au mauvais
+                        # moment peut perdre l'élément retiré de la file
+                        await asyncio.sleep(min(reste, 0.005))
+                if element is None:
+                    break
+            if lots:
+                try:
+                    echecs = await asyncio.to_thread(self._ecrire, lots, releves)
+                except Exception as e:
+                    # Erreur inattendue : aucune mission n'est réputée écrite
+                    print(f"[ERREUR] Lot de {nombre} relevés non écrit : {type(e).__name__}: {e}")
+                    echecs = dict.fromkeys(lots, e)
+                # Seules les connexions dont la mission n'a pas été écrite reçoivent ECHEC au SYNC
+                for mission_id, erreur in echecs.items():
+                    self.compteurs.echecs += len(lots[mission_id])
+                    for connexion in connexions[mission_id].values():
+                        connexion["erreur"] = erreur
+                self.compteurs.acceptes += nombre - sum(len(lots[m]) for m in echecs)
+                self.compteurs.lots += 1
+            for fait in syncs:
+                if not fait.done():
+                    fait.set_result(None)
+
+    async def _rapporter(self, periode):
+        while True:
+            await asyncio.sleep(periode)
+            print(f"[ingestion] {self.compteurs.resume()}")
+
+    async def servir(self, hote=HOTE, port=PORT, duree=None, periode_rapport=5.0):
+        """Lance le serveur ; s'arrête après 'duree' secondes (None = jusqu'à interruption)."""
+        serveur = await asyncio.start_server(self._servir_client, hote, port, limit=LONGUEUR_LIGNE_MAX)
+        taches = [asyncio.create_task(self._ecrivain())]
+        if periode_rapport:
+            taches.append(asyncio.create_task(self._rapporter(periode_rapport)))
+        print(f"Serveur d'ingestion sur {hote}:{port} -> {self.dossier}")
+        try:
+            async with serveur:
+                if duree is None:
+                    await serveur.serve_forever()
+                else:
+                    await asyncio.sleep(duree)
+        finally:
+            # Les relevés déjà acceptés sont écrits avant l'arrêt
+            fait = asyncio.get_running_loop().create_future()
+            await self.file.put(fait)
+            try:
+                await fait
+            except Exception as e:
+                print(f"[ERREUR] Derniers relevés non écrits : {e}")
+            for tache in taches:
+                tache.cancel()
+            await asyncio.gather(*taches, return_exceptions=True)
+            print(f"[ingestion] {self.compteurs.resume()}")
+
+
+# ==========================================
+# CLIENT DE CHARGE
+# ==========================================
+def releve_synthetique(mission_id, i, t0):
+    """Relevé plausible au schéma 'releves' (tirages aléatoires bornés)."""
+    return {
+        "mission_id": mission_id,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t0 + 30 * i)),
+        "position_km": {"x": 1000.0 * i, "y": 700.0 * i, "z": 300.0 * i},
+        "altitude_km": 400 + i,
+        "vitesse_km_s": round(random.uniform(7.0, 16.0), 2),
+        "carburant_pourcent": round(max(0.0, 100 - i * 0.01), 2),
+        "oxygene_pourcent": round(random.uniform(84.0, 99.0), 1),
+        "temperature_cabine_c": round(random.uniform(15.0, 29.0), 1),
+        "systemes": {"propulsion": "nominal", "navigation": "nominal", "communication": "nominal"},
+    }
+
+
+async def _vaisseau(hote, port, mission_id, nombre, taille_paquet):
+    lecteur, redacteur = await asyncio.open_connection(hote, port)
+    t0 = time.time()
+    for debut in range(0, nombre, taille_paquet):
+        paquet = [releve_synthetique(mission_id, i, t0) for i in range(debut, min(debut + taille_paquet, nombre))]
+        redacteur.write("".join(json.dumps(r) + "\n" for r in paquet).encode())
+        # drain() attend quand le serveur ne lit plus : c'est la contre-pression
+        await redacteur.drain()
+    redacteur.write(b"SYNC\n")
+    await redacteur.drain()
+    # Les éventuels ERR précèdent l'acquittement final
+    reponse = await lecteur.readline()
+    while reponse.startswith(b"ERR"):
+        reponse = await lecteur.readline()
+    redacteur.close()
+    await redacteur.wait_closed()
+    if not reponse.startswith(b"OK"):
+        raise ConnectionError(f"{mission_id} : {reponse.decode(errors='replace').strip() or 'connexion fermée'}")
+    _, acceptes, rejetes = reponse.split()
+    return int(acceptes), int(rejetes)
+
+
+async def test_de_charge(hote=HOTE, port=PORT, vaisseaux=10, releves=10000, taille_paquet=500):
+    """Simule 'vaisseaux' émetteurs concurrents ; retourne (acceptés, rejetés, durée)."""
+    debut = time.perf_counter()
+    resultats = await asyncio.gather(*(
+        _vaisseau(hote, port, f"CHARGE-{n:03d}", releves, taille_paquet) for n in range(vaisseaux)
+    ))
+    duree = time.perf_counter() - debut
+    acceptes = sum(a for a, _ in resultats)
+    rejetes = sum(r for _, r in resultats)
+    print(f"Test de charge : {acceptes} acceptés, {rejetes} rejetés en {duree:.2f}s "
+          f"({acceptes / duree:,.0f} relevés/s, écrits sur disque)")
+    return acceptes, rejetes, duree
+
+
+def _option(nom, defaut, conversion=int):
+    if nom in sys.argv:
+        return conversion(sys.argv[sys.argv.index(nom) + 1])
+    return defaut
+
+
+if __name__ == '__main__':
+    port = _option('--port', PORT)
+    if 'charge' in sys.argv:
+        asyncio.run(test_de_charge(port=port, vaisseaux=_option('--vaisseaux', 10),
+                                   releves=_option('--releves', 10000)))
+    else:
+        from chargeur_donnees import charger_json_securise
+        config = charger_json_securise('space_data/config_systeme.json') or {}
+        dossier = config.get('repertoires', {}).get('telemetrie_brute', DOSSIER_BRUT)
+        serveur = ServeurIngestion(dossier, fsync='--sans-fsync' not in sys.argv,
+                                   resumes='--sans-resumes' not in sys.argv)
+        try:
+            asyncio.run(serveur.servir(port=port, duree=_option('--duree', None, float)))
+        except KeyboardInterrupt:
+            print("\nServeur arrêté.")
\ No newline at end of file
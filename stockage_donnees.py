@@ -0,0 +1,699 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+from itertools import chain
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from chargeur_donnees import charger_json_securise
+from index_donnees import normaliser_nom, signature_fichiers
+from journal_mission import JournalMission, migrer_journal_json
+from lecteur_telemetrie import iterer_releves, lire_entete
+
+# Choix du moteur : variable NAVSYS_STOCKAGE, sinon clé "stockage" de la configuration
+#   "stockage": {"moteur": "json" | "sqlite", "base": "space_data/navigation.db"}
+CONFIG_PATH = 'space_data/config_systeme.json'
+VARIABLE_MOTEUR = 'NAVSYS_STOCKAGE'
+RACINE = 'space_data/'
+BASE_SQLITE = 'space_data/navigation.db'
+DOSSIER_EXPORT = 'space_data/export/'
+TAILLE_LOT = 5000
+# Écritures concurrentes en SQLite : attente maximale de la base verrouillée (s)
+DELAI_VERROU = 10
+
+
+def _en_epoch(instant):
+    from telemetrie_segments import en_epoch
+    return en_epoch(instant)
+
+
+@contextmanager
+def verrou_fichier(chemin):
+    """Verrou exclusif entre processus sur le fichier '<chemin>.verrou'.
+
+    Le verrou (flock, ou msvcrt sous Windows) appartient au descripteur
+    ouvert : le système le libère si l'écrivain meurt, et personne ne peut
+    le prendre à un écrivain vivant, même pendant une longue réécriture.
+    On attend donc sans limite. Le fichier n'est jamais supprimé ; il garde
+    le PID du dernier détenteur.
+    """
+    verrou = chemin + ".verrou"
+    os.makedirs(os.path.dirname(verrou) or '.', exist_ok=True)
+    fd = os.open(verrou, os.O_CREAT | os.O_RDWR)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK abandonne après 10 tentatives : le détenteur écrit encore
+                    pass
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        # Fermer le descripteur libère le verrou
+        os.close(fd)
+
+
+def _lire_json(chemin):
+    # Lecture hors cache : le document va être modifié
+    try:
+        with open(chemin, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _ecrire_json(chemin, donnees):
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    with open(chemin + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(donnees, f, indent=2, ensure_ascii=False)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def _fusionner(existants, nouveaux, cles):
+    """Met à jour la liste existants par clé (ordre conservé, nouveaux en fin).
+
+    cles(liste) retourne la clé de chaque élément d'une liste.
+    """
+    positions = {cle: i for i, cle in enumerate(cles(existants))}
+    for cle, element in zip(cles(nouveaux), nouveaux):
+        i = positions.get(cle)
+        if i is None:
+            positions[cle] = len(existants)
+            existants.append(element)
+        else:
+            existants[i] = element
+    return existants
+
+
+def _identites_astronautes(astronautes):
+    """Identité de chaque astronaute d'une liste, pour les mises à jour.
+
+    Champ 'id' s'il existe ; sinon nom normalisé et rang parmi les
+    homonymes de la liste : le 2e « Léa Fontaine » d'un lot remplace le
+    2e enregistré, deux homonymes ne sont jamais fusionnés.
+    """
+    identites, homonymes = [], {}
+    for a in astronautes:
+        if a.get('id') is not None:
+            identites.append(f"id:{a['id']}")
+        else:
+            cle = normaliser_nom(a['nom'])
+            homonymes[cle] = homonymes.get(cle, 0) + 1
+            identites.append(f"nom:{cle}#{homonymes[cle]}")
+    return identites
+
+
+# ==========================================
+# MOTEUR JSON (fichiers historiques)
+# ==========================================
+class StockageJson:
+    """Fichiers JSON de space_data/ : missions.json, equipages.json, télémétrie par mission.
+
+    Une écriture réécrit le document entier (temporaire puis remplacement)
+    sous un verrou qui sérialise les écrivains de tous les processus. Le
+    journal est le journal segmenté en ajout seul de journal_mission.
+    """
+
+    moteur = "json"
+
+    def __init__(self, racine=RACINE, chemin_missions=None, chemin_equipages=None):
+        self.racine = racine
+        self.chemin_missions = chemin_missions or os.path.join(racine, 'missions.json')
+        self.chemin_equipages = chemin_equipages or os.path.join(racine, 'equipages.json')
+        self.dossier_telemetrie = os.path.join(racine, 'telemetrie')
+        self.dossier_journal = os.path.join(racine, 'logs', 'journal')
+        self.ancien_journal = os.path.join(racine, 'logs', 'journal.json')
+
+    def cle(self):
+        return ("json", os.path.abspath(self.chemin_missions), os.path.abspath(self.chemin_equipages))
+
+    def signature(self):
+        """Change dès qu'une mission ou un astronaute est modifié (index_donnees)."""
+        return signature_fichiers((self.chemin_missions, self.chemin_equipages))
+
+    # ------------------------------------------------------------------
+    # Missions, registre et équipages
+    # ------------------------------------------------------------------
+    def missions(self):
+        return (charger_json_securise(self.chemin_missions) or {}).get('missions', [])
+
+    def mission(self, mission_id):
+        return next((m for m in self.missions() if m['id'] == mission_id), None)
+
+    def astronautes(self):
+        return (charger_json_securise(self.chemin_equipages) or {}).get('astronautes', [])
+
+    def equipage(self, mission_id):
+        """Liste de (membre tel qu'écrit dans la mission, profil ou None)."""
+        profils = {}
+        for a in self.astronautes():
+            # Homonymes : le premier enregistré, comme en SQLite
+            profils.setdefault(normaliser_nom(a['nom']), a)
+        return [(membre, profils.get(normaliser_nom(membre)))
+                for membre in (self.mission(mission_id) or {}).get('equipage', [])]
+
+    def enregistrer_missions(self, missions):
+        """Ajoute ou remplace des missions (clé : id)."""
+        with verrou_fichier(self.chemin_missions):
+            document = _lire_json(self.chemin_missions)
+            document['missions'] = _fusionner(document.get('missions', []), missions,
+                                              lambda liste: [m['id'] for m in liste])
+            _ecrire_json(self.chemin_missions, document)
+
+    def enregistrer_astronautes(self, astronautes):
+        """Ajoute ou remplace des astronautes (voir _identites_astronautes)."""
+        with verrou_fichier(self.chemin_equipages):
+            document = _lire_json(self.chemin_equipages)
+            document['astronautes'] = _fusionner(document.get('astronautes', []), astronautes,
+                                                 _identites_astronautes)
+            _ecrire_json(self.chemin_equipages, document)
+
+    # ------------------------------------------------------------------
+    # Télémétrie
+    # ------------------------------------------------------------------
+    def chemin_telemetrie(self, mission_id):
+        """telemetrie/<id>.json, ou le fichier historique telemetrie.json s'il porte ce mission_id."""
+        chemin = os.path.join(self.dossier_telemetrie, f"{mission_id}.json")
+        if os.path.exists(chemin):
+            return chemin
+        chemin = os.path.join(self.racine, 'telemetrie.json')
+        if os.path.exists(chemin) and lire_entete(chemin).get('mission_id', 'MSN-001') == mission_id:
+            return chemin
+        return None
+
+    def missions_telemetrie(self):
+        """Identifiants des missions qui ont une télémétrie."""
+        ids = []
+        if os.path.isdir(self.dossier_telemetrie):
+            ids = sorted(nom[:-5] for nom in os.listdir(self.dossier_telemetrie) if nom.endswith('.json'))
+        historique = os.path.join(self.racine, 'telemetrie.json')
+        if os.path.exists(historique):
+            mission_id = lire_entete(historique).get('mission_id', 'MSN-001')
+            if mission_id not in ids:
+                ids.append(mission_id)
+        return ids
+
+    def entete_telemetrie(self, mission_id):
+        chemin = self.chemin_telemetrie(mission_id)
+        return lire_entete(chemin) if chemin else None
+
+    def releves(self, mission_id, debut=None, fin=None):
+        """Relevés de la mission dans l'ordre du fichier, bornes ISO 8601 ou epoch incluses."""
+        chemin = self.chemin_telemetrie(mission_id)
+        if chemin is None:
+            return
+        if debut is None and fin is None:
+            yield from iterer_releves(chemin)
+            return
+        debut = -float('inf') if debut is None else _en_epoch(debut)
+        fin = float('inf') if fin is None else _en_epoch(fin)
+        for releve in iterer_releves(chemin):
+            if debut <= _en_epoch(releve['timestamp']) <= fin:
+                yield releve
+
+    def _ecrire_telemetrie(self, chemin, entete, releves):
+        """Écrit {entête..., "releves": [...]} en flux ('releves' en dernier, comme les lecteurs l'attendent)."""
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        nombre = 0
+        with open(chemin + ".tmp", 'w', encoding='utf-8') as f:
+            f.write("{")
+            for cle, valeur in entete.items():
+                if cle != 'releves':
+                    f.write(f"\n  {json.dumps(cle)}: {json.dumps(valeur, ensure_ascii=False)},")
+            f.write('\n  "releves": [')
+            for releve in releves:
+                f.write(("," if nombre else "") + "\n    " + json.dumps(releve, ensure_ascii=False))
+                nombre += 1
+            f.write("\n  ]\n}")
+        os.replace(chemin + ".tmp", chemin)
+        return nombre
+
+    def remplacer_telemetrie(self, mission_id, entete, releves):
+        """Réécrit toute la télémétrie de la mission ; retourne le nombre de relevés."""
+        chemin = self.chemin_telemetrie(mission_id) or os.path.join(self.dossier_telemetrie, f"{mission_id}.json")
+        with verrou_fichier(chemin):
+            return self._ecrire_telemetrie(chemin, dict(entete or {}, mission_id=mission_id), releves)
+
+    def ajouter_releves(self, mission_id, releves, entete=None):
+        """Ajoute des relevés en fin de télémétrie (le fichier est réécrit) ; retourne leur nombre."""
+        chemin = self.chemin_telemetrie(mission_id) or os.path.join(self.dossier_telemetrie, f"{mission_id}.json")
+        releves = list(releves)
+        with verrou_fichier(chemin):
+            if os.path.exists(chemin):
+                entete = lire_entete(chemin)
+                existants = iterer_releves(chemin)
+            else:
+                existants = ()
+            self._ecrire_telemetrie(chemin, dict(entete or {}, mission_id=mission_id), chain(existants, releves))
+        return len(releves)
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+    def journal(self):
+        journal = JournalJson(self.dossier_journal)
+        migrer_journal_json(journal, self.ancien_journal)
+        return journal
+
+    def fermer(self):
+        pass
+
+
+class JournalJson(JournalMission):
+    """Journal segmenté partagé entre processus.
+
+    L'ouverture (qui répare le dernier segment) et les écritures prennent
+    le verrou du dossier : sans lui, un processus qui ouvre le journal
+    pendant l'ajout d'un autre indexerait deux fois les mêmes lignes.
+    """
+
+    def __init__(self, dossier):
+        self.verrou = os.path.join(dossier, "journal")
+        with verrou_fichier(self.verrou):
+            super().__init__(dossier)
+
+    def ajouter_lot(self, entrees):
+        entrees = list(entrees)
+        with verrou_fichier(self.verrou):
+            # Un autre processus a pu ouvrir un nouveau segment entre-temps
+            self.segments = self._lister_segments()
+            super().ajouter_lot(entrees)
+
+    def vider(self):
+        with verrou_fichier(self.verrou):
+            self.segments = self._lister_segments()
+            super().vider()
+
+    def tronquer(self, position):
+        with verrou_fichier(self.verrou):
+            self.segments = self._lister_segments()
+            super().tronquer(position)
+
+
+# ==========================================
+# MOTEUR SQLITE (WAL)
+# ==========================================
+# Clé de substitution : deux homonymes restent deux lignes (index non unique sur le nom normalisé)
+SCHEMA_ASTRONAUTES = """
+CREATE TABLE IF NOT EXISTS astronautes (
+    id INTEGER PRIMARY KEY,
+    identite TEXT NOT NULL UNIQUE,
+    cle TEXT NOT NULL,
+    nom TEXT NOT NULL,
+    nationalite TEXT,
+    specialite TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS astronautes_cle ON astronautes (cle);
+CREATE INDEX IF NOT EXISTS astronautes_nationalite ON astronautes (nationalite);
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS missions (
+    id TEXT PRIMARY KEY,
+    rang INTEGER NOT NULL,
+    nom TEXT,
+    destination TEXT,
+    statut TEXT,
+    date_lancement TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS missions_statut ON missions (statut);
+""" + SCHEMA_ASTRONAUTES + """
+CREATE TABLE IF NOT EXISTS equipages (
+    mission_id TEXT NOT NULL REFERENCES missions (id) ON DELETE CASCADE,
+    rang INTEGER NOT NULL,
+    membre TEXT NOT NULL,
+    astronaute TEXT NOT NULL,
+    PRIMARY KEY (mission_id, rang)
+);
+CREATE INDEX IF NOT EXISTS equipages_astronaute ON equipages (astronaute);
+CREATE TABLE IF NOT EXISTS telemetrie (
+    mission_id TEXT PRIMARY KEY,
+    entete TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS releves (
+    mission_id TEXT NOT NULL,
+    epoch REAL NOT NULL,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS releves_mission_epoch ON releves (mission_id, epoch);
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY,
+    mission TEXT,
+    date TEXT,
+    auteur TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_mission_date ON journal (mission, date);
+CREATE TABLE IF NOT EXISTS versions (
+    nom TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class StockageSqlite:
+    """Base SQLite en mode WAL : une ligne par mission, astronaute, relevé ou entrée de journal.
+
+    Chaque objet garde sa forme JSON d'origine (colonne 'document') ; les
+    champs interrogés sont aussi des colonnes indexées. En WAL, les lecteurs
+    ne bloquent pas l'écrivain ; les écrivains prennent le verrou en début
+    de transaction (BEGIN IMMEDIATE) et s'attendent au lieu d'échouer.
+    """
+
+    moteur = "sqlite"
+
+    def __init__(self, base=BASE_SQLITE):
+        self.base = base
+        self._pid = None
+        self._heritees = []
+        os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+        self.connexion.executescript(SCHEMA)
+        # 'creation' distingue une base recréée au même chemin d'une base dont les compteurs valent autant
+        self.connexion.execute("INSERT OR IGNORE INTO versions (nom, version) VALUES ('creation', ?), "
+                               "('missions', 0), ('astronautes', 0)", (time.time_ns(),))
+        self._migrer_astronautes()
+
+    @property
+    def connexion(self):
+        """Connexion du processus courant, ouverte au premier usage.
+
+        Un processus fils (ProcessPoolExecutor en fork, tableaudebord
+        --flotte) hérite de l'objet mais pas de la connexion : il ouvre la
+        sienne. Celle du parent n'est ni utilisée ni fermée dans le fils
+        (la fermer pourrait toucher au WAL que le parent utilise encore).
+        """
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                self._heritees.append(self._connexion)
+            # Transactions explicites (isolation_level=None) : voir _transaction
+            self._connexion = sqlite3.connect(self.base, timeout=DELAI_VERROU, isolation_level=None)
+            self._connexion.execute("PRAGMA journal_mode=WAL")
+            self._connexion.execute("PRAGMA synchronous=NORMAL")
+            self._connexion.execute("PRAGMA foreign_keys=ON")
+            self._pid = os.getpid()
+        return self._connexion
+
+    def _migrer_astronautes(self):
+        """Bases antérieures : la table astronautes, clé sur le nom normalisé, est recréée."""
+        with self._transaction() as c:
+            colonnes = {ligne[1] for ligne in c.execute("PRAGMA table_info(astronautes)")}
+            if 'identite' in colonnes:
+                return
+            anciens = [json.loads(document) for (document,) in
+                       c.execute("SELECT document FROM astronautes ORDER BY rang")]
+            c.execute("DROP TABLE astronautes")
+            for instruction in SCHEMA_ASTRONAUTES.split(';'):
+                if instruction.strip():
+                    c.execute(instruction)
+            self._inserer_astronautes(c, anciens)
+
+    def cle(self):
+        return ("sqlite", os.path.abspath(self.base))
+
+    def signature(self):
+        """Change dès qu'une mission ou un astronaute est modifié (index_donnees).
+
+        Ce sont les compteurs de la table versions, incrémentés par
+        enregistrer_missions et enregistrer_astronautes : un ajout au
+        journal ou à la télémétrie ne fait pas reconstruire les index.
+        """
+        return tuple(self.connexion.execute("SELECT nom, version FROM versions ORDER BY nom"))
+
+    @staticmethod
+    def _incrementer(c, nom):
+        c.execute("UPDATE versions SET version = version + 1 WHERE nom = ?", (nom,))
+
+    @contextmanager
+    def _transaction(self):
+        self.connexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connexion
+        except BaseException:
+            self.connexion.execute("ROLLBACK")
+            raise
+        self.connexion.execute("COMMIT")
+
+    def _documents(self, requete, parametres=()):
+        return [json.loads(document) for (document,) in self.connexion.execute(requete, parametres)]
+
+    # ------------------------------------------------------------------
+    # Missions, registre et équipages
+    # ------------------------------------------------------------------
+    def missions(self):
+        return self._documents("SELECT document FROM missions ORDER BY rang")
+
+    def mission(self, mission_id):
+        documents = self._documents("SELECT document FROM missions WHERE id = ?", (mission_id,))
+        return documents[0] if documents else None
+
+    def astronautes(self):
+        return self._documents("SELECT document FROM astronautes ORDER BY id")
+
+    def equipage(self, mission_id):
+        """Liste de (membre tel qu'écrit dans la mission, profil ou None).
+
+        Homonymes : le premier astronaute enregistré sous ce nom.
+        """
+        lignes = self.connexion.execute(
+            "SELECT e.membre, (SELECT a.document FROM astronautes a WHERE a.cle = e.astronaute "
+            "ORDER BY a.id LIMIT 1) FROM equipages e WHERE e.mission_id = ? ORDER BY e.rang", (mission_id,))
+        return [(membre, json.loads(document) if document else None) for membre, document in lignes]
+
+    def enregistrer_missions(self, missions):
+        """Ajoute ou remplace des missions (clé : id) et leurs équipages."""
+        with self._transaction() as c:
+            rang = c.execute("SELECT COALESCE(MAX(rang), 0) FROM missions").fetchone()[0]
+            for rang, m in enumerate(missions, rang + 1):
+                c.execute(
+                    "INSERT INTO missions (id, rang, nom, destination, statut, date_lancement, document) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET nom = excluded.nom, "
+                    "destination = excluded.destination, statut = excluded.statut, "
+                    "date_lancement = excluded.date_lancement, document = excluded.document",
+                    (m['id'], rang, m.get('nom'), m.get('destination'), m.get('statut'),
+                     m.get('date_lancement'), json.dumps(m, ensure_ascii=False)))
+                c.execute("DELETE FROM equipages WHERE mission_id = ?", (m['id'],))
+                c.executemany("INSERT INTO equipages (mission_id, rang, membre, astronaute) VALUES (?, ?, ?, ?)",
+                              ((m['id'], i, membre, normaliser_nom(membre))
+                               for i, membre in enumerate(m.get('equipage', []))))
+            self._incrementer(c, 'missions')
+
+    def enregistrer_astronautes(self, astronautes):
+        """Ajoute ou remplace des astronautes (voir _identites_astronautes)."""
+        with self._transaction() as c:
+            self._inserer_astronautes(c, astronautes)
+            self._incrementer(c, 'astronautes')
+
+    @staticmethod
+    def _inserer_astronautes(c, astronautes):
+        c.executemany(
+            "INSERT INTO astronautes (identite, cle, nom, nationalite, specialite, document) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (identite) DO UPDATE SET cle = excluded.cle, "
+            "nom = excluded.nom, nationalite = excluded.nationalite, specialite = excluded.specialite, "
+            "document = excluded.document",
+            ((identite, normaliser_nom(a['nom']), a['nom'], a.get('nationalite'), a.get('specialite'),
+              json.dumps(a, ensure_ascii=False))
+             for identite, a in zip(_identites_astronautes(astronautes), astronautes)))
+
+    # ------------------------------------------------------------------
+    # Télémétrie
+    # ------------------------------------------------------------------
+    def missions_telemetrie(self):
+        return [mission_id for (mission_id,) in
+                self.connexion.execute("SELECT mission_id FROM telemetrie ORDER BY mission_id")]
+
+    def entete_telemetrie(self, mission_id):
+        documents = self._documents("SELECT entete FROM telemetrie WHERE mission_id = ?", (mission_id,))
+        return documents[0] if documents else None
+
+    def releves(self, mission_id, debut=None, fin=None):
+        """Relevés de la mission par ordre chronologique, bornes ISO 8601 ou epoch incluses (index)."""
+        debut = -float('inf') if debut is None else _en_epoch(debut)
+        fin = float('inf') if fin is None else _en_epoch(fin)
+        curseur = self.connexion.execute(
+            "SELECT document FROM releves WHERE mission_id = ? AND epoch BETWEEN ? AND ? ORDER BY epoch, rowid",
+            (mission_id, debut, fin))
+        for (document,) in curseur:
+            yield json.loads(document)
+
+    def _inserer_releves(self, c, mission_id, releves):
+        from telemetrie_colonnes import epoch_iso
+        return c.executemany("INSERT INTO releves (mission_id, epoch, document) VALUES (?, ?, ?)",
+                             ((mission_id, epoch_iso(r['timestamp']), json.dumps(r, ensure_ascii=False))
+                              for r in releves)).rowcount
+
+    def remplacer_telemetrie(self, mission_id, entete, releves):
+        """Remplace toute la télémétrie de la mission (une transaction) ; retourne le nombre de relevés."""
+        with self._transaction() as c:
+            c.execute("DELETE FROM releves WHERE mission_id = ?", (mission_id,))
+            c.execute("INSERT OR REPLACE INTO telemetrie (mission_id, entete) VALUES (?, ?)",
+                      (mission_id, json.dumps(dict(entete or {}, mission_id=mission_id), ensure_ascii=False)))
+            return self._inserer_releves(c, mission_id, releves)
+
+    def ajouter_releves(self, mission_id, releves, entete=None):
+        """Ajoute des relevés sans toucher aux existants ; retourne leur nombre."""
+        with self._transaction() as c:
+            c.execute("INSERT OR IGNORE INTO telemetrie (mission_id, entete) VALUES (?, ?)",
+                      (mission_id, json.dumps(dict(entete or {}, mission_id=mission_id), ensure_ascii=False)))
+            return self._inserer_releves(c, mission_id, releves)
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+    def journal(self):
+        return JournalSqlite(self)
+
+    def fermer(self):
+        if self._pid == os.getpid():
+            self._connexion.close()
+            self._pid = None
+
+
+class JournalSqlite:
+    """Table 'journal' avec l'interface de JournalMission.
+
+    La position d'une entrée est son rang d'insertion (id - 1) : un journal
+    importé garde les positions du journal d'origine, et l'index de
+    recherche (index_journaux) reste valable après un changement de moteur.
+    """
+
+    def __init__(self, stockage):
+        self.stockage = stockage
+
+    @property
+    def connexion(self):
+        return self.stockage.connexion
+
+    def ajouter(self, entree):
+        self.ajouter_lot([entree])
+
+    def ajouter_lot(self, entrees):
+        with self.stockage._transaction() as c:
+            c.executemany("INSERT INTO journal (mission, date, auteur, document) VALUES (?, ?, ?, ?)",
+                          ((e.get('mission'), str(e.get('date', '')), e.get('auteur'),
+                            json.dumps(e, ensure_ascii=False)) for e in entrees))
+
+    def vider(self):
+        with self.stockage._transaction() as c:
+            c.execute("DELETE FROM journal")
+
+    def __len__(self):
+        return self.connexion.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    def __iter__(self):
+        for (document,) in self.connexion.execute("SELECT document FROM journal ORDER BY id"):
+            yield json.loads(document)
+
+    def entrees_depuis(self, position):
+        """Itère sur (position, entrée) à partir de la position donnée (0 = première entrée)."""
+        for identifiant, document in self.connexion.execute(
+                "SELECT id, document FROM journal WHERE id > ? ORDER BY id", (position,)):
+            yield identifiant - 1, json.loads(document)
+
+    def dernieres_entrees(self, n=20, page=0):
+        """Page de n entrées (page 0 = la plus récente), dans l'ordre chronologique."""
+        documents = self.stockage._documents(
+            "SELECT document FROM journal ORDER BY id DESC LIMIT ? OFFSET ?", (n, n * page))
+        documents.reverse()
+        return documents
+
+
+# ==========================================
+# CHOIX DU MOTEUR, IMPORT / EXPORT
+# ==========================================
+MOTEURS = {"json": StockageJson, "sqlite": StockageSqlite}
+_ouverts = {}
+
+
+def ouvrir_stockage(moteur=None):
+    """Stockage configuré, partagé par tout le processus.
+
+    Moteur : argument, sinon NAVSYS_STOCKAGE, sinon la clé "stockage" de
+    config_systeme.json, sinon les fichiers JSON.
+    """
+    reglages = (charger_json_securise(CONFIG_PATH) or {}).get('stockage', {})
+    moteur = moteur or os.environ.get(VARIABLE_MOTEUR) or reglages.get('moteur', 'json')
+    if moteur not in MOTEURS:
+        raise ValueError(f"moteur de stockage inconnu : {moteur} (disponibles : {', '.join(MOTEURS)})")
+    cle = (moteur, reglages.get('base', BASE_SQLITE))
+    if cle not in _ouverts:
+        _ouverts[cle] = StockageSqlite(cle[1]) if moteur == "sqlite" else StockageJson()
+    return _ouverts[cle]
+
+
+def transferer(source, cible):
+    """Copie missions, registre, télémétrie et journal de source vers cible.
+
+    Ré-exécutable : missions et astronautes sont mis à jour par clé, la
+    télémétrie de chaque mission et le journal de la cible sont remplacés.
+    Retourne le nombre d'éléments copiés par catégorie.
+    """
+    if source.cle() == cible.cle():
+        raise ValueError("la source et la cible sont le même stockage")
+    missions = source.missions()
+    cible.enregistrer_missions(missions)
+    astronautes = source.astronautes()
+    cible.enregistrer_astronautes(astronautes)
+
+    releves = 0
+    for mission_id in source.missions_telemetrie():
+        releves += cible.remplacer_telemetrie(mission_id, source.entete_telemetrie(mission_id),
+                                              source.releves(mission_id))
+
+    journal = cible.journal()
+    journal.vider()
+    entrees, lot = 0, []
+    for entree in chain(source.journal(), [None]):
+        if entree is not None:
+            lot.append(entree)
+        if lot and (entree is None or len(lot) >= TAILLE_LOT):
+            journal.ajouter_lot(lot)
+            entrees += len(lot)
+            lot = []
+    return {"missions": len(missions), "astronautes": len(astronautes), "releves": releves, "journal": entrees}
+
+
+def _option(nom, defaut):
+    if nom in sys.argv:
+        return sys.argv[sys.argv.index(nom) + 1]
+    return defaut
+
+
+if __name__ == '__main__':
+    # Usage : python stockage_donnees.py importer [--base space_data/navigation.db]   (JSON -> SQLite)
+    #         python stockage_donnees.py exporter [--base ...] [--dossier space_data/export/]   (SQLite -> JSON)
+    #         python stockage_donnees.py statut [--base ...]
+    action = sys.argv[1] if len(sys.argv) > 1 else 'statut'
+    base = _option('--base', BASE_SQLITE)
+    debut = time.perf_counter()
+    if action == 'importer':
+        comptes = transferer(StockageJson(), StockageSqlite(base))
+        print(f"[OK] Import dans {base} : {comptes} ({time.perf_counter() - debut:.2f}s)")
+    elif action == 'exporter':
+        dossier = _option('--dossier', DOSSIER_EXPORT)
+        comptes = transferer(StockageSqlite(base), StockageJson(dossier))
+        print(f"[OK] Export dans {dossier} : {comptes} ({time.perf_counter() - debut:.2f}s)")
+    elif action == 'statut':
+        moteurs = [StockageJson()] + ([StockageSqlite(base)] if os.path.exists(base) else [])
+        for stockage in moteurs:
+            telemetrie = stockage.missions_telemetrie()
+            print(f"{stockage.moteur:<7} missions : {len(stockage.missions())} | astronautes : "
+                  f"{len(stockage.astronautes())} | télémétrie : {len(telemetrie)} mission(s) | "
+                  f"journal : {len(stockage.journal())} entrées")
+    else:
+        print("Actions : importer, exporter, statut")
+        sys.exit(1)
\ No newline at end of file
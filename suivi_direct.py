@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import asyncio
+from collections import deque
+
+from telemetrie_colonnes import TelemetrieColonnes, CANAUX, epoch_iso
+from regles_alerte import obtenir_moteur, formater_alerte
+
+DOSSIER_BRUT = 'space_data/raw/'
+# Fichiers suivis ligne à ligne (un relevé JSON par ligne, ajouts en fin)
+EXTENSIONS_FLUX = ('.ndjson', '.jsonl')
+# Fichiers déposés en une fois : un relevé, une liste ou un document {"releves": [...]}
+EXTENSIONS_DEPOT = ('.json',)
+# Intervalle maximal entre deux scrutations du dossier (secondes)
+PERIODE_SCRUTATION = 1.0
+
+
+class SurveillantBrut:
+    """Suit un dossier de télémétrie brute : nouveaux fichiers et lignes ajoutées.
+
+    Chaque fichier flux est lu à partir de la dernière position connue ; une
+    ligne incomplète (en cours d'écriture) est laissée pour le passage suivant.
+    Un fichier déposé n'est lu qu'une fois, quand son contenu est un JSON complet.
+    """
+
+    def __init__(self, dossier=DOSSIER_BRUT):
+        self.dossier = dossier
+        self.positions = {}   # chemin -> octets déjà consommés (fichiers flux)
+        self.deposes = {}     # chemin -> taille lors de la dernière tentative de lecture
+        self.rejets = 0       # lignes ou fichiers illisibles
+
+    def _fichiers(self):
+        try:
+            with os.scandir(self.dossier) as entrees:
+                return sorted((e.path, e.stat().st_size) for e in entrees if e.is_file())
+        except FileNotFoundError:
+            return []
+
+    def amorcer(self):
+        """Considère le contenu actuel du dossier comme déjà traité (historique)."""
+        for chemin, taille in self._fichiers():
+            if chemin.endswith(EXTENSIONS_FLUX):
+                self.positions[chemin] = taille
+            elif chemin.endswith(EXTENSIONS_DEPOT):
+                self.deposes[chemin] = taille
+
+    def collecter(self):
+        """Un passage sur le dossier ; retourne les nouveaux relevés (liste de dicts)."""
+        releves = []
+        for chemin, taille in self._fichiers():
+            if chemin.endswith(EXTENSIONS_FLUX):
+                releves.extend(self._lire_flux(chemin, taille))
+            elif chemin.endswith(EXTENSIONS_DEPOT) and self.deposes.get(chemin) != taille:
+                releves.extend(self._lire_depot(chemin, taille))
+        return releves
+
+    def _lire_flux(self, chemin, taille):
+        position = self.positions.get(chemin, 0)
+        if taille < position:
+            # Fichier tronqué ou remplacé : on repart du début
+            position = 0
+        if taille == position:
+            return []
+        with open(chemin, 'rb') as f:
+            f.seek(position)
+            bloc = f.read(taille - position)
+        fin = bloc.rfind(b'\n') + 1
+        self.positions[chemin] = position + fin
+        releves = []
+        for ligne in bloc[:fin].splitlines():
+            if not ligne.strip():
+                continue
+            try:
+                releve = json.loads(ligne)
+            except ValueError:
+                self.rejets += 1
+                continue
+            if isinstance(releve, dict):
+                releves.append(releve)
+            else:
+                self.rejets += 1
+        return releves
+
+    def _lire_depot(self, chemin, taille):
+        self.deposes[chemin] = taille
+        try:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except ValueError:
+            # Probablement en cours d'écriture : nouvelle tentative quand la taille change
+            self.rejets += 1
+            return []
+        if isinstance(document, dict):
+            document = document.get('releves', [document])
+        if not isinstance(document, list):
+            # Scalaire, ou 'releves' qui n'est pas une liste
+            self.rejets += 1
+            return []
+        releves = [r for r in document if isinstance(r, dict)]
+        self.rejets += len(document) - len(releves)
+        return releves
+
+
+def _convertir(releve):
+    """(epoch, relevé aux canaux en float) ; lève une exception si le relevé est inexploitable."""
+    epoch = epoch_iso(releve['timestamp'])
+    propre = dict(releve)
+    for cle in CANAUX.values():
+        if cle in releve:
+            propre[cle] = float(releve[cle])
+    if 'position_km' in releve:
+        propre['position_km'] = {axe: float(v) for axe, v in releve['position_km'].items()}
+    return epoch, propre
+
+
+class EtatDirect:
+    """État affiché du suivi : compteurs, dernier relevé et alertes récentes."""
+
+    def __init__(self, seuils, alertes_max=10):
+        self.moteur = obtenir_moteur(seuils)
+        self.nb_releves = 0
+        self.nb_alertes = 0
+        self.nouveaux = 0             # relevés reçus depuis le dernier affichage
+        self.rejets = 0               # relevés sans horodatage valide ou aux canaux non numériques
+        self.dernier_releve = None
+        self.alertes = deque(maxlen=alertes_max)
+
+    def integrer(self, lot):
+        """Évalue les seuils sur un lot de relevés ; seul le lot est parcouru.
+
+        Un relevé inexploitable est compté dans 'rejets' sans bloquer les autres.
+        """
+        colonnes = TelemetrieColonnes()
+        valides = []
+        for r in lot:
+            try:
+                valides.append(_convertir(r))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self.rejets += 1
+        if not valides:
+            return
+        valides.sort(key=lambda v: v[0])
+        for epoch, r in valides:
+            colonnes.ajouter(r, epoch=epoch)
+        lot = [r for _, r in valides]
+        for alerte in self.moteur.evaluer(colonnes):
+            self.alertes.append(f"[{colonnes.timestamps[alerte.indice]}] {formater_alerte(alerte)}")
+            self.nb_alertes += 1
+        self.nb_releves += len(lot)
+        self.nouveaux += len(lot)
+        self.dernier_releve = lot[-1]
+
+
+def afficher_etat(etat, surveillant):
+    """Rendu texte d'un rafraîchissement."""
+    print(f"\n📡 [{time.strftime('%H:%M:%S')}] +{etat.nouveaux} relevés "
+          f"(total {etat.nb_releves}, alertes {etat.nb_alertes}, rejets {surveillant.rejets + etat.rejets})")
+    r = etat.dernier_releve
+    if r:
+        print(f"  [{r.get('timestamp')}] Alt: {r.get('altitude_km', '?')}km, Vit: {r.get('vitesse_km_s', '?')}km/s, "
+              f"Carb: {r.get('carburant_pourcent', '?')}%, O2: {r.get('oxygene_pourcent', '?')}%")
+    for a in etat.alertes:
+        print(f"  ⚠️ {a}")
+    etat.nouveaux = 0
+
+
+async def _collecter(surveillant, file, periode):
+    """Producteur : scrute le dossier et pousse chaque lot non vide dans la file."""
+    while True:
+        # Les lectures disque se font hors de la boucle d'événements
+        try:
+            lot = await asyncio.to_thread(surveillant.collecter)
+        except OSError as e:
+            print(f"[ERREUR] Lecture de {surveillant.dossier} : {e}")
+            lot = []
+        if lot:
+            await file.put(lot)
+        await asyncio.sleep(periode)
+
+
+async def _traiter(file, etat):
+    """Consommateur : les alertes sont évaluées dès l'arrivée de chaque lot."""
+    while True:
+        lot = await file.get()
+        # Les lots déjà en attente sont regroupés en un seul passage
+        while not file.empty():
+            lot.extend(file.get_nowait())
+        try:
+            etat.integrer(lot)
+        except Exception as e:
+            # Le suivi continue avec les lots suivants
+            etat.rejets += len(lot)
+            print(f"[ERREUR] Lot de {len(lot)} relevés ignoré : {type(e).__name__}: {e}")
+
+
+async def suivre(config, duree=None, depuis_debut=False, afficher=afficher_etat):
+    """Suit le dossier telemetrie_brute et rafraîchit l'affichage toutes les
+    frequence_telemetrie_sec secondes.
+
+    Seuls les relevés arrivés après le démarrage sont traités, sauf si
+    depuis_debut=True. 'duree' (secondes) borne le suivi ; None = jusqu'à
+    interruption. Retourne l'EtatDirect final.
+    """
+    frequence = config.get('frequence_telemetrie_sec', 30)
+    dossier = config.get('repertoires', {}).get('telemetrie_brute', DOSSIER_BRUT)
+    os.makedirs(dossier, exist_ok=True)
+
+    surveillant = SurveillantBrut(dossier)
+    if not depuis_debut:
+        surveillant.amorcer()
+    etat = EtatDirect(config.get('seuils_alerte', {}))
+    file = asyncio.Queue()
+    taches = [
+        asyncio.create_task(_collecter(surveillant, file, min(PERIODE_SCRUTATION, frequence))),
+        asyncio.create_task(_traiter(file, etat)),
+    ]
+    print(f"Suivi de {dossier} (rafraîchissement toutes les {frequence}s, Ctrl+C pour arrêter)")
+    debut = time.monotonic()
+    try:
+        while duree is None or time.monotonic() - debut < duree:
+            attente = frequence if duree is None else min(frequence, duree - (time.monotonic() - debut))
+            await asyncio.sleep(max(attente, 0))
+            afficher(etat, surveillant)
+            if any(tache.done() for tache in taches):
+                break
+    finally:
+        for tache in taches:
+            tache.cancel()
+        resultats = await asyncio.gather(*taches, return_exceptions=True)
+        for tache, resultat in zip(("collecte", "traitement"), resultats):
+            if isinstance(resultat, Exception):
+                print(f"[ERREUR] Tâche de {tache} arrêtée : {type(resultat).__name__}: {resultat}")
+    return etat
+
+
+def lancer_suivi(config, duree=None, depuis_debut=False):
+    """Point d'entrée synchrone (menu, CLI) ; Ctrl+C termine proprement le suivi."""
+    try:
+        return asyncio.run(suivre(config, duree, depuis_debut))
+    except KeyboardInterrupt:
+        print("\nSuivi interrompu.")
+        return None
+
+
+if __name__ == '__main__':
+    from chargeur_donnees import charger_json_securise
+
+    config = charger_json_securise('space_data/config_systeme.json') or {}
+    duree = None
+    if '--duree' in sys.argv:
+        duree = float(sys.argv[sys.argv.index('--duree') + 1])
+    lancer_suivi(config, duree, depuis_debut='--depuis-debut' in sys.argv)
\ No newline at end of file
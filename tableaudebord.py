@@ -1,82 +1,113 @@
 import os
+import sys
 import json
-from datetime import datetime
-from astro_utils import distance_3d, alerte_systeme
-
-def charger_tous_les_json(dossier):
-    """Charge dynamiquement tous les fichiers JSON d'un dossier."""
-    donnees = {}
-    for fichier in os.listdir(dossier):
-        if fichier.endswith('.json'):
-            chemin = os.path.join(dossier, fichier)
-            try:
-                with open(chemin, 'r', encoding='utf-8') as f:
-                    nom_cle = fichier.replace('.json', '')
-                    donnees[nom_cle] = json.load(f)
-            except Exception:
-                pass # Si un fichier plante, on l'ignore silencieusement pour le dashboard
-    return donnees
-
-def generer_tableau_de_bord():
-    # 1. Chargement global
-    dossier_data = 'space_data/'
-    donnees = charger_tous_les_json(dossier_data)
-    
-    missions = donnees.get('missions', {}).get('missions', [])
-    equipages = donnees.get('equipages', {}).get('astronautes', [])
-    telemetrie = donnees.get('telemetrie', {})
-    config = donnees.get('config_systeme', {})
-    
-    # Ciblage de la mission demandée
-    mission = next((m for m in missions if m['id'] == 'MSN-001'), None)
-    if not mission:
-        print("Erreur : Mission MSN-001 introuvable.")
-        return
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from chargeur_donnees import charger_les_json, charger_json_securise
+from regles_alerte import obtenir_moteur, formater_alerte
+from telemetrie_colonnes import TelemetrieColonnes
+from lecteur_telemetrie import iterer_releves, lire_entete
+from telemetrie_binaire import ouvrir_binaire
+from telemetrie_segments import stockage_mission, fusionner_tranches
+from resumes_temporels import resumes_mission, afficher_tendances
+from index_donnees import obtenir_index
+from agregats_mission import rafraichir_agregats, analyse_depuis_agregats
+from instrumentation import mesure, action, configurer
 
-    # 2. Croisement avec les équipages
-    equipage_details = []
-    for membre in mission['equipage']:
-        # Récupère juste le nom sans le grade (ex: "Cmdr. Léa Fontaine" -> "Léa Fontaine")
-        nom_propre = membre.split(". ")[-1] if ". " in membre else membre
-        profil = next((a for a in equipages if a['nom'] == nom_propre), None)
-        if profil:
-            equipage_details.append(profil)
+DOSSIER_DATA = 'space_data/'
+DOSSIER_TELEMETRIE_MISSIONS = 'space_data/telemetrie/'
 
-    # 3. Analyse mathématique de la télémétrie
-    releves = telemetrie.get('releves', [])
-    seuils = config.get('seuils_alerte', {})
-    
-    distance_totale = 0
-    for i in range(1, len(releves)):
-        distance_totale += distance_3d(releves[i-1]['position_km'], releves[i]['position_km'])
-        
-    # Calcul du temps (compatibilité ISO 8601)
-    t_debut = datetime.fromisoformat(releves[0]['timestamp'].replace("Z", "+00:00"))
-    t_fin = datetime.fromisoformat(releves[-1]['timestamp'].replace("Z", "+00:00"))
-    
-    duree_heures = (t_fin - t_debut).total_seconds() / 3600
-    jours_vol = (t_fin - t_debut).days + 1
-    
-    vitesse_moy = (distance_totale / (duree_heures * 3600)) if duree_heures > 0 else 0
-    conso_totale = releves[0]['carburant_pourcent'] - releves[-1]['carburant_pourcent']
-    taux_conso_h = conso_totale / duree_heures if duree_heures > 0 else 0
-    
-    # 4. Traitement des alertes
+def chemin_telemetrie_mission(mission_id):
+    """Fichier de télémétrie d'une mission, ou None si aucun n'existe.
+
+    On cherche d'abord space_data/telemetrie/<id>.json, puis le fichier
+    historique space_data/telemetrie.json si son mission_id correspond.
+    """
+    chemin = os.path.join(DOSSIER_TELEMETRIE_MISSIONS, f"{mission_id}.json")
+    if os.path.exists(chemin):
+        return chemin
+    chemin = os.path.join(DOSSIER_DATA, 'telemetrie.json')
+    if os.path.exists(chemin) and lire_entete(chemin).get('mission_id', 'MSN-001') == mission_id:
+        return chemin
+    return None
+
+def analyser_mission_incremental(mission_id, chemin_telemetrie, seuils, verifier=False):
+    """Comme analyser_mission, mais à partir des agrégats persistés de la mission.
+
+    Seuls les relevés arrivés depuis le dernier rafraîchissement sont lus ;
+    verifier=True contrôle d'abord tous les relevés déjà agrégés.
+    """
+    etat, _ = rafraichir_agregats(mission_id, chemin_telemetrie, seuils, verification_complete=verifier)
+    return analyse_depuis_agregats(etat)
+
+def analyser_mission(chemin_telemetrie, seuils):
+    """Calcule les indicateurs du tableau de bord ; None si aucun relevé."""
+    # Fichier binaire projeté en mémoire s'il est à jour (aucun parsing)
+    colonnes = ouvrir_binaire(chemin_telemetrie)
+    if colonnes is not None:
+        with colonnes:
+            if not len(colonnes):
+                return None
+            return analyser_colonnes(colonnes, colonnes.entete, colonnes.releve(-1), seuils)
+    telemetrie = lire_entete(chemin_telemetrie)
+    # Un seul passage sur le flux pour remplir les colonnes
+    colonnes = TelemetrieColonnes()
+    r_fin = None
+    for releve in iterer_releves(chemin_telemetrie):
+        colonnes.ajouter(releve)
+        r_fin = releve
+    if r_fin is None:
+        return None
+    return analyser_colonnes(colonnes, telemetrie, r_fin, seuils)
+
+def analyser_fenetre(mission_id, chemin_telemetrie, seuils, debut=None, fin=None):
+    """Indicateurs restreints aux relevés entre debut et fin (ISO 8601 ou epoch).
+
+    Passe par le stockage segmenté : seuls les segments qui recoupent la
+    fenêtre sont lus. None si la fenêtre ne contient aucun relevé.
+    """
+    stockage = stockage_mission(mission_id, chemin_telemetrie)
+    tranches = stockage.tranches(debut, fin)
+    if not tranches:
+        return None
+    r_fin = tranches[-1].releve(-1)
+    return analyser_colonnes(fusionner_tranches(tranches), stockage.index['entete'], r_fin, seuils)
+
+def analyser_colonnes(colonnes, telemetrie, r_fin, seuils):
+    """Indicateurs du tableau de bord pour des colonnes non vides."""
+    distance_totale = colonnes.distance_totale()
+
+    # Calcul du temps à partir de la colonne epoch (déjà convertie une fois)
+    duree_sec = colonnes.duree_secondes()
+    duree_heures = duree_sec / 3600
+
+    conso_totale = colonnes.carburant[0] - colonnes.carburant[-1]
+
+    # Traitement des alertes (règles compilées évaluées sur tout le lot)
     alertes_formattees = []
-    for releve in releves:
-        alertes = alerte_systeme(releve, seuils)
-        if alertes:
-            t_releve = datetime.fromisoformat(releve['timestamp'].replace("Z", "+00:00"))
-            jour_relatif = (t_releve - t_debut).days + 1
-            for a in alertes:
-                alertes_formattees.append(f"[J+{jour_relatif}] {a}")
-
-    # 5. Rendu ASCII
-    r_fin = releves[-1]
+    t_debut = colonnes.epoch[0]
+    for alerte in obtenir_moteur(seuils).evaluer(colonnes):
+        jour_relatif = int((colonnes.epoch[alerte.indice] - t_debut) // 86400) + 1
+        alertes_formattees.append(f"[J+{jour_relatif}] {formater_alerte(alerte)}")
+
+    return {
+        "vaisseau": telemetrie.get('vaisseau', 'Inconnu'),
+        "jours_vol": int(duree_sec // 86400) + 1,
+        "distance_totale": distance_totale,
+        "vitesse_moy": colonnes.vitesse_moyenne(),
+        "taux_conso_h": conso_totale / duree_heures if duree_heures > 0 else 0,
+        "alertes": alertes_formattees,
+        "dernier_releve": r_fin,
+    }
+
+def afficher_tableau(mission, equipage_details, analyse, seuils):
+    """Rendu ASCII du tableau de bord d'une mission."""
+    r_fin = analyse['dernier_releve']
+    alertes_formattees = analyse['alertes']
     pos = r_fin['position_km']
     carb_restant = r_fin['carburant_pourcent']
     o2_restant = r_fin['oxygene_pourcent']
-    
+
     # Petites barres de progression visuelles
     bar_carb = "█" * int(carb_restant/10) + "░" * (10 - int(carb_restant/10))
     bar_o2 = "█" * int(o2_restant/10) + "░" * (10 - int(o2_restant/10))
@@ -88,10 +119,10 @@ def generer_tableau_de_bord():
     print("╔══════════════════════════════════════════════════════════════╗")
     print(f"║           🛰️  TABLEAU DE BORD — {mission['nom'].upper()} ({mission['id']})        ║")
     print("╠══════════════════════════════════════════════════════════════╣")
-    ligne_ascii(f"Vaisseau    : {telemetrie['vaisseau']}")
+    ligne_ascii(f"Vaisseau    : {analyse['vaisseau']}")
     ligne_ascii(f"Destination : {mission['destination']}")
     ligne_ascii(f"Lancé le    : {mission['date_lancement']}")
-    ligne_ascii(f"Jour de vol : J+{jours_vol}")
+    ligne_ascii(f"Jour de vol : J+{analyse['jours_vol']}")
     print("╠══════════════════════════════════════════════════════════════╣")
     ligne_ascii("ÉQUIPAGE")
     for p in equipage_details:
@@ -106,9 +137,9 @@ def generer_tableau_de_bord():
     ligne_ascii(f"└─ Temp. cab.  : {r_fin['temperature_cabine_c']}°C")
     print("╠══════════════════════════════════════════════════════════════╣")
     ligne_ascii("ANALYSE DE TRAJET")
-    ligne_ascii(f"├─ Distance parcourue  : {distance_totale:,.0f} km")
-    ligne_ascii(f"├─ Vitesse moyenne     : {vitesse_moy:.2f} km/s")
-    ligne_ascii(f"├─ Conso. carburant    : {taux_conso_h:.2f}%/h")
+    ligne_ascii(f"├─ Distance parcourue  : {analyse['distance_totale']:,.0f} km")
+    ligne_ascii(f"├─ Vitesse moyenne     : {analyse['vitesse_moy']:.2f} km/s")
+    ligne_ascii(f"├─ Conso. carburant    : {analyse['taux_conso_h']:.2f}%/h")
     ligne_ascii(f"└─ Seuil alerte carburant : {seuils.get('carburant_min_pourcent', 20)}%")
     print("╠══════════════════════════════════════════════════════════════╣")
     ligne_ascii("⚠️  ALERTES")
@@ -117,20 +148,138 @@ def generer_tableau_de_bord():
         ligne_ascii(f"{prefix} {alerte}")
     print("╚══════════════════════════════════════════════════════════════╝")
 
-    # 6. Exportation JSON
+def exporter_rapport(mission_id, analyse):
+    """Écrit rapports/dashboard_<id>.json et retourne son chemin."""
     rapport_final = {
-        "mission_id": mission['id'],
-        "distance_totale_km": round(distance_totale, 2),
-        "vitesse_moyenne_km_s": round(vitesse_moy, 2),
-        "taux_conso_carburant_par_heure": round(taux_conso_h, 2),
-        "alertes": alertes_formattees
+        "mission_id": mission_id,
+        "distance_totale_km": round(analyse['distance_totale'], 2),
+        "vitesse_moyenne_km_s": round(analyse['vitesse_moy'], 2),
+        "taux_conso_carburant_par_heure": round(analyse['taux_conso_h'], 2),
+        "alertes": analyse['alertes']
     }
-    
-    chemin_export = f"space_data/rapports/dashboard_{mission['id']}.json"
-    with open(chemin_export, 'w', encoding='utf-8') as f:
+    if 'tendances' in analyse:
+        rapport_final["tendances"] = analyse['tendances']
+
+    chemin_export = f"space_data/rapports/dashboard_{mission_id}.json"
+    # Fichier temporaire + remplacement : un lecteur ne voit jamais un rapport à moitié écrit
+    with open(chemin_export + ".tmp", 'w', encoding='utf-8') as f:
         json.dump(rapport_final, f, indent=2, ensure_ascii=False)
-        
+    os.replace(chemin_export + ".tmp", chemin_export)
+    return chemin_export
+
+def generer_tableau_de_bord(mission_id='MSN-001', complet=False, fenetre=None, tendances=None, verifier=False):
+    """Affiche et exporte le tableau de bord d'une mission.
+
+    complet=True recalcule tout depuis la télémétrie (fichier binaire s'il
+    est à jour) au lieu de partir des agrégats persistés ; verifier=True
+    relit tout ce que ces agrégats ont déjà traité ; fenetre=(debut,
+    fin) restreint l'analyse à une plage de temps ; tendances='heure' ou
+    'jour' ajoute les résumés précalculés à cette résolution. Retourne le
+    chemin du rapport exporté, ou None si rien n'a pu être analysé.
+    """
+    # 1. Chargement global
+    # La télémétrie est lue en flux, missions et équipages passent par l'index
+    with mesure("chargement"):
+        donnees = charger_les_json(DOSSIER_DATA, ['config_systeme.json'])
+        index = obtenir_index()
+        config = donnees.get('config_systeme', {})
+
+        # Ciblage de la mission demandée
+        mission = index.mission(mission_id)
+        if not mission:
+            print(f"Erreur : Mission {mission_id} introuvable.")
+            return
+
+        # 2. Croisement avec les équipages
+        equipage_details = index.profils_equipage(mission['id'])
+
+    # 3. Analyse mathématique de la télémétrie
+    with mesure("calcul"):
+        seuils = config.get('seuils_alerte', {})
+        chemin_telemetrie = chemin_telemetrie_mission(mission['id'])
+        if chemin_telemetrie is None:
+            analyse = None
+        elif fenetre:
+            analyse = analyser_fenetre(mission['id'], chemin_telemetrie, seuils, *fenetre)
+        elif complet:
+            analyse = analyser_mission(chemin_telemetrie, seuils)
+        else:
+            analyse = analyser_mission_incremental(mission['id'], chemin_telemetrie, seuils, verifier)
+    if analyse is None:
+        print("Erreur : aucun relevé de télémétrie disponible.")
+        return
+
+    # 4. Rendu ASCII puis exportation JSON
+    with mesure("rendu"):
+        afficher_tableau(mission, equipage_details, analyse, seuils)
+        if tendances:
+            # Résumés précalculés : quelques Kio lus, quelle que soit la durée de la mission
+            cases = resumes_mission(mission['id'], chemin_telemetrie).lire(tendances, *(fenetre or ()))
+            for canal in ("carburant", "oxygene"):
+                print(f"\nTendance {canal} par {tendances} :")
+                afficher_tendances(cases, canal)
+            analyse = dict(analyse, tendances={tendances: cases})
+    with mesure("export"):
+        chemin_export = exporter_rapport(mission['id'], analyse)
     print(f"\n[OK] Rapport exporté dans {chemin_export}")
+    return chemin_export
+
+def _rapport_flotte(mission_id, seuils):
+    """Tâche d'un processus de la flotte : analyse et export d'une mission."""
+    debut = time.perf_counter()
+    chemin_telemetrie = chemin_telemetrie_mission(mission_id)
+    if chemin_telemetrie is None:
+        return mission_id, "sans télémétrie", time.perf_counter() - debut
+    analyse = analyser_mission_incremental(mission_id, chemin_telemetrie, seuils)
+    if analyse is None:
+        return mission_id, "aucun relevé", time.perf_counter() - debut
+    exporter_rapport(mission_id, analyse)
+    return mission_id, f"{len(analyse['alertes'])} alertes", time.perf_counter() - debut
+
+def generer_flotte(travailleurs=None):
+    """Génère le rapport de chaque mission de missions.json dans un pool de processus.
+
+    Chaque rapport est écrit indépendamment ; un résumé des temps est affiché
+    et retourné sous forme de liste (mission_id, statut, durée en s).
+    """
+    debut = time.perf_counter()
+    config = charger_json_securise('space_data/config_systeme.json') or {}
+    seuils = config.get('seuils_alerte', {})
+    missions = list(obtenir_index().missions)
+
+    resultats = []
+    with ProcessPoolExecutor(max_workers=travailleurs) as pool:
+        taches = {pool.submit(_rapport_flotte, mission_id, seuils): mission_id for mission_id in missions}
+        for tache in as_completed(taches):
+            try:
+                resultats.append(tache.result())
+            except Exception as e:
+                # Une mission en échec n'empêche pas les autres rapports
+                resultats.append((taches[tache], f"erreur : {e}", 0.0))
+
+    resultats.sort()
+    print("=== 📊 Rapports de flotte ===")
+    for mission_id, statut, duree in resultats:
+        print(f"  [{mission_id}] {statut} ({duree * 1000:.1f} ms)")
+    total = time.perf_counter() - debut
+    cumul = sum(duree for _, _, duree in resultats)
+    print(f"Total : {len(resultats)} missions en {total:.2f}s (cumul des tâches : {cumul:.2f}s)")
+    return resultats
 
 if __name__ == '__main__':
-    generer_tableau_de_bord()
\ No newline at end of file
+    # --mesures : durées par phase et compteurs ; --profil : profil cProfile dans space_data/rapports/profils/
+    # --mission <id> : mission du tableau de bord (MSN-001 par défaut) ; --flotte : toutes les missions
+    configurer()
+    if '--flotte' in sys.argv:
+        with action("flotte"):
+            generer_flotte()
+    else:
+        fenetre = None
+        if '--fenetre' in sys.argv:
+            i = sys.argv.index('--fenetre')
+            fenetre = (sys.argv[i + 1], sys.argv[i + 2])
+        tendances = sys.argv[sys.argv.index('--tendances') + 1] if '--tendances' in sys.argv else None
+        mission_id = sys.argv[sys.argv.index('--mission') + 1] if '--mission' in sys.argv else 'MSN-001'
+        with action("tableau_de_bord"):
+            generer_tableau_de_bord(mission_id, complet='--complet' in sys.argv, fenetre=fenetre, tendances=tendances,
+                                    verifier='--verifier' in sys.argv)
\ No newline at end of file
@@ -1,28 +1,8 @@
-import json
 import os
+from chargeur_donnees import charger_json_securise as _charger
 def charger_json_securise(chemin):
-    try:
-        with open(chemin, 'r', encoding='utf-8') as f:
-            data = json.load(f)  
-        # Petite condition pour afficher le bon message si c'est le fichier missions
-        if isinstance(data, dict) and "missions" in data:
-            print(f"[OK] {chemin} chargé avec succès ({len(data['missions'])} missions)")
-        else:
-            print(f"[OK] {chemin} chargé avec succès")       
-        return data   
-    except FileNotFoundError:
-        print(f"[ERREUR] {chemin} — Fichier introuvable.")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"[ERREUR] {chemin} — Format JSON invalide : {e}")
-        return None
-    except PermissionError:
-        print(f"[ERREUR] {chemin} — Accès refusé.")
-        return None
-    except Exception as e:
-        # Fallback pour toute autre erreur non prévue
-        print(f"[ERREUR] {chemin} — Erreur inattendue : {e}")
-        return None
+    # Le chargement (avec cache et messages d'erreur) est centralisé dans chargeur_donnees
+    return _charger(chemin, verbeux=True)
 if __name__ == '__main__':
     # Création rapide du fichier corrompu juste pour le test
     chemin_corrompu = "space_data/corrompu.json"
@@ -1,61 +1,5 @@
-import os
-import time
-from datetime import datetime
-
-class LogMission:
-    """Gestionnaire de contexte pour écrire des logs de mission horodatés."""
-
-    def __init__(self, mission_id, dossier_logs="space_data/logs/"):
-        self.mission_id = mission_id
-        self.dossier_logs = dossier_logs
-        self.filepath = os.path.join(self.dossier_logs, f"{self.mission_id}.log")
-        self.erreurs = 0
-        self.start_time = 0
-        self.fichier = None
-        
-        # S'assure que le dossier existe
-        os.makedirs(self.dossier_logs, exist_ok=True)
-
-    def __enter__(self):
-        # Ouvre le fichier en mode ajout ('a' pour append)
-        self.fichier = open(self.filepath, 'a', encoding='utf-8')
-        self.start_time = time.time()
-        
-        maintenant = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # En-tête de session
-        self.fichier.write("========================================\n")
-        self.fichier.write(f"SESSION OUVERTE — {maintenant}\n")
-        self.fichier.write(f"Mission : {self.mission_id}\n")
-        self.fichier.write("========================================\n")
-        
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        # Gestion des exceptions s'il y a eu un crash dans le bloc 'with'
-        if exc_type is not None:
-            self.erreurs += 1
-            maintenant = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.fichier.write(f"[{maintenant}] [CRITICAL] Exception capturée : {exc_type.__name__} — {exc_val}\n")
-            
-        duree = time.time() - self.start_time
-        maintenant = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Pied de session
-        self.fichier.write("========================================\n")
-        self.fichier.write(f"SESSION FERMÉE — {maintenant}\n")
-        self.fichier.write(f"Durée : {duree:.3f}s | Erreurs : {self.erreurs}\n")
-        self.fichier.write("========================================\n")
-        
-        # Fermeture propre et indispensable
-        self.fichier.close()
-        
-        # On retourne False pour propager l'erreur (le script plantera mais le log sera sauvegardé)
-        return False
-
-    def ecrire(self, niveau, message):
-        maintenant = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.fichier.write(f"[{maintenant}] [{niveau}] {message}\n")
+# LogMission est partagée avec centre_controle.py : tampon, écriture par lots et rotation
+from log_mission import LogMission
 
 
 if __name__ == '__main__':
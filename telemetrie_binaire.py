@@ -0,0 +1,370 @@
+import os
+import sys
+import json
+import math
+import mmap
+import time
+import struct
+import hashlib
+from datetime import datetime, timezone
+
+from telemetrie_colonnes import TelemetrieColonnes, CANAUX, epoch_iso
+from lecteur_telemetrie import iterer_releves, lire_entete, hacher_octets
+from instrumentation import compter
+
+EXTENSION = '.tlmb'
+MAGIQUE = b'TLMB'
+VERSION = 1
+# En-tête : magique, version, taille d'enregistrement, nombre de relevés, offset des métadonnées
+ENTETE = struct.Struct('<4sHHQQ')
+TAILLE_ENTETE = 32   # arrondi à 8 octets pour aligner les enregistrements
+
+# Enregistrement de taille fixe : 9 doubles puis les états système packés (64 bits)
+CHAMPS = ('epoch', 'x', 'y', 'z') + tuple(CANAUX)
+ENREGISTREMENT = struct.Struct('<' + 'd' * len(CHAMPS) + 'Q')
+DOUBLES_PAR_ENREGISTREMENT = ENREGISTREMENT.size // 8
+# 4 bits par système (code 0 = absent) : 16 systèmes, 15 états distincts au plus
+BITS_ETAT = 4
+SYSTEMES_MAX = 64 // BITS_ETAT
+ETATS_MAX = (1 << BITS_ETAT) - 1
+# Octets de début et de fin du JSON source hachés dans la signature gardée par le binaire
+TAILLE_EXTRAIT = 64 * 1024
+# Copie brute des enregistrements existants par prolonger_binaire, par blocs
+TAILLE_COPIE = 1024 * 1024
+
+
+class DonneesInvalides(ValueError):
+    """Relevé impossible à écrire au format binaire (valeur non numérique, horodatage invalide...)."""
+
+
+def chemin_binaire(chemin_json):
+    """space_data/telemetrie.json -> space_data/telemetrie.tlmb"""
+    return os.path.splitext(chemin_json)[0] + EXTENSION
+
+
+def signature_source(chemin_json):
+    """Taille, date et empreinte des premiers et derniers octets d'un fichier JSON.
+
+    Gardée dans les métadonnées du binaire : le binaire ne sert que si
+    elle est identique à celle du JSON actuel (une date plus ancienne,
+    après une restauration ou une copie, ne suffit pas à le rendre à jour).
+    """
+    st = os.stat(chemin_json)
+    h = hashlib.sha1()
+    hacher_octets(h, chemin_json, 0, min(TAILLE_EXTRAIT, st.st_size))
+    hacher_octets(h, chemin_json, max(0, st.st_size - TAILLE_EXTRAIT), st.st_size)
+    return {"taille": st.st_size, "mtime_ns": st.st_mtime_ns, "extraits": h.hexdigest()}
+
+
+def _timestamp_iso(epoch):
+    instant = datetime.fromtimestamp(epoch, timezone.utc)
+    if epoch.is_integer():
+        return instant.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return instant.isoformat().replace("+00:00", "Z")
+
+
+def _invalide(r, e):
+    horodatage = r.get('timestamp') if isinstance(r, dict) else r
+    return DonneesInvalides(f"relevé {horodatage!r} : {type(e).__name__}: {e}")
+
+
+def _lire_entete_binaire(f, chemin):
+    """(nombre de relevés, offset des métadonnées) d'un fichier binaire ouvert au début."""
+    magique, version, taille, nombre, offset_meta = ENTETE.unpack(f.read(ENTETE.size))
+    if magique != MAGIQUE or version != VERSION or taille != ENREGISTREMENT.size:
+        raise ValueError(f"{chemin} n'est pas un fichier de télémétrie binaire v{VERSION}")
+    return nombre, offset_meta
+
+
+def ecrire_binaire(chemin_bin, releves, entete, source=None):
+    """Écrit un itérable de relevés au format binaire (fichier temporaire puis remplacement).
+
+    Les relevés sont écrits au fil de l'eau ; les métadonnées (entête,
+    systèmes, états, canaux entiers, signature du JSON source) sont ajoutées
+    en fin de fichier. Lève DonneesInvalides sur un relevé non convertible,
+    sans rien remplacer. Retourne le nombre de relevés écrits.
+    """
+    return _remplacer(chemin_bin, releves, entete, source)
+
+
+def prolonger_binaire(chemin_bin, releves, entete, nombre=None, source=None):
+    """Ajoute des relevés à la suite d'un fichier binaire (fichier temporaire puis remplacement).
+
+    Les 'nombre' premiers enregistrements (tous par défaut) sont recopiés
+    octet pour octet, sans repasser par des relevés : leurs valeurs et
+    horodatages restent ceux du fichier. Seuls les relevés ajoutés sont
+    convertis, avec les mêmes erreurs que ecrire_binaire. Retourne le
+    nombre total de relevés.
+    """
+    with open(chemin_bin, 'rb') as f:
+        total, offset_meta = _lire_entete_binaire(f, chemin_bin)
+        f.seek(offset_meta)
+        meta = json.loads(f.read())
+        nombre = total if nombre is None else min(nombre, total)
+        return _remplacer(chemin_bin, releves, entete, source, (f, nombre, meta))
+
+
+def _remplacer(chemin_bin, releves, entete, source, existant=None):
+    try:
+        nombre = _ecrire_enregistrements(chemin_bin + ".tmp", releves, entete, source, existant)
+    except BaseException:
+        if os.path.exists(chemin_bin + ".tmp"):
+            os.remove(chemin_bin + ".tmp")
+        raise
+    os.replace(chemin_bin + ".tmp", chemin_bin)
+    return nombre
+
+
+def _ecrire_enregistrements(chemin, releves, entete, source, existant=None):
+    """Corps de ecrire_binaire, dans le fichier 'chemin' ; retourne le nombre de relevés.
+
+    existant : (binaire ouvert, nombre d'enregistrements à recopier, ses
+    métadonnées) pour prolonger_binaire.
+    """
+    systemes = {}                 # nom -> position dans le champ packé
+    etats = {}                    # état -> code (1..15)
+    entiers = set(CANAUX)         # canaux dont toutes les valeurs sont des entiers
+    nombre = 0
+
+    with open(chemin, 'wb') as f:
+        f.write(bytes(TAILLE_ENTETE))
+        if existant:
+            binaire, nombre, meta = existant
+            systemes = {nom: position for position, nom in enumerate(meta['systemes'])}
+            etats = {etat: code for code, etat in enumerate(meta['etats'], 1)}
+            if nombre:
+                entiers = set(meta['entiers'])
+            binaire.seek(TAILLE_ENTETE)
+            reste = nombre * ENREGISTREMENT.size
+            while reste:
+                bloc = binaire.read(min(reste, TAILLE_COPIE))
+                if not bloc:
+                    raise ValueError(f"binaire tronqué : {nombre} relevés attendus")
+                f.write(bloc)
+                reste -= len(bloc)
+        for r in releves:
+            try:
+                pos = r.get('position_km') or {}
+                valeurs = [epoch_iso(r['timestamp']), pos.get('x', math.nan), pos.get('y', math.nan), pos.get('z', math.nan)]
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                raise _invalide(r, e) from e
+            for nom, cle in CANAUX.items():
+                valeur = r.get(cle, math.nan)
+                if not isinstance(valeur, int):
+                    entiers.discard(nom)
+                valeurs.append(valeur)
+            packe = 0
+            for systeme, etat in r.get('systemes', {}).items():
+                if systeme not in systemes:
+                    if len(systemes) == SYSTEMES_MAX:
+                        raise ValueError(f"plus de {SYSTEMES_MAX} systèmes embarqués")
+                    systemes[systeme] = len(systemes)
+                if etat not in etats:
+                    if len(etats) == ETATS_MAX:
+                        raise ValueError(f"plus de {ETATS_MAX} états système distincts")
+                    etats[etat] = len(etats) + 1
+                packe |= etats[etat] << (BITS_ETAT * systemes[systeme])
+            try:
+                f.write(ENREGISTREMENT.pack(*valeurs, packe))
+            except struct.error as e:
+                # Canal ou coordonnée non numérique
+                raise _invalide(r, e) from e
+            nombre += 1
+
+        offset_meta = f.tell()
+        meta = {
+            "entete": entete,
+            "systemes": list(systemes),
+            "etats": list(etats),
+            "entiers": sorted(entiers) if nombre else [],
+            "source": source,
+        }
+        f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        f.seek(0)
+        f.write(ENTETE.pack(MAGIQUE, VERSION, ENREGISTREMENT.size, nombre, offset_meta))
+    return nombre
+
+
+def convertir(chemin_json, chemin_bin=None):
+    """Convertit un fichier de télémétrie JSON au format binaire, en un seul passage.
+
+    Retourne (chemin binaire, nombre de relevés). Lève DonneesInvalides si
+    un relevé ne peut pas être converti, ou si le JSON change pendant la
+    conversion : aucun binaire n'est alors laissé, les lecteurs passent par
+    le JSON.
+    """
+    chemin_bin = chemin_bin or chemin_binaire(chemin_json)
+    source = signature_source(chemin_json)
+    nombre = ecrire_binaire(chemin_bin, iterer_releves(chemin_json), lire_entete(chemin_json), source)
+    if signature_source(chemin_json) != source:
+        os.remove(chemin_bin)
+        raise DonneesInvalides(f"{chemin_json} modifié pendant la conversion")
+    return chemin_bin, nombre
+
+
+class _SystemesPackes:
+    """Séquence paresseuse des dicts 'systemes', décodés depuis le champ packé."""
+
+    def __init__(self, codes, systemes, etats):
+        self.codes = codes
+        self.systemes = systemes
+        self.etats = [None] + etats
+        self.masque = (1 << BITS_ETAT) - 1
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _SystemesPackes(self.codes[i], self.systemes, self.etats[1:])
+        code = self.codes[i]
+        resultat = {}
+        for position, nom in enumerate(self.systemes):
+            etat = (code >> (BITS_ETAT * position)) & self.masque
+            if etat:
+                resultat[nom] = self.etats[etat]
+        return resultat
+
+
+class _Timestamps:
+    """Séquence paresseuse des timestamps ISO, recalculés depuis la colonne epoch."""
+
+    def __init__(self, epoch):
+        self.epoch = epoch
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _Timestamps(self.epoch[i])
+        return _timestamp_iso(self.epoch[i])
+
+
+class TelemetrieBinaire(TelemetrieColonnes):
+    """Télémétrie binaire projetée en mémoire, en lecture seule.
+
+    Chaque colonne est une memoryview à pas fixe sur le fichier : aucune
+    copie n'est faite à l'ouverture ni par tranche(). Les calculs hérités
+    de TelemetrieColonnes et le moteur de règles s'appliquent tels quels.
+    close() (ou un bloc with) libère la projection.
+    """
+
+    def __init__(self, chemin):
+        with open(chemin, 'rb') as f:
+            nombre, offset_meta = _lire_entete_binaire(f, chemin)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        meta = json.loads(self._mmap[offset_meta:])
+        self.entete = meta["entete"]
+        self.source = meta.get("source")
+        self.entiers = frozenset(meta["entiers"])
+        vue = memoryview(self._mmap)[TAILLE_ENTETE:TAILLE_ENTETE + nombre * ENREGISTREMENT.size]
+        self._projeter(vue, meta["systemes"], meta["etats"])
+        # Projection sans lecture : les pages ne sont chargées qu'à l'accès
+        compter("releves_projetes", nombre)
+
+    def _projeter(self, vue, systemes, etats):
+        self._vue = vue
+        self._systemes_etats = (systemes, etats)
+        doubles = vue.cast('d')
+        pas = DOUBLES_PAR_ENREGISTREMENT
+        for k, nom in enumerate(CHAMPS):
+            setattr(self, nom, doubles[k::pas])
+        self.systemes = _SystemesPackes(vue.cast('Q')[pas - 1::pas], systemes, etats)
+        self.timestamps = _Timestamps(self.epoch)
+
+    def tranche(self, debut, fin=None):
+        """Sous-ensemble [debut, fin) des relevés, sans copie."""
+        debut, fin, _ = slice(debut, fin).indices(len(self))
+        copie = object.__new__(TelemetrieBinaire)
+        copie._mmap = self._mmap
+        copie.entete = self.entete
+        copie.source = self.source
+        copie.entiers = self.entiers
+        taille = ENREGISTREMENT.size
+        copie._projeter(self._vue[debut * taille:fin * taille], *self._systemes_etats)
+        return copie
+
+    def ajouter(self, r, epoch=None):
+        raise TypeError("TelemetrieBinaire est en lecture seule ; utilisez convertir()")
+
+    def close(self):
+        """Libère les colonnes et la projection.
+
+        Une tranche encore utilisée garde la projection ouverte : elle est
+        alors fermée à la destruction de la dernière tranche.
+        """
+        for nom in CHAMPS:
+            setattr(self, nom, ())
+        self.systemes = self.timestamps = ()
+        if self._vue is not None:
+            self._vue.release()
+            self._vue = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def releve(self, i):
+        """Comme TelemetrieColonnes.releve, en restituant les canaux entiers."""
+        r = super().releve(i)
+        for nom in self.entiers:
+            cle = CANAUX[nom]
+            if cle in r:
+                r[cle] = int(r[cle])
+        return r
+
+
+def ouvrir_binaire(chemin_json):
+    """TelemetrieBinaire associée à un fichier JSON si elle existe et est à jour, sinon None.
+
+    À jour = signature_source du JSON identique à celle gardée à la conversion.
+    """
+    try:
+        colonnes = TelemetrieBinaire(chemin_binaire(chemin_json))
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        a_jour = colonnes.source == signature_source(chemin_json)
+    except FileNotFoundError:
+        a_jour = False
+    if not a_jour:
+        colonnes.close()
+        return None
+    return colonnes
+
+
+def charger_colonnes(chemin_json):
+    """(colonnes, entête) pour un fichier de télémétrie JSON.
+
+    Utilise la version binaire si elle est à jour, sinon lit le JSON en flux
+    vers des TelemetrieColonnes.
+    """
+    colonnes = ouvrir_binaire(chemin_json)
+    if colonnes is not None:
+        return colonnes, colonnes.entete
+    return TelemetrieColonnes.depuis_releves(iterer_releves(chemin_json)), lire_entete(chemin_json)
+
+
+if __name__ == '__main__':
+    chemin = sys.argv[1] if len(sys.argv) > 1 else 'space_data/telemetrie.json'
+    debut = time.perf_counter()
+    try:
+        chemin_bin, nombre = convertir(chemin)
+    except DonneesInvalides as e:
+        print(f"[ERREUR] Conversion impossible, la télémétrie reste lue depuis le JSON : {e}")
+        sys.exit(1)
+    duree = time.perf_counter() - debut
+    print(f"[OK] {nombre} relevés convertis en {duree:.2f}s : {chemin_bin}")
+    print(f"     {os.path.getsize(chemin):,} octets JSON -> {os.path.getsize(chemin_bin):,} octets binaires")
+    if '--mesure' in sys.argv:
+        debut = time.perf_counter()
+        colonnes = TelemetrieBinaire(chemin_bin)
+        distance = colonnes.distance_totale()
+        print(f"     ouverture + distance totale ({distance:,.0f} km) : {time.perf_counter() - debut:.3f}s")
\ No newline at end of file
@@ -0,0 +1,128 @@
+import math
+from array import array
+from datetime import datetime
+from operator import sub
+
+# Canaux numériques stockés en colonnes (nom de colonne -> clé du relevé)
+CANAUX = {
+    "vitesse": "vitesse_km_s",
+    "altitude": "altitude_km",
+    "carburant": "carburant_pourcent",
+    "oxygene": "oxygene_pourcent",
+    "temperature": "temperature_cabine_c",
+}
+
+
+def epoch_iso(ts):
+    """Convertit un timestamp ISO 8601 (avec ou sans 'Z') en secondes epoch."""
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+
+
+def distances_segments(x, y, z):
+    """Distances (km) entre points consécutifs, à partir de trois colonnes."""
+    dx = map(sub, x[1:], x[:-1])
+    dy = map(sub, y[1:], y[:-1])
+    dz = map(sub, z[1:], z[:-1])
+    return array('d', map(math.hypot, dx, dy, dz))
+
+
+def consommation_intervalles(carburant):
+    """Carburant consommé (en points de %) sur chaque intervalle."""
+    return array('d', map(sub, carburant[:-1], carburant[1:]))
+
+
+def _ajouter_nombre(colonne, valeur):
+    """Ajoute à une colonne de doubles ; une valeur non numérique (null, texte) devient NaN."""
+    try:
+        colonne.append(valeur)
+    except TypeError:
+        colonne.append(math.nan)
+
+
+class TelemetrieColonnes:
+    """Relevés de télémétrie rangés en tableaux typés (une colonne par canal).
+
+    Les calculs (distances, vitesse moyenne, consommation) se font sur des
+    colonnes entières au lieu de boucler sur des dictionnaires.
+    """
+
+    def __init__(self):
+        self.timestamps = []          # chaînes ISO d'origine (pour l'affichage)
+        self.epoch = array('d')       # secondes depuis 1970
+        self.x = array('d')
+        self.y = array('d')
+        self.z = array('d')
+        self.vitesse = array('d')
+        self.altitude = array('d')
+        self.carburant = array('d')
+        self.oxygene = array('d')
+        self.temperature = array('d')
+        self.systemes = []
+
+    @classmethod
+    def depuis_releves(cls, releves):
+        """Construit les colonnes à partir d'un itérable de relevés (dicts)."""
+        col = cls()
+        for r in releves:
+            col.ajouter(r)
+        return col
+
+    def ajouter(self, r, epoch=None):
+        """Ajoute un relevé en fin de colonnes.
+
+        'epoch' évite de reparser le timestamp s'il a déjà été converti ;
+        les canaux absents ou non numériques (position comprise) sont
+        stockés en NaN.
+        """
+        pos = r.get('position_km')
+        if not isinstance(pos, dict):
+            pos = {}
+        self.timestamps.append(r.get('timestamp'))
+        self.epoch.append(epoch_iso(r['timestamp']) if epoch is None else epoch)
+        _ajouter_nombre(self.x, pos.get('x', math.nan))
+        _ajouter_nombre(self.y, pos.get('y', math.nan))
+        _ajouter_nombre(self.z, pos.get('z', math.nan))
+        for nom, cle in CANAUX.items():
+            _ajouter_nombre(getattr(self, nom), r.get(cle, math.nan))
+        self.systemes.append(r.get('systemes', {}))
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def releve(self, i):
+        """Reconstitue le relevé d'indice i sous forme de dict."""
+        r = {
+            "timestamp": self.timestamps[i],
+            "position_km": {"x": self.x[i], "y": self.y[i], "z": self.z[i]},
+        }
+        for nom, cle in CANAUX.items():
+            valeur = getattr(self, nom)[i]
+            if not math.isnan(valeur):
+                r[cle] = valeur
+        r["systemes"] = self.systemes[i]
+        return r
+
+    def distances_segments(self):
+        """Distance (km) entre chaque paire de relevés consécutifs."""
+        return distances_segments(self.x, self.y, self.z)
+
+    def distance_totale(self):
+        """Somme des distances de segment en km."""
+        return math.fsum(self.distances_segments())
+
+    def duree_secondes(self):
+        """Durée entre le premier et le dernier relevé."""
+        if len(self) < 2:
+            return 0.0
+        return self.epoch[-1] - self.epoch[0]
+
+    def vitesse_moyenne(self):
+        """Vitesse moyenne sur le trajet en km/s."""
+        duree = self.duree_secondes()
+        if duree <= 0:
+            return 0
+        return self.distance_totale() / duree
+
+    def consommation_carburant(self):
+        """Carburant consommé (en points de %) sur chaque intervalle."""
+        return consommation_intervalles(self.carburant)
\ No newline at end of file
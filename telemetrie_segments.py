@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import math
+import hashlib
+from bisect import bisect_left, bisect_right
+
+from telemetrie_colonnes import TelemetrieColonnes, epoch_iso
+from telemetrie_binaire import TelemetrieBinaire, ecrire_binaire, prolonger_binaire, CHAMPS, DonneesInvalides
+from lecteur_telemetrie import iterer_releves, iterer_releves_apres, fin_des_releves, lire_entete, hacher_octets
+from stockage_donnees import verrou_fichier
+
+DOSSIER_SEGMENTS = 'space_data/telemetrie/segments/'
+RELEVES_PAR_SEGMENT = 50000
+# Un epoch sur PAS_INDEX est gardé dans l'index creux de chaque segment
+PAS_INDEX = 1024
+
+
+def en_epoch(instant):
+    """Accepte un timestamp ISO 8601 ou un nombre de secondes epoch."""
+    if isinstance(instant, str):
+        return epoch_iso(instant)
+    return float(instant)
+
+
+def fusionner_tranches(tranches):
+    """Une seule tranche est rendue telle quelle ; plusieurs sont copiées dans des TelemetrieColonnes."""
+    if len(tranches) == 1:
+        return tranches[0]
+    colonnes = TelemetrieColonnes()
+    for tranche in tranches:
+        for nom in CHAMPS:
+            getattr(colonnes, nom).extend(getattr(tranche, nom))
+        colonnes.timestamps.extend(tranche.timestamps[i] for i in range(len(tranche)))
+        colonnes.systemes.extend(tranche.systemes[i] for i in range(len(tranche)))
+    return colonnes
+
+
+class StockageSegments:
+    """Télémétrie d'une mission découpée en segments binaires triés par temps.
+
+    Chaque segment est un fichier .tlmb d'au plus RELEVES_PAR_SEGMENT
+    relevés. index.json garde pour chaque segment ses bornes temporelles et
+    un epoch sur PAS_INDEX (index creux) : une requête par fenêtre ne
+    projette que les segments qui la recoupent et n'y lit que quelques pages.
+
+    Les écritures (ajouter, importer, synchroniser) prennent le verrou du
+    dossier entre processus et relisent l'index avant de le modifier ;
+    segments et index sont remplacés atomiquement, les lecteurs n'attendent pas.
+    """
+
+    def __init__(self, mission_id, dossier=DOSSIER_SEGMENTS, releves_par_segment=RELEVES_PAR_SEGMENT):
+        self.mission_id = mission_id
+        self.dossier = os.path.join(dossier, mission_id)
+        self.releves_par_segment = releves_par_segment
+        self.chemin_index = os.path.join(self.dossier, 'index.json')
+        self.verrou = os.path.join(self.dossier, 'segments')
+        self._ouverts = {}   # nom de segment -> TelemetrieBinaire
+        self.index = None
+        self._charger_index()
+
+    def _charger_index(self):
+        ancien = self.index
+        try:
+            with open(self.chemin_index, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {"mission_id": self.mission_id, "source": None, "entete": {}, "segments": []}
+        if self.index != ancien:
+            # Segments réécrits par un autre processus : projections à rouvrir
+            self._ouverts = {}
+        self._fins = [s['fin'] for s in self.index['segments']]
+
+    def __len__(self):
+        return sum(s['nombre'] for s in self.index['segments'])
+
+    def _sauver_index(self):
+        with open(self.chemin_index + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(self.chemin_index + ".tmp", self.chemin_index)
+        self._fins = [s['fin'] for s in self.index['segments']]
+
+    def _segment(self, description):
+        colonnes = self._ouverts.get(description['nom'])
+        if colonnes is None:
+            colonnes = self._ouverts[description['nom']] = TelemetrieBinaire(
+                os.path.join(self.dossier, description['nom']))
+        return colonnes
+
+    def _ecrire_segment(self, nom, releves, prolonge=None):
+        """Écrit le segment 'nom' ; prolonge = description du segment existant à compléter."""
+        if prolonge:
+            prolonger_binaire(os.path.join(self.dossier, nom), releves, self.index['entete'], prolonge['nombre'])
+        else:
+            ecrire_binaire(os.path.join(self.dossier, nom), releves, self.index['entete'])
+        self._ouverts.pop(nom, None)
+        colonnes = self._segment({"nom": nom})
+        epoch = colonnes.epoch
+        return {
+            "nom": nom,
+            "debut": epoch[0],
+            "fin": epoch[-1],
+            "nombre": len(colonnes),
+            "marques": list(epoch[::PAS_INDEX]),
+        }
+
+    def ajouter(self, releves):
+        """Ajoute des relevés chronologiques en fin de stockage.
+
+        Les relevés qui complètent le dernier segment (incomplet) sont
+        ajoutés à ses enregistrements, recopiés tels quels (sans repasser par
+        des relevés), puis de nouveaux segments sont créés au besoin : le
+        coût ne dépend pas de l'historique. Lève ValueError si un relevé est
+        antérieur au précédent.
+        """
+        with verrou_fichier(self.verrou):
+            self._charger_index()
+            self._ecrire(releves)
+            self._sauver_index()
+
+    def _ecrire(self, releves):
+        """Écrit les segments de ajouter() sans enregistrer l'index (verrou pris par l'appelant).
+
+        Le dernier segment n'est complété qu'une fois tout le lot contrôlé :
+        en cas d'erreur, seuls les segments créés sont à supprimer.
+        """
+        os.makedirs(self.dossier, exist_ok=True)
+        segments = self.index['segments']
+        place = 0
+        if segments and segments[-1]['nombre'] < self.releves_par_segment:
+            place = self.releves_par_segment - segments[-1]['nombre']
+        dernier = segments[-1]['fin'] if segments else -math.inf
+
+        premier = numero = len(segments) + 1
+        complement, tampon, crees = [], [], []
+        try:
+            for r in releves:
+                epoch = epoch_iso(r['timestamp'])
+                if epoch < dernier:
+                    raise ValueError(f"relevé {r['timestamp']} antérieur au précédent : stockage trié par temps")
+                dernier = epoch
+                if len(complement) < place:
+                    complement.append(r)
+                    continue
+                tampon.append(r)
+                if len(tampon) == self.releves_par_segment:
+                    crees.append(self._ecrire_segment(f"segment_{numero:06d}.tlmb", tampon))
+                    numero += 1
+                    tampon = []
+            if tampon:
+                crees.append(self._ecrire_segment(f"segment_{numero:06d}.tlmb", tampon))
+            if complement:
+                segments[-1] = self._ecrire_segment(segments[-1]['nom'], complement, segments[-1])
+        except ValueError:
+            self._annuler(premier, numero)
+            raise
+        segments.extend(crees)
+
+    def _annuler(self, premier, dernier):
+        """Défait un ajout interrompu : les segments créés sont supprimés."""
+        for numero in range(premier, dernier + 1):
+            nom = f"segment_{numero:06d}.tlmb"
+            self._ouverts.pop(nom, None)
+            if os.path.exists(os.path.join(self.dossier, nom)):
+                os.remove(os.path.join(self.dossier, nom))
+
+    def _vider(self):
+        for description in self.index['segments']:
+            self._ouverts.pop(description['nom'], None)
+            try:
+                os.remove(os.path.join(self.dossier, description['nom']))
+            except FileNotFoundError:
+                pass
+        self.index['segments'] = []
+
+    def _decrire_source(self, chemin_json, avant, hachage=None, debut=0):
+        """Description du fichier importé ; None s'il a changé depuis os.stat 'avant'.
+
+        offset_fin et empreinte_fin (sha1 des octets qui précèdent la fin
+        des relevés) permettent de reconnaître un simple ajout de relevés.
+        hachage, s'il est donné, couvre déjà les octets [0, debut).
+        """
+        apres = os.stat(chemin_json)
+        if (avant.st_mtime_ns, avant.st_size) != (apres.st_mtime_ns, apres.st_size):
+            # Modifié pendant la lecture : réimport au prochain appel
+            return None
+        source = {"chemin": chemin_json, "signature": [apres.st_mtime_ns, apres.st_size],
+                  "offset_fin": fin_des_releves(chemin_json), "empreinte_fin": None}
+        if source['offset_fin'] is not None:
+            hachage = hacher_octets(hachage or hashlib.sha1(), chemin_json, debut, source['offset_fin'])
+            source['empreinte_fin'] = hachage.hexdigest()
+        return source
+
+    def importer(self, chemin_json):
+        """Reconstruit tous les segments à partir d'un fichier de télémétrie JSON.
+
+        Le fichier est lu en flux ; s'il n'est pas chronologique, il est relu
+        entièrement et trié en mémoire avant écriture.
+        """
+        with verrou_fichier(self.verrou):
+            self._charger_index()
+            self._importer(chemin_json)
+
+    def _importer(self, chemin_json):
+        os.makedirs(self.dossier, exist_ok=True)
+        self._vider()
+        avant = os.stat(chemin_json)
+        vierge = {"mission_id": self.mission_id, "source": None, "entete": lire_entete(chemin_json), "segments": []}
+        self.index = dict(vierge, segments=[])
+        try:
+            self._ecrire(iterer_releves(chemin_json))
+        except DonneesInvalides:
+            # Trier n'y changerait rien
+            raise
+        except ValueError:
+            # _annuler a supprimé les segments créés ; l'index est encore vierge
+            self._vider()
+            self.index = dict(vierge, segments=[])
+            self._ecrire(sorted(iterer_releves(chemin_json), key=lambda r: epoch_iso(r['timestamp'])))
+        self.index['source'] = self._decrire_source(chemin_json, avant)
+        self._sauver_index()
+
+    def _prolonger(self, chemin_json):
+        """Importe les seuls relevés ajoutés depuis le dernier import, via ajouter().
+
+        Retourne False, sans rien modifier, si les octets déjà importés ont
+        changé ou si un relevé ajouté est antérieur aux précédents.
+        """
+        source = self.index.get('source')
+        if not source or source['chemin'] != chemin_json or source.get('offset_fin') is None:
+            return False
+        offset = source['offset_fin']
+        avant = os.stat(chemin_json)
+        if avant.st_size < offset:
+            return False
+        hachage = hacher_octets(hashlib.sha1(), chemin_json, 0, offset)
+        if hachage.hexdigest() != source['empreinte_fin']:
+            return False
+        self.index['entete'] = lire_entete(chemin_json)
+        try:
+            self._ecrire(iterer_releves_apres(chemin_json, offset))
+        except ValueError:
+            # _annuler a supprimé les segments créés, le dernier segment n'a pas été touché
+            return False
+        self.index['source'] = self._decrire_source(chemin_json, avant, hachage, offset)
+        self._sauver_index()
+        return True
+
+    def synchroniser(self, chemin_json):
+        """Met les segments à jour si chemin_json a changé ; retourne True s'il a changé.
+
+        Un simple ajout de relevés en fin de fichier ne réécrit que le
+        dernier segment et les suivants ; toute autre modification
+        provoque un réimport complet.
+        """
+        with verrou_fichier(self.verrou):
+            # Un autre processus a pu synchroniser depuis l'ouverture
+            self._charger_index()
+            st = os.stat(chemin_json)
+            source = self.index.get('source')
+            if source and source['chemin'] == chemin_json and source['signature'] == [st.st_mtime_ns, st.st_size]:
+                return False
+            if not self._prolonger(chemin_json):
+                self._importer(chemin_json)
+            return True
+
+    def _position(self, description, epoch, cote):
+        """Indice dans le segment du premier relevé >= epoch (cote='gauche') ou > epoch."""
+        marques = description['marques']
+        recherche = bisect_left if cote == 'gauche' else bisect_right
+        # L'index creux borne la recherche à un bloc de PAS_INDEX relevés
+        bloc = max(recherche(marques, epoch) - 1, 0)
+        debut = bloc * PAS_INDEX
+        fin = min(debut + 2 * PAS_INDEX, description['nombre'])
+        return recherche(self._segment(description).epoch, epoch, debut, fin)
+
+    def tranches(self, debut=None, fin=None):
+        """Tranches (TelemetrieBinaire, sans copie) des relevés avec debut <= epoch <= fin.
+
+        debut et fin sont des timestamps ISO ou des epochs ; None = non borné.
+        Seuls les segments qui recoupent la fenêtre sont ouverts.
+        """
+        t0 = -math.inf if debut is None else en_epoch(debut)
+        t1 = math.inf if fin is None else en_epoch(fin)
+        segments = self.index['segments']
+        resultat = []
+        for k in range(bisect_left(self._fins, t0), len(segments)):
+            description = segments[k]
+            if description['debut'] > t1:
+                break
+            colonnes = self._segment(description)
+            i0 = 0 if description['debut'] >= t0 else self._position(description, t0, 'gauche')
+            i1 = len(colonnes) if description['fin'] <= t1 else self._position(description, t1, 'droite')
+            if i1 > i0:
+                resultat.append(colonnes.tranche(i0, i1))
+        return resultat
+
+    def colonnes_entre(self, debut=None, fin=None):
+        """Relevés de la fenêtre sous forme de colonnes (copie seulement si plusieurs segments)."""
+        return fusionner_tranches(self.tranches(debut, fin))
+
+    def releves_entre(self, debut=None, fin=None):
+        """Itère sur les relevés (dicts) de la fenêtre, dans l'ordre chronologique."""
+        for tranche in self.tranches(debut, fin):
+            for i in range(len(tranche)):
+                yield tranche.releve(i)
+
+
+def stockage_mission(mission_id, chemin_json):
+    """Stockage segmenté d'une mission, resynchronisé avec son fichier JSON si besoin."""
+    stockage = StockageSegments(mission_id)
+    stockage.synchroniser(chemin_json)
+    return stockage
+
+
+if __name__ == '__main__':
+    # Usage : python telemetrie_segments.py <mission_id> <json> [debut] [fin]
+    mission_id = sys.argv[1] if len(sys.argv) > 1 else 'MSN-001'
+    chemin = sys.argv[2] if len(sys.argv) > 2 else 'space_data/telemetrie.json'
+    debut = sys.argv[3] if len(sys.argv) > 3 else None
+    fin = sys.argv[4] if len(sys.argv) > 4 else None
+    stockage = stockage_mission(mission_id, chemin)
+    print(f"=== {mission_id} : {len(stockage)} relevés en {len(stockage.index['segments'])} segments ===")
+    for r in stockage.releves_entre(debut, fin):
+        print(f"[{r['timestamp']}] Alt: {r.get('altitude_km', '?')}km, Vit: {r.get('vitesse_km_s', '?')}km/s")
\ No newline at end of file
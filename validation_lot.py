@@ -0,0 +1,128 @@
+import sys
+import math
+import operator
+from collections import namedtuple, Counter
+from itertools import compress
+
+from telemetrie_colonnes import TelemetrieColonnes, CANAUX, epoch_iso
+from regles_alerte import obtenir_moteur
+
+CHAMPS_OBLIGATOIRES = (
+    "timestamp", "vitesse_km_s", "carburant_pourcent",
+    "oxygene_pourcent", "temperature_cabine_c"
+)
+
+# Une ligne du tableau d'erreurs ; 'type' reprend les noms des exceptions de tache7,
+# plus DonneesInvalides pour une valeur non numérique
+ErreurValidation = namedtuple("ErreurValidation", "indice timestamp type detail")
+
+
+def _est_nombre(valeur):
+    return isinstance(valeur, (int, float)) and not isinstance(valeur, bool)
+
+
+def _valeurs_invalides(releve):
+    """Canaux (et coordonnées) présents mais non numériques."""
+    invalides = [cle for cle in CANAUX.values() if cle in releve and not _est_nombre(releve[cle])]
+    position = releve.get("position_km", {})
+    if not isinstance(position, dict):
+        invalides.append("position_km")
+    else:
+        invalides += [f"position_km.{axe}" for axe in "xyz" if axe in position and not _est_nombre(position[axe])]
+    return invalides
+
+
+def _sans_invalides(releve, invalides):
+    """Copie du relevé sans les valeurs invalides (stockées en NaN dans les colonnes)."""
+    releve = {cle: valeur for cle, valeur in releve.items() if cle not in invalides}
+    axes = [champ[len("position_km."):] for champ in invalides if champ.startswith("position_km.")]
+    if axes:
+        releve["position_km"] = {axe: v for axe, v in releve["position_km"].items() if axe not in axes}
+    return releve
+
+
+def valider_lot(releves, seuils, champs_obligatoires=CHAMPS_OBLIGATOIRES):
+    """Valide un lot de relevés en un seul passage, sans lever d'exception.
+
+    Chaque timestamp est parsé une seule fois vers une colonne epoch ;
+    l'ordre chronologique et les seuils sont ensuite vérifiés sur les
+    colonnes entières. Retourne (colonnes, erreurs) où erreurs est la liste
+    des ErreurValidation triée par indice de relevé. Un relevé qui n'est
+    pas un objet JSON est signalé (DonneesInvalides) et compte comme un
+    relevé vide.
+    """
+    colonnes = TelemetrieColonnes()
+    erreurs = []
+    for indice, releve in enumerate(releves):
+        if not isinstance(releve, dict):
+            erreurs.append(ErreurValidation(indice, None, "DonneesInvalides",
+                                            f"Relevé de type {type(releve).__name__}, objet attendu"))
+            colonnes.ajouter({}, epoch=math.nan)
+            continue
+        manquants = [c for c in champs_obligatoires if c not in releve]
+        if manquants:
+            erreurs.append(ErreurValidation(indice, releve.get("timestamp"), "DonneesManquantes",
+                                            f"Champs manquants: {', '.join(manquants)}"))
+        epoch = math.nan
+        ts = releve.get("timestamp")
+        if isinstance(ts, str):
+            try:
+                epoch = epoch_iso(ts)
+            except ValueError:
+                erreurs.append(ErreurValidation(indice, ts, "HorodatageInvalide",
+                                                f'"{ts}" n\'est pas un format ISO 8601 valide'))
+        elif "timestamp" in releve:
+            erreurs.append(ErreurValidation(indice, ts, "HorodatageInvalide",
+                                            f"{ts!r} n'est pas une chaîne ISO 8601"))
+        elif "timestamp" not in manquants:
+            # Champ non obligatoire : l'epoch NaN est tout de même signalé
+            erreurs.append(ErreurValidation(indice, None, "HorodatageInvalide", "Horodatage absent"))
+        invalides = _valeurs_invalides(releve)
+        if invalides:
+            erreurs.append(ErreurValidation(indice, ts, "DonneesInvalides",
+                                            f"Valeurs non numériques: {', '.join(invalides)}"))
+            releve = _sans_invalides(releve, invalides)
+        colonnes.ajouter(releve, epoch=epoch)
+
+    # Ordre chronologique : un relevé plus ancien que le précédent relevé daté ; un epoch NaN
+    # (déjà signalé) ne se compare à rien et ne doit pas masquer un retour en arrière
+    epoch = colonnes.epoch
+    dates = list(compress(range(len(epoch)), map(operator.eq, epoch, epoch)))
+    valeurs = [epoch[i] for i in dates]
+    for k in compress(range(1, len(dates)), map(operator.gt, valeurs[:-1], valeurs[1:])):
+        indice, precedent = dates[k], dates[k - 1]
+        erreurs.append(ErreurValidation(indice, colonnes.timestamps[indice], "OrdreChronologique",
+                                        f"antérieur au relevé précédent ({colonnes.timestamps[precedent]})"))
+
+    # Seuils : mêmes règles compilées que les alertes, hors état des systèmes
+    for alerte in obtenir_moteur(seuils).evaluer(colonnes):
+        if not alerte.regle.startswith("systeme:"):
+            erreurs.append(ErreurValidation(alerte.indice, colonnes.timestamps[alerte.indice], "SeuilDepasse",
+                                            f"{alerte.regle} ({alerte.valeur} / seuil {alerte.seuil})"))
+
+    erreurs.sort(key=operator.attrgetter("indice"))
+    return colonnes, erreurs
+
+
+def afficher_erreurs(erreurs, limite=50):
+    """Affiche le tableau d'erreurs (tronqué à 'limite' lignes) et un résumé par type."""
+    for e in erreurs[:limite]:
+        print(f"❌ Relevé #{e.indice} {e.timestamp} : {e.type} - {e.detail}")
+    if len(erreurs) > limite:
+        print(f"... {len(erreurs) - limite} erreurs supplémentaires")
+    for type_erreur, nombre in Counter(e.type for e in erreurs).most_common():
+        print(f"  {type_erreur} : {nombre}")
+
+
+if __name__ == '__main__':
+    from chargeur_donnees import charger_json_securise
+    from lecteur_telemetrie import iterer_releves
+
+    chemin = sys.argv[1] if len(sys.argv) > 1 else 'space_data/telemetrie.json'
+    config = charger_json_securise('space_data/config_systeme.json') or {}
+    colonnes, erreurs = valider_lot(iterer_releves(chemin), config.get('seuils_alerte', {}))
+    print(f"=== Validation de {len(colonnes)} relevés ({chemin}) ===")
+    if erreurs:
+        afficher_erreurs(erreurs)
+    else:
+        print("✅ Tous les relevés sont valides.")
\ No newline at end of file